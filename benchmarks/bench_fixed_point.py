@@ -0,0 +1,41 @@
+"""
+Бенчмарк итогов позиции: сумма Decimal против целых единиц 10**-8 колонок PurchaseStore
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_fixed_point [количество покупок ...]
+"""
+import sys
+import time
+from decimal import Decimal
+from benchmarks.bench_import import make_asset
+from src.models.position_aggregate import PositionAggregate
+from src.services.calculator import Calculator
+
+
+def measure(func, repeat: int = 5):
+    """Лучшее время из repeat запусков и результат функции"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(sizes):
+    print(f"{'Покупок':>10} | {'Decimal, с':>10} | {'int64 NumPy, с':>14}")
+    for size in sizes:
+        purchases = make_asset(f"bench_{size}", size).purchases
+        as_list = list(purchases)
+
+        decimal_time, decimal_be = measure(lambda: Calculator.calculate_break_even(as_list))
+        store_time, aggregate = measure(lambda: PositionAggregate.from_purchases(purchases))
+
+        # Паритет проверяется тестами (tests/test_fixed_point.py); здесь - только что считаем одно и то же
+        assert aggregate.break_even == decimal_be
+
+        print(f"{size:>10} | {decimal_time:>10.4f} | {store_time:>14.6f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000, 1_000_000])
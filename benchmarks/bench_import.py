@@ -0,0 +1,56 @@
+"""
+Бенчмарк загрузки актива из .xlsx (ExcelExporter.import_asset)
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_import [количество покупок ...]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.services.calculator import Calculator
+from src.services.excel_exporter import ExcelExporter
+from src.utils.currency import Currency
+
+
+def make_asset(name: str, size: int) -> Asset:
+    """Создает актив с заданным количеством покупок (значения округлены, как при вводе)"""
+    start = datetime(2020, 1, 1)
+    purchases = []
+    for i in range(size):
+        investment = Decimal(100 + i % 50)
+        price = Decimal(30000) - Decimal(i % 1000) * Decimal('7.5')
+        purchases.append(Purchase(
+            id=i + 1,
+            investment=investment,
+            price=price,
+            quantity=Calculator.calculate_quantity(investment, price),
+            timestamp=start + timedelta(minutes=i)
+        ))
+    return Asset(name=name, currency=Currency.USD, drawdown_percent=Decimal('15'), purchases=purchases)
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        print(f"{'Покупок':>10} | {'Запись, с':>10} | {'Загрузка, с':>11}")
+        for size in sizes:
+            name = f"bench_{size}"
+            started = time.perf_counter()
+            ExcelExporter.export_asset(make_asset(name, size))
+            export_time = time.perf_counter() - started
+
+            started = time.perf_counter()
+            asset = ExcelExporter.import_asset(name)
+            import_time = time.perf_counter() - started
+            assert asset is not None and len(asset.purchases) == size
+
+            print(f"{size:>10} | {export_time:>10.3f} | {import_time:>11.3f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
@@ -0,0 +1,79 @@
+"""
+Бенчмарк памяти на одну покупку (tracemalloc): объект Purchase, покупка в активе
+в колоночном хранилище с итогами (актив без продаж) и лот покупки (учет лотов строится при первой продаже).
+Проверяет, что объем не превышает бюджет.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_memory [количество покупок]
+"""
+import sys
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.services.calculator import Calculator
+from src.utils.currency import Currency
+from src.utils.precision import quantize_amount, quantize_price
+
+# Бюджет на покупку в активе, байт: строка колоночного хранилища; она же вместе с лотом
+PURCHASE_BUDGET = 64
+PURCHASE_WITH_LOT_BUDGET = 400
+
+
+def make_values(size: int) -> list:
+    """Значения покупок с реальной точностью: сумма до центов, цена и количество до 8 знаков"""
+    start = datetime(2020, 1, 1)
+    values = []
+    for i in range(size):
+        investment = quantize_amount(Decimal(100 + i % 97) / 3, Currency.USD)
+        price = quantize_price(Decimal(3_000_000 - i) / 7)
+        values.append((investment, price, Calculator.calculate_quantity(investment, price), start + timedelta(minutes=i)))
+    return values
+
+
+def measure(build) -> float:
+    """Прирост памяти, выделенной при вызове build(), байт"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return after - before
+
+
+def main(size: int):
+    # Значения создаются до замера: в первом замере учитываются только объекты Purchase
+    values = make_values(size)
+    purchases_only = measure(
+        lambda: [Purchase(i + 1, inv, price, qty, ts) for i, (inv, price, qty, ts) in enumerate(values)]
+    )
+
+    def build_asset():
+        asset = Asset(name="bench", currency=Currency.USD, drawdown_percent=Decimal('15'))
+        for investment, price, quantity, timestamp in make_values(size):
+            asset.add_purchase(Purchase(asset.allocate_purchase_id(), investment, price, quantity, timestamp))
+        return asset
+
+    in_asset = measure(build_asset)
+
+    def build_asset_with_lots():
+        asset = build_asset()
+        asset.lots  # Учет лотов, как после первой продажи
+        return asset
+
+    with_lots = measure(build_asset_with_lots)
+
+    print(f"Покупок: {size}")
+    print(f"  Purchase (без значений): {purchases_only / size:8.1f} байт")
+    print(f"  Покупка в активе:        {in_asset / size:8.1f} байт (бюджет {PURCHASE_BUDGET})")
+    print(f"  Покупка с лотом:         {with_lots / size:8.1f} байт (бюджет {PURCHASE_WITH_LOT_BUDGET})")
+    assert in_asset / size <= PURCHASE_BUDGET, "Объем покупки превышает бюджет"
+    assert with_lots / size <= PURCHASE_WITH_LOT_BUDGET, "Объем покупки с лотом превышает бюджет"
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
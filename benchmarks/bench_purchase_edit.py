@@ -0,0 +1,70 @@
+"""
+Бенчмарк исправления покупки в середине длинной истории: замена в хранилище
+с обновлением ряда безубыточной точки (дерево Фенвика, O(log n)) против
+построения ряда заново после каждого изменения (O(n)).
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_purchase_edit [количество покупок]
+"""
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+
+EDITS = 1_000
+
+
+def make_store(size: int) -> PurchaseStore:
+    """Покупки раз в минуту с суммой до центов и ценой до 8 знаков"""
+    start = datetime(2020, 1, 1)
+    store = PurchaseStore()
+    for i in range(size):
+        investment = Decimal(10_000 + i % 9_700).scaleb(-2)
+        price = Decimal(3_000_000_000_000 - i).scaleb(-8)
+        quantity = (investment / price).quantize(Decimal('0.00000001'))
+        store.append(Purchase(i + 1, investment, price, quantity, start + timedelta(minutes=i)))
+    return store
+
+
+def edited(store: PurchaseStore, rng: random.Random) -> Purchase:
+    """Случайная покупка с исправленной суммой (время и место не меняются)"""
+    purchase = store.get(rng.randrange(1, len(store) + 1))
+    investment = purchase.investment + Decimal(rng.randrange(1, 1_000)).scaleb(-2)
+    quantity = (investment / purchase.price).quantize(Decimal('0.00000001'))
+    return Purchase(purchase.id, investment, purchase.price, quantity, purchase.timestamp)
+
+
+def main(size: int):
+    store = make_store(size)
+    middle = size // 2
+
+    # Дерево Фенвика: замена и запрос безубыточной точки после середины истории
+    store.break_even_series()
+    rng = random.Random(1)
+    started = time.perf_counter()
+    for _ in range(EDITS):
+        store.replace(edited(store, rng))
+        store.break_even_series().at(middle)
+    fenwick_us = (time.perf_counter() - started) / EDITS * 1e6
+
+    # Ряд строится заново после каждого изменения (как после добавления покупки задним числом)
+    rng = random.Random(1)
+    rebuilds = max(1, EDITS // 100)
+    started = time.perf_counter()
+    for _ in range(rebuilds):
+        store.replace(edited(store, rng))
+        store._series = None  # Так ведет себя ряд после покупки задним числом или уплотнения
+        store.break_even_series().at(middle)
+    rebuild_us = (time.perf_counter() - started) / rebuilds * 1e6
+
+    print(f"Покупок: {size}")
+    print(f"  Исправление + запрос (дерево Фенвика): {fenwick_us:10.1f} мкс")
+    print(f"  Исправление + построение ряда заново:  {rebuild_us:10.1f} мкс")
+    print(f"  Ускорение: {rebuild_us / fenwick_us:.0f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
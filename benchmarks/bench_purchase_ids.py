@@ -0,0 +1,74 @@
+"""
+Бенчмарк добавления и удаления покупок в Asset (выдача ID и удаление по индексу)
+и удаления строки таблицы покупок (обращения PurchaseTable.remove_purchase к хранилищу)
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_purchase_ids [количество покупок ...]
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+from src.utils.currency import Currency
+
+# PurchaseTable.VISIBLE_ROWS: таблица импортирует customtkinter, поэтому значение повторено здесь
+VISIBLE_ROWS = 6
+
+
+def remove_table_row(store: PurchaseStore, purchase_id: int) -> None:
+    """
+    То же, что PurchaseTable.remove_purchase делает с хранилищем, без виджетов Tk:
+    номер строки, проверка самой поздней покупки, удаление и перепривязка видимого окна
+    """
+    index = store.index_of(purchase_id)
+    latest = store.is_latest(index)
+    store.remove(purchase_id)
+    first_row = max(0, min(index, len(store) - VISIBLE_ROWS))
+    start = max(index, first_row) if latest else first_row
+    for row in range(start, min(first_row + VISIBLE_ROWS, len(store))):
+        store[row]
+        store.break_even_after(row)
+
+
+def main(sizes):
+    print(f"{'Покупок':>10} | {'Добавление, мкс/оп':>18} | {'Удаление, мкс/оп':>16} | {'Удаление в таблице, мкс/оп':>26}")
+    for size in sizes:
+        asset = Asset(name="bench", currency=Currency.USD, drawdown_percent=Decimal('15'))
+        investment = Decimal('100')
+        price = Decimal('25000')
+        quantity = investment / price
+
+        started = time.perf_counter()
+        for _ in range(size):
+            asset.add_purchase(Purchase(asset.allocate_purchase_id(), investment, price, quantity))
+        add_time = time.perf_counter() - started
+
+        # Таблица держит свою копию покупок; ряд безубыточной точки построен при первой отрисовке
+        table = asset.purchases.copy()
+        table.break_even_series()
+
+        # Удаляем половину покупок в случайном порядке
+        ids = [purchase.id for purchase in asset.purchases]
+        random.Random(size).shuffle(ids)
+        removed = ids[:size // 2]
+        started = time.perf_counter()
+        for purchase_id in removed:
+            asset.remove_purchase(purchase_id)
+        remove_time = time.perf_counter() - started
+        assert len(asset.purchases) == size - len(removed)
+
+        started = time.perf_counter()
+        for purchase_id in removed:
+            remove_table_row(table, purchase_id)
+        table_time = time.perf_counter() - started
+        assert table == asset.purchases
+
+        print(f"{size:>10} | {add_time / size * 1e6:>18.2f} | {remove_time / len(removed) * 1e6:>16.2f} "
+              f"| {table_time / len(removed) * 1e6:>26.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -0,0 +1,73 @@
+"""
+Бенчмарк колоночного хранилища покупок: итоги и фильтр по времени
+генератором по списку Purchase против векторных операций PurchaseStore.
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_purchase_store [количество покупок]
+"""
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+
+REPEATS = 3
+
+
+def make_purchases(size: int) -> list:
+    """Покупки с суммой до центов, ценой и количеством до 8 знаков, раз в минуту"""
+    start = datetime(2020, 1, 1)
+    purchases = []
+    for i in range(size):
+        investment = Decimal(10_000 + i % 9_700).scaleb(-2)
+        price = Decimal(3_000_000_000_000 - i).scaleb(-8)
+        quantity = (investment / price).quantize(Decimal('0.00000001'))
+        purchases.append(Purchase(i + 1, investment, price, quantity, start + timedelta(minutes=i)))
+    return purchases
+
+
+def best(operation) -> float:
+    """Лучшее время из REPEATS запусков, мс"""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - started) * 1000)
+    return min(timings)
+
+
+def _running(values):
+    """Накопленная сумма генератором"""
+    total = Decimal('0')
+    for value in values:
+        total += value
+        yield total
+
+
+def main(size: int):
+    purchases = make_purchases(size)
+    store = PurchaseStore(purchases)
+    middle = purchases[size // 2].timestamp
+    assert store.total("investment") == sum(p.investment for p in purchases)
+
+    rows = [
+        ("Сумма вложений", lambda: sum(p.investment for p in purchases), lambda: store.total("investment")),
+        ("Сумма количества", lambda: sum(p.quantity for p in purchases), lambda: store.total("quantity")),
+        ("Накопленная сумма", lambda: list(_running(p.investment for p in purchases)),
+         lambda: store.cumsum("investment")),
+        ("Покупки после даты", lambda: [p for p in purchases if p.timestamp >= middle],
+         lambda: store.between(start=middle)),
+    ]
+
+    print(f"Покупок: {size}")
+    print(f"{'Операция':>20} | {'Список, мс':>10} | {'Хранилище, мс':>13} | Ускорение")
+    for name, on_list, on_store in rows:
+        list_ms = best(on_list)
+        store_ms = best(on_store)
+        print(f"{name:>20} | {list_ms:10.1f} | {store_ms:13.1f} | {list_ms / store_ms:8.1f}x")
+
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,28 @@
+"""
+Бенчмарк моделирования Монте-Карло (Simulator.simulate)
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_simulation [количество траекторий ...]
+"""
+import os
+import sys
+import time
+from decimal import Decimal
+from src.services.simulator import Simulator
+
+STEPS = 365
+
+
+def main(sizes):
+    print(f"Процессов: {os.cpu_count()}, шагов в траектории: {STEPS}")
+    print(f"{'Траекторий':>10} | {'Время, с':>9} | {'Медиана безубыточной точки':>26}")
+    for size in sizes:
+        started = time.perf_counter()
+        result = Simulator.simulate(size, STEPS, Decimal('15'), Decimal('100'), seed=2024)
+        elapsed = time.perf_counter() - started
+        median = result.percentiles((50,))["break_even"][50]
+        print(f"{size:>10} | {elapsed:>9.2f} | {median:>26.4f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000])
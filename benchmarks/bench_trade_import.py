@@ -0,0 +1,55 @@
+"""
+Бенчмарк импорта сделок из CSV (TradeImporter.import_csv) в актив SQLite-хранилища
+
+Запуск из корня проекта:
+    python -m benchmarks.bench_trade_import [количество строк ...]
+"""
+import os
+import resource
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from src.services.asset_manager import AssetManager
+from src.services.sqlite_storage import SQLiteStorageBackend
+from src.services.trade_importer import TradeImporter
+
+
+def write_statement(filepath: Path, rows: int) -> None:
+    """Пишет выгрузку в формате европейской биржи: «;» и десятичная запятая, каждая 10-я строка - продажа"""
+    start = datetime(2021, 1, 1)
+    with open(filepath, "w", encoding="utf-8", newline="") as f:
+        f.write("Trade ID;Date(UTC);Side;Price;Executed;Total\n")
+        for i in range(rows):
+            price = 30000 - (i % 1000) * 7.5
+            executed = 0.001 + (i % 50) / 100000
+            side = "SELL" if i % 10 == 9 else "BUY"
+            moment = (start + timedelta(seconds=i)).strftime("%Y-%m-%d %H:%M:%S")
+            line = f"T{i};{moment};{side};{price:.2f};{executed:.6f};{price * executed:.2f}\n"
+            # Даты содержат только «-» и «:», поэтому точка встречается лишь в числах
+            f.write(line.replace(".", ","))
+
+
+def main(sizes):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        print(f"{'Строк':>10} | {'Покупок':>10} | {'Время, с':>9} | {'Строк/с':>9} | {'МБ/с':>6} | {'Пик RSS, МБ':>11}")
+        for size in sizes:
+            filepath = Path(tmp) / f"trades_{size}.csv"
+            write_statement(filepath, size)
+
+            manager = AssetManager(storage=SQLiteStorageBackend(Path(tmp) / f"bench_{size}.db"))
+            manager.create_asset("BENCH")
+            report = TradeImporter.import_csv(manager, filepath)
+            manager.shutdown()
+
+            # ru_maxrss в Linux - в килобайтах
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(
+                f"{size:>10} | {report.imported:>10} | {report.elapsed:>9.2f} | "
+                f"{report.rows_per_second:>9.0f} | {report.megabytes_per_second:>6.1f} | {peak:>11.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100_000, 1_000_000])
@@ -1,13 +1,52 @@
-import customtkinter as ctk
-from src.ui.main_window import MainWindow
+import os
+import sys
+import time
+
+# Момент запуска интерпретатора до импорта интерфейса (для режима профилирования)
+_STARTED_AT = time.perf_counter()
+
+# Тяжелые библиотеки, которые не должны загружаться до показа окна
+HEAVY_MODULES = ("pandas", "openpyxl", "numpy")
+
+
+def _is_startup_profiling() -> bool:
+    """Включен ли режим измерения времени запуска (--profile-startup или AVERAGING_PROFILE_STARTUP=1)"""
+    return "--profile-startup" in sys.argv or os.environ.get("AVERAGING_PROFILE_STARTUP") == "1"
+
+
+def _report_startup(phases: list[tuple[str, float]]):
+    """Печатает длительность фаз запуска и загруженные тяжелые модули"""
+    print("Профиль запуска:", file=sys.stderr)
+    previous = _STARTED_AT
+    for name, moment in phases:
+        print(f"  {name:<22} {(moment - previous) * 1000:8.1f} мс", file=sys.stderr)
+        previous = moment
+    print(f"  {'итого':<22} {(previous - _STARTED_AT) * 1000:8.1f} мс", file=sys.stderr)
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+    print(f"  тяжелые модули до показа окна: {', '.join(loaded) or 'нет'}", file=sys.stderr)
 
 
 def main():
     """Точка входа в приложение"""
+    profile = _is_startup_profiling()
+    phases = []
+
+    from src.ui.main_window import MainWindow
+    phases.append(("импорт интерфейса", time.perf_counter()))
+
     app = MainWindow()
+    phases.append(("создание окна", time.perf_counter()))
+
+    if profile:
+        def on_first_paint():
+            # Окно отрисовано, когда обработаны все отложенные задачи геометрии и отрисовки
+            app.update_idletasks()
+            phases.append(("первая отрисовка", time.perf_counter()))
+            _report_startup(phases)
+        app.after_idle(on_first_paint)
+
     app.mainloop()
 
 
 if __name__ == "__main__":
     main()
-
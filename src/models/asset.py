@@ -1,18 +1,187 @@
 from dataclasses import dataclass, field
 from decimal import Decimal
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+from src.models.sale import Sale
+from src.models.lot_engine import LotEngine
+from src.models.position_aggregate import PositionAggregate
 from src.utils.currency import Currency
 
 
-@dataclass
+@dataclass(slots=True)
 class Asset:
     """Модель актива"""
     name: str  # Название актива (BTC, ETH, AAPL и т.д.)
     currency: Currency  # Валюта для этого актива
     drawdown_percent: Decimal  # Процент просадки
-    purchases: List[Purchase] = field(default_factory=list)  # Список покупок
+    purchases: PurchaseStore = field(default_factory=PurchaseStore)  # Покупки в колоночном хранилище
     created_at: datetime = field(default_factory=datetime.now)  # Дата создания
     updated_at: datetime = field(default_factory=datetime.now)  # Дата последнего обновления
+    sales: List[Sale] = field(default_factory=list)  # Список продаж
+    lot_method: str = LotEngine.FIFO  # Метод сопоставления продаж с покупками
+    next_purchase_id: int = 1  # Следующий ID покупки (только растет, ID удаленных покупок не переиспользуются)
+    next_sale_id: int = 1  # Следующий ID продажи (только растет, как next_purchase_id)
+    # Текущие итоги позиции (не сохраняются, строятся по списку покупок)
+    aggregate: PositionAggregate = field(default_factory=PositionAggregate, init=False, repr=False, compare=False)
+    # Открытые лоты и реализованная прибыль (не сохраняются, строятся по покупкам и продажам
+    # при первом обращении к lots; пока продаж нет, позицию описывают итоги aggregate)
+    _lots: Optional[LotEngine] = field(default=None, init=False, repr=False, compare=False)
 
+    def __post_init__(self):
+        if not isinstance(self.purchases, PurchaseStore):
+            self.purchases = PurchaseStore(self.purchases)
+        self.next_purchase_id = max(self.next_purchase_id, self.purchases.max_id() + 1)
+        self.next_sale_id = max(self.next_sale_id, max((sale.id for sale in self.sales), default=0) + 1)
+        self.rebuild_aggregate()
+
+    @property
+    def lots(self) -> LotEngine:
+        """Учет лотов; строится по всей истории при первом обращении (продажа или запрос лотов)"""
+        if self._lots is None:
+            self._lots = LotEngine.replay(self.purchases, self.sales, self.lot_method)
+        return self._lots
+
+    @property
+    def has_lots(self) -> bool:
+        """Построен ли учет лотов (для оценки объема в памяти)"""
+        return self._lots is not None
+
+    def rebuild_aggregate(self) -> None:
+        """Пересчитывает итоги позиции по всей истории; учет лотов строится заново при обращении"""
+        self.aggregate = PositionAggregate.from_purchases(self.purchases)
+        self.rebuild_lots()
+
+    def rebuild_lots(self) -> None:
+        """Сбрасывает учет лотов: он будет построен по всей истории при следующем обращении"""
+        self._lots = None
+
+    def allocate_purchase_id(self) -> int:
+        """Выдает ID для новой покупки за O(1)"""
+        purchase_id = self.next_purchase_id
+        self.next_purchase_id += 1
+        return purchase_id
+
+    def add_purchase(self, purchase: Purchase) -> None:
+        """Добавляет покупку и обновляет итоги за O(1)"""
+        self.purchases.append(purchase)
+        self.next_purchase_id = max(self.next_purchase_id, purchase.id + 1)
+        self.aggregate.add(purchase)
+        if self._lots is not None:
+            if self._lots.follows(purchase.timestamp, LotEngine.PURCHASE, purchase.id):
+                self._lots.add_purchase(purchase)
+            else:
+                # Покупка задним числом меняет порядок лотов и сопоставление продаж - учет строится заново
+                self.rebuild_lots()
+
+    def remove_purchase(self, purchase_id: int) -> Optional[Purchase]:
+        """
+        Удаляет покупку по ID и обновляет итоги за O(1); возвращает удаленную покупку или None.
+        Если после удаления продажи превысили бы остаток, покупка не удаляется (ValueError).
+        """
+        purchase = self.purchases.get(purchase_id)
+        if purchase is None:
+            return None
+        if self.sales:
+            # Лот мог быть уже частично продан, поэтому учет строится заново до изменения списка
+            remaining = (p for p in self.purchases if p.id != purchase_id)
+            self._lots = LotEngine.replay(remaining, self.sales, self.lot_method)
+        elif self._lots is not None:
+            self._lots.remove_purchase(purchase)
+        self.purchases.remove(purchase_id)
+        self.aggregate.remove(purchase)
+        return purchase
+
+    def remove_purchases(self, purchase_ids: List[int]) -> List[Purchase]:
+        """
+        Удаляет несколько покупок по ID; учет лотов при продажах пересчитывается один раз.
+        Все ID проверяются до изменения актива: при отсутствующем ID (KeyError)
+        или превышении остатка продажами (ValueError) актив не меняется
+        """
+        purchases = []
+        for purchase_id in dict.fromkeys(purchase_ids):
+            purchase = self.purchases.get(purchase_id)
+            if purchase is None:
+                raise KeyError(f"Покупка с ID {purchase_id} не найдена")
+            purchases.append(purchase)
+        if self.sales:
+            removed = {purchase.id for purchase in purchases}
+            remaining = (p for p in self.purchases if p.id not in removed)
+            self._lots = LotEngine.replay(remaining, self.sales, self.lot_method)
+        elif self._lots is not None:
+            for purchase in purchases:
+                self._lots.remove_purchase(purchase)
+        for purchase in purchases:
+            self.purchases.remove(purchase.id)
+            self.aggregate.remove(purchase)
+        return purchases
+
+    def replace_purchase(self, purchase: Purchase) -> Purchase:
+        """
+        Заменяет покупку с тем же ID исправленной (сумма, цена, дата) на ее месте; возвращает прежнюю.
+        Итоги обновляются за O(1), ряд безубыточной точки - за O(log n).
+        KeyError, если покупки нет; ValueError, если после исправления продажи превысили бы остаток
+        (актив при этом не меняется)
+        """
+        previous = self.purchases.get(purchase.id)
+        if previous is None:
+            raise KeyError(f"Покупка с ID {purchase.id} не найдена")
+        if self.sales:
+            # Лот мог быть уже частично продан - учет строится заново до изменения
+            replaced = (purchase if p.id == purchase.id else p for p in self.purchases)
+            self._lots = LotEngine.replay(replaced, self.sales, self.lot_method)
+        elif self._lots is not None:
+            if purchase.timestamp != previous.timestamp or (
+                self.lot_method == LotEngine.HIFO and purchase.price != previous.price
+            ):
+                # Лот меняет место в порядке лотов (новая дата или место в куче) - учет строится заново при обращении
+                self.rebuild_lots()
+            else:
+                self._lots.replace_purchase(previous, purchase)
+        self.purchases.replace(purchase)
+        self.aggregate.replace(previous, purchase)
+        return previous
+
+    def restore_purchases(self, purchases: List[Purchase]) -> None:
+        """
+        Возвращает ранее удаленные покупки на их места.
+        ID выдаются по возрастанию, поэтому порядок добавления восстанавливается сортировкой по ID
+        """
+        merged = sorted([*self.purchases, *purchases], key=lambda p: p.id)
+        self.purchases = PurchaseStore(merged)
+        self.next_purchase_id = max(self.next_purchase_id, merged[-1].id + 1 if merged else 1)
+        self.rebuild_aggregate()
+
+    def add_sale(self, sale: Sale) -> Decimal:
+        """
+        Добавляет продажу, закрывая открытые лоты; возвращает реализованную прибыль продажи
+        (для продажи задним числом - изменение общей реализованной прибыли).
+        ValueError, если продажа превышает открытое количество (актив при этом не меняется)
+        """
+        lots = self.lots
+        if lots.follows(sale.timestamp, LotEngine.SALE, sale.id):
+            pnl = lots.sell(sale)
+        else:
+            # Продажа раньше уже учтенных событий: учет строится заново вместе с ней
+            self._lots = LotEngine.replay(self.purchases, [*self.sales, sale], self.lot_method)
+            pnl = self._lots.realized_pnl - lots.realized_pnl
+        self.sales.append(sale)
+        self.next_sale_id = max(self.next_sale_id, sale.id + 1)
+        return pnl
+
+    def remove_sale(self, sale_id: int) -> Optional[Sale]:
+        """Удаляет продажу по ID и пересчитывает учет лотов; возвращает удаленную продажу или None"""
+        for i, sale in enumerate(self.sales):
+            if sale.id == sale_id:
+                self.sales.pop(i)
+                self.rebuild_lots()
+                return sale
+        return None
+
+    def set_lot_method(self, method: str) -> None:
+        """Меняет метод учета лотов; реализованная прибыль пересчитывается при обращении к lots"""
+        if method not in LotEngine.METHODS:
+            raise ValueError(f"Неизвестный метод учета лотов: {method}")
+        self.lot_method = method
+        self.rebuild_lots()
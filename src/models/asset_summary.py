@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from src.models.asset import Asset
+from src.utils.currency import Currency
+
+
+@dataclass
+class AssetSummary:
+    """Краткая сводка по активу для списка активов (без загрузки всех покупок)"""
+    name: str
+    currency: Currency
+    drawdown_percent: Decimal
+    purchase_count: int
+    total_investment: Decimal
+    total_quantity: Decimal
+    updated_at: datetime
+
+    @classmethod
+    def from_asset(cls, asset: Asset) -> 'AssetSummary':
+        """Строит сводку по итогам позиции актива за O(1)"""
+        aggregate = asset.aggregate
+        return cls(
+            name=asset.name,
+            currency=asset.currency,
+            drawdown_percent=asset.drawdown_percent,
+            purchase_count=aggregate.count,
+            total_investment=aggregate.total_investment,
+            total_quantity=aggregate.total_quantity,
+            updated_at=asset.updated_at
+        )
+
+    @property
+    def break_even(self) -> Decimal | None:
+        """Средняя цена входа или None, если покупок нет"""
+        if self.purchase_count == 0 or self.total_quantity == 0:
+            return None
+        return self.total_investment / self.total_quantity
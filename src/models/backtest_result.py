@@ -0,0 +1,34 @@
+import bisect
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from src.models.purchase import Purchase
+from src.models.position_aggregate import PositionAggregate
+
+
+@dataclass
+class BacktestResult:
+    """Результат прогона правила усреднения по историческим ценам одного инструмента"""
+    symbol: str
+    purchases: List[Purchase] = field(default_factory=list)
+    # Безубыточная точка меняется только при покупке, поэтому ряд хранится как ступенчатая функция:
+    # (время покупки, безубыточная точка после нее); время растет в порядке строк файла
+    break_even_series: List[Tuple[datetime, Decimal]] = field(default_factory=list)
+    bars: int = 0  # Количество обработанных строк (баров или тиков)
+    last_price: Optional[Decimal] = None  # Последняя цена в файле
+
+    @property
+    def aggregate(self) -> PositionAggregate:
+        """Итоги позиции по всем покупкам"""
+        return PositionAggregate.from_purchases(self.purchases)
+
+    @property
+    def break_even(self) -> Decimal | None:
+        """Безубыточная точка в конце прогона"""
+        return self.break_even_series[-1][1] if self.break_even_series else None
+
+    def break_even_at(self, moment: datetime) -> Decimal | None:
+        """Безубыточная точка на момент moment (по последней покупке не позже него), O(log n)"""
+        count = bisect.bisect_right(self.break_even_series, moment, key=lambda point: point[0])
+        return self.break_even_series[count - 1][1] if count else None
@@ -0,0 +1,238 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from src.models.fenwick_tree import FenwickTree
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+_INT64_MAX = 2 ** 63 - 1
+
+
+@dataclass
+class BreakEvenSeries:
+    """
+    Безубыточная точка после каждой покупки в порядке времени покупок.
+    Хранит накопленные суммы вложений и количества (префиксные суммы), поэтому безубыточная точка
+    после N-й покупки считается за O(1), а на дату или за интервал дат - двоичным поиском за O(log n).
+    Покупки с одинаковым временем идут в порядке добавления.
+    Покупка, добавленная в конец не раньше последней точки, дописывается в ряд за O(1) амортизированно:
+    массивы растут с запасом, как list.
+    После первого исправления или удаления покупки (update, remove) суммы ведутся в деревьях Фенвика:
+    изменение и любой запрос - O(log n), массивы накопленных сумм при этом больше не используются
+    и не дописываются. Точка удаленной покупки остается в ряду с нулевым весом, как надгробие
+    в хранилище; живые точки считает отдельное дерево.
+    Позиции - позиции в массивах хранилища, включая надгробия (см. PurchaseStore).
+    """
+    timestamps: "np.ndarray"  # Время точек по возрастанию, datetime64[us], форма (N,)
+    investment: "np.ndarray"  # Накопленная сумма вложений в единицах 10**-8, форма (N,)
+    quantity: "np.ndarray"  # Накопленное количество в единицах 10**-8, форма (N,)
+    positions: "np.ndarray"  # Позиция покупки в хранилище для каждой точки ряда, форма (N,)
+    ranks: "np.ndarray"  # Номер точки ряда для каждой позиции хранилища (обратная перестановка)
+    investment_tree: Optional[FenwickTree] = field(default=None, repr=False, compare=False)
+    quantity_tree: Optional[FenwickTree] = field(default=None, repr=False, compare=False)
+    alive_tree: Optional[FenwickTree] = field(default=None, repr=False, compare=False)  # 1 у живых точек
+    removed: int = 0  # Точек удаленных покупок
+    _buffers: Optional[Dict[str, "np.ndarray"]] = field(default=None, repr=False, compare=False)  # Массивы с запасом
+
+    _COLUMNS = ("timestamps", "investment", "quantity", "positions", "ranks")
+
+    def __len__(self) -> int:
+        """Количество живых покупок"""
+        return len(self.timestamps) - self.removed
+
+    def at(self, count: int) -> Optional[Decimal]:
+        """Безубыточная точка после первых count покупок по времени (None, если покупок нет)"""
+        if not 0 <= count <= len(self):
+            raise IndexError("Номер покупки вне диапазона")
+        if count == 0:
+            return None
+        if self.alive_tree is not None:
+            # Количество точек, включая удаленные, до count-й живой
+            count = self.alive_tree.search(count)
+        return BreakEvenSeries._ratio(*self._prefix(count))
+
+    def after_purchase(self, position: int) -> Optional[Decimal]:
+        """Безубыточная точка сразу после покупки на позиции position хранилища"""
+        return BreakEvenSeries._ratio(*self._prefix(int(self.ranks[position]) + 1))
+
+    def is_latest(self, position: int) -> bool:
+        """Самая ли поздняя по времени среди живых покупок покупка на позиции position хранилища"""
+        rank = int(self.ranks[position])
+        if self.alive_tree is None:
+            return rank == len(self.timestamps) - 1
+        return self.alive_tree.prefix_sum(rank + 1) == len(self)
+
+    def as_of(self, moment: datetime) -> Optional[Decimal]:
+        """Безубыточная точка с учетом покупок, сделанных не позже moment"""
+        import numpy as np
+
+        count = int(np.searchsorted(self.timestamps, np.datetime64(moment, "us"), side="right"))
+        return BreakEvenSeries._ratio(*self._prefix(count)) if count else None
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Optional[Decimal]:
+        """Средняя цена покупок со временем в интервале [start, end] (None, если покупок нет)"""
+        import numpy as np
+
+        first = 0 if start is None else int(np.searchsorted(self.timestamps, np.datetime64(start, "us"), side="left"))
+        last = len(self.timestamps) if end is None else int(
+            np.searchsorted(self.timestamps, np.datetime64(end, "us"), side="right")
+        )
+        if last <= first:
+            return None
+        investment, quantity = self._prefix(last)
+        if first:
+            skipped_investment, skipped_quantity = self._prefix(first)
+            investment -= skipped_investment
+            quantity -= skipped_quantity
+        return BreakEvenSeries._ratio(investment, quantity)
+
+    def values(self) -> "np.ndarray":
+        """Безубыточная точка после каждой живой покупки по времени, float64 (NaN при нулевом количестве)"""
+        import numpy as np
+
+        values = self._point_values()
+        if self.alive_tree is not None:
+            values = values[np.diff(self.alive_tree.prefix_sums(), prepend=0).astype(bool)]
+        return values
+
+    def per_purchase(self, positions: "np.ndarray") -> "np.ndarray":
+        """Безубыточная точка после покупок на позициях positions хранилища (для таблицы и экспорта)"""
+        return self._point_values()[self.ranks[positions]]
+
+    def update(
+        self,
+        position: int,
+        investment_delta: int,
+        quantity_delta: int,
+        moment: Optional[datetime] = None
+    ) -> None:
+        """
+        Учитывает исправление покупки на позиции position хранилища за O(log n):
+        разницу суммы и количества (в единицах 10**-8) и новое время moment,
+        которое должно оставить покупку на том же месте ряда (см. keeps_order)
+        """
+        self._build_trees()
+        rank = int(self.ranks[position])
+        self.investment_tree.add(rank, investment_delta)
+        self.quantity_tree.add(rank, quantity_delta)
+        if moment is not None:
+            import numpy as np
+
+            self.timestamps[rank] = np.datetime64(moment, "us")
+
+    def remove(self, position: int, investment_units: int, quantity_units: int) -> None:
+        """
+        Учитывает удаление покупки на позиции position хранилища за O(log n):
+        ее сумма и количество (в единицах 10**-8) вычитаются, точка остается с нулевым весом
+        """
+        import numpy as np
+
+        self._build_trees()
+        if self.alive_tree is None:
+            self.alive_tree = FenwickTree.from_prefix_sums(np.arange(1, len(self.timestamps) + 1))
+        rank = int(self.ranks[position])
+        self.investment_tree.add(rank, -investment_units)
+        self.quantity_tree.add(rank, -quantity_units)
+        self.alive_tree.add(rank, -1)
+        self.removed += 1
+
+    def append(self, moment: "np.datetime64", investment_units: int, quantity_units: int, position: int) -> None:
+        """
+        Дописывает точку для покупки, добавленной в конец хранилища на позицию position,
+        время которой не раньше последней точки: O(1) амортизированно, с деревьями - O(log n)
+        """
+        import numpy as np
+
+        size = len(self.timestamps)
+        buffers = self._buffers
+        if buffers is None or size == len(buffers["timestamps"]):
+            capacity = max(2 * size, 16)
+            buffers = {}
+            for name in BreakEvenSeries._COLUMNS:
+                values = getattr(self, name)
+                buffers[name] = np.empty(capacity, dtype=values.dtype)
+                # С деревьями накопленные суммы не дописываются и могут быть короче ряда
+                buffers[name][:len(values)] = values
+            self._buffers = buffers
+
+        columns = ["timestamps", "positions", "ranks"]
+        if self.investment_tree is not None:
+            self.investment_tree.append(investment_units)
+            self.quantity_tree.append(quantity_units)
+        else:
+            for name, units in (("investment", investment_units), ("quantity", quantity_units)):
+                total = (int(buffers[name][size - 1]) if size else 0) + units
+                if buffers[name].dtype != object and abs(total) > _INT64_MAX:
+                    buffers[name] = buffers[name].astype(object)
+                buffers[name][size] = total
+                columns.append(name)
+        if self.alive_tree is not None:
+            self.alive_tree.append(1)
+        buffers["timestamps"][size] = moment
+        buffers["positions"][size] = position
+        # Позиция не больше длины ряда: хранилище отрезает хвостовые надгробия, ряд - нет
+        buffers["ranks"][position] = size
+        for name in columns:
+            setattr(self, name, buffers[name][:size + 1])
+
+    def keeps_order(self, position: int, moment: datetime) -> bool:
+        """Останется ли покупка на том же месте ряда, если ее время станет moment"""
+        import numpy as np
+
+        rank = int(self.ranks[position])
+        moment = np.datetime64(moment, "us")
+        if rank > 0 and not self.timestamps[rank - 1] < moment:
+            return False
+        return rank + 1 >= len(self.timestamps) or moment < self.timestamps[rank + 1]
+
+    def copy(self) -> 'BreakEvenSeries':
+        """
+        Независимая копия (ряд меняется при исправлении и удалении покупок). Накопленные суммы
+        и позиции общие: оригинал дописывает их только за пределами части буферов, видимой копии
+        """
+        return BreakEvenSeries(
+            timestamps=self.timestamps.copy(),
+            investment=self.investment,
+            quantity=self.quantity,
+            positions=self.positions,
+            ranks=self.ranks.copy(),
+            investment_tree=self.investment_tree.copy() if self.investment_tree is not None else None,
+            quantity_tree=self.quantity_tree.copy() if self.quantity_tree is not None else None,
+            alive_tree=self.alive_tree.copy() if self.alive_tree is not None else None,
+            removed=self.removed
+        )
+
+    def _build_trees(self) -> None:
+        """Переводит суммы в деревья Фенвика (один раз, при первом исправлении или удалении)"""
+        if self.investment_tree is None:
+            self.investment_tree = FenwickTree.from_prefix_sums(self.investment)
+            self.quantity_tree = FenwickTree.from_prefix_sums(self.quantity)
+
+    def _point_values(self) -> "np.ndarray":
+        """Безубыточная точка после каждой точки ряда, включая точки удаленных покупок"""
+        import numpy as np
+
+        if self.investment_tree is not None:
+            investment = np.array(self.investment_tree.prefix_sums(), dtype=object).astype(float)
+            quantity = np.array(self.quantity_tree.prefix_sums(), dtype=object).astype(float)
+        else:
+            investment = self.investment.astype(float)
+            quantity = self.quantity.astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(quantity > 0, investment / quantity, np.nan)
+
+    def _prefix(self, count: int) -> Tuple[int, int]:
+        """Накопленные сумма вложений и количество первых count точек ряда"""
+        if self.investment_tree is not None:
+            return self.investment_tree.prefix_sum(count), self.quantity_tree.prefix_sum(count)
+        return int(self.investment[count - 1]), int(self.quantity[count - 1])
+
+    @staticmethod
+    def _ratio(investment, quantity) -> Optional[Decimal]:
+        """Отношение накопленных сумм (масштаб 10**-8 сокращается)"""
+        if not quantity:
+            return None
+        return Decimal(int(investment)) / Decimal(int(quantity))
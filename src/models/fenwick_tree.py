@@ -0,0 +1,107 @@
+from typing import TYPE_CHECKING, List
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class FenwickTree:
+    """
+    Дерево Фенвика (двоичное индексированное дерево) над целыми числами Python:
+    изменение элемента и сумма первых count элементов за O(log n), без переполнения.
+    """
+
+    __slots__ = ("_tree",)
+
+    def __init__(self, size: int = 0):
+        self._tree: List[int] = [0] * (size + 1)  # Узлы с 1; узел i хранит сумму (i - lowbit(i), i]
+
+    @classmethod
+    def from_prefix_sums(cls, prefix_sums: "np.ndarray") -> 'FenwickTree':
+        """Строит дерево по готовым префиксным суммам за O(n) одним векторным проходом"""
+        import numpy as np
+
+        tree = cls()
+        size = len(prefix_sums)
+        if not size:
+            return tree
+        padded = np.concatenate((np.zeros(1, dtype=prefix_sums.dtype), prefix_sums))
+        nodes = np.arange(1, size + 1)
+        tree._tree = [0] + [int(value) for value in (padded[nodes] - padded[nodes - (nodes & -nodes)]).tolist()]
+        return tree
+
+    def add(self, index: int, delta: int) -> None:
+        """Прибавляет delta к элементу index (с 0)"""
+        tree = self._tree
+        size = len(tree) - 1
+        if not 0 <= index < size:
+            raise IndexError("Индекс вне диапазона")
+        node = index + 1
+        while node <= size:
+            tree[node] += delta
+            node += node & -node
+
+    def append(self, value: int) -> None:
+        """Добавляет элемент в конец за O(log n)"""
+        tree = self._tree
+        node = len(tree)
+        # Новый узел хранит сумму (node - lowbit(node), node]: сам элемент и уже добавленный хвост
+        total = value
+        child = node - 1
+        stop = node - (node & -node)
+        while child > stop:
+            total += tree[child]
+            child &= child - 1
+        tree.append(total)
+
+    def pop(self) -> None:
+        """Удаляет последний элемент за O(1): другие узлы его не включают"""
+        if len(self._tree) == 1:
+            raise IndexError("Дерево пустое")
+        self._tree.pop()
+
+    def search(self, target: int) -> int:
+        """
+        Наименьшее count, при котором сумма первых count элементов не меньше target,
+        за O(log n) (элементы должны быть неотрицательными, например счетчики 0/1)
+        """
+        tree = self._tree
+        size = len(tree) - 1
+        count = 0
+        step = 1 << size.bit_length()
+        while step:
+            node = count + step
+            if node <= size and tree[node] < target:
+                count = node
+                target -= tree[node]
+            step >>= 1
+        if count >= size:
+            raise IndexError("Сумма всех элементов меньше искомой")
+        return count + 1
+
+    def prefix_sum(self, count: int) -> int:
+        """Сумма первых count элементов"""
+        tree = self._tree
+        if not 0 <= count < len(tree):
+            raise IndexError("Индекс вне диапазона")
+        total = 0
+        while count:
+            total += tree[count]
+            count &= count - 1
+        return total
+
+    def prefix_sums(self) -> List[int]:
+        """Все префиксные суммы по порядку за O(n)"""
+        tree = self._tree
+        sums = [0] * len(tree)
+        for node in range(1, len(tree)):
+            sums[node] = tree[node] + sums[node & (node - 1)]
+        return sums[1:]
+
+    def copy(self) -> 'FenwickTree':
+        """Независимая копия"""
+        tree = FenwickTree()
+        tree._tree = self._tree[:]
+        return tree
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
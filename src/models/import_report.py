@@ -0,0 +1,25 @@
+from dataclasses import dataclass, field
+from typing import List
+
+
+@dataclass
+class ImportReport:
+    """Итоги импорта сделок из файла"""
+    rows: int = 0  # Прочитано строк данных
+    imported: int = 0  # Добавлено покупок
+    duplicates: int = 0  # Отброшено дублей по ID сделки
+    skipped: int = 0  # Пропущено строк, которые не являются покупками
+    invalid: int = 0  # Строк с ошибками
+    errors: List[str] = field(default_factory=list)  # Первые ошибки: «строка N: сообщение»
+    bytes_read: int = 0  # Прочитано байт файла (во время импорта - с упреждающим чтением, после - точно)
+    elapsed: float = 0.0  # Время импорта, секунд
+
+    @property
+    def rows_per_second(self) -> float:
+        """Скорость обработки, строк в секунду"""
+        return self.rows / self.elapsed if self.elapsed > 0 else 0.0
+
+    @property
+    def megabytes_per_second(self) -> float:
+        """Скорость чтения файла, МБ в секунду"""
+        return self.bytes_read / 1_000_000 / self.elapsed if self.elapsed > 0 else 0.0
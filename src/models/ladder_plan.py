@@ -0,0 +1,40 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Iterator, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass
+class LadderPlan:
+    """
+    План серии будущих докупок (лестница).
+    Все массивы имеют форму (..., levels): последняя ось - шаги лестницы,
+    ведущие оси - наборы параметров, если лестница считалась пакетно.
+    """
+    prices: "np.ndarray"  # Цена каждой докупки
+    investments: "np.ndarray"  # Сумма каждой докупки
+    quantities: "np.ndarray"  # Количество, купленное на каждом шаге
+    cumulative_investment: "np.ndarray"  # Общая сумма вложений после шага (с учетом текущей позиции)
+    cumulative_quantity: "np.ndarray"  # Общее количество после шага (с учетом текущей позиции)
+    break_even: "np.ndarray"  # Безубыточная точка после шага
+
+    @property
+    def levels(self) -> int:
+        """Количество шагов лестницы"""
+        return self.prices.shape[-1]
+
+    def rows(self, *index) -> Iterator[Tuple[int, float, float, float, float, float]]:
+        """
+        Перебирает шаги одного плана: (номер шага, цена, сумма, общая сумма, общее количество, безубыточная точка).
+        Для пакетного расчета index выбирает набор параметров.
+        """
+        columns = (
+            self.prices[index],
+            self.investments[index],
+            self.cumulative_investment[index],
+            self.cumulative_quantity[index],
+            self.break_even[index]
+        )
+        for step, values in enumerate(zip(*(column.tolist() for column in columns)), start=1):
+            yield (step, *values)
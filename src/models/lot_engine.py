@@ -0,0 +1,215 @@
+import heapq
+from collections import deque
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, List, Optional, Tuple
+from src.models.purchase import Purchase
+from src.models.sale import Sale
+
+
+@dataclass(slots=True)
+class Lot:
+    """Открытый лот: остаток одной покупки и его себестоимость"""
+    purchase_id: int
+    quantity: Decimal  # Оставшееся количество
+    cost: Decimal  # Себестоимость оставшегося количества
+
+
+class LotEngine:
+    """
+    Учет лотов: сопоставляет продажи с открытыми покупками и ведет реализованную прибыль.
+    FIFO и LIFO используют deque, HIFO - кучу по цене покупки, AVERAGE - только итоги,
+    поэтому продажа обрабатывает лишь закрываемые ею лоты и не перебирает весь список.
+    """
+
+    FIFO = "fifo"  # Первым продается самый ранний лот
+    LIFO = "lifo"  # Первым продается самый поздний лот
+    HIFO = "hifo"  # Первым продается самый дорогой лот
+    AVERAGE = "average"  # Себестоимость по средней цене всех открытых лотов
+    METHODS = (FIFO, LIFO, HIFO, AVERAGE)
+
+    # Вид события в ключе хронологического порядка (при равном времени покупка раньше продажи)
+    PURCHASE = 0
+    SALE = 1
+
+    def __init__(self, method: str = FIFO):
+        if method not in LotEngine.METHODS:
+            raise ValueError(f"Неизвестный метод учета лотов: {method}")
+        self.method = method
+        self._lots: deque = deque()  # FIFO и LIFO
+        self._heap: List[Tuple[Decimal, int, Lot]] = []  # HIFO: (-цена покупки, порядок, лот)
+        self._order = 0  # Порядок добавления лотов (для устойчивой кучи)
+        self._removed: set = set()  # ID удаленных покупок, лоты которых еще лежат в deque/куче
+        self._replaced: dict = {}  # ID исправленных покупок -> новая покупка (лот обновляется при обращении)
+        self.open_quantity = Decimal('0')  # Количество в открытых лотах
+        self.open_cost = Decimal('0')  # Себестоимость открытых лотов
+        self.realized_pnl = Decimal('0')  # Реализованная прибыль/убыток
+        self.sold_quantity = Decimal('0')  # Всего продано
+        self.last_event: Optional[tuple] = None  # Ключ (время, вид, ID) последнего учтенного события
+
+    @classmethod
+    def replay(cls, purchases: Iterable[Purchase], sales: Iterable[Sale], method: str = FIFO) -> 'LotEngine':
+        """
+        Строит учет по истории: покупки и продажи применяются в хронологическом порядке
+        (при равном времени покупка учитывается раньше продажи)
+        """
+        engine = cls(method)
+        events = [(p.timestamp, cls.PURCHASE, p.id, p) for p in purchases]
+        events += [(s.timestamp, cls.SALE, s.id, s) for s in sales]
+        events.sort(key=lambda event: event[:3])
+        for _, kind, _, event in events:
+            if kind == cls.PURCHASE:
+                engine.add_purchase(event)
+            else:
+                engine.sell(event)
+        return engine
+
+    def follows(self, timestamp, kind: int, event_id: int) -> bool:
+        """
+        Идет ли событие после всех уже учтенных в порядке replay.
+        Только такое событие можно учесть без replay: лоты FIFO/LIFO лежат в deque в порядке времени,
+        а покупка или продажа задним числом изменила бы сопоставление уже учтенных продаж
+        """
+        return self.last_event is None or self.last_event < (timestamp, kind, event_id)
+
+    def add_purchase(self, purchase: Purchase) -> None:
+        """
+        Открывает лот для покупки за O(1) (O(log n) для HIFO).
+        Покупки учитываются в хронологическом порядке (см. follows)
+        """
+        lot = Lot(purchase.id, purchase.quantity, purchase.investment)
+        if self.method == LotEngine.HIFO:
+            self._order += 1
+            heapq.heappush(self._heap, (-purchase.price, self._order, lot))
+        elif self.method != LotEngine.AVERAGE:
+            self._lots.append(lot)
+        self.open_quantity += purchase.quantity
+        self.open_cost += purchase.investment
+        self.last_event = (purchase.timestamp, LotEngine.PURCHASE, purchase.id)
+
+    def remove_purchase(self, purchase: Purchase) -> None:
+        """
+        Исключает лот удаленной покупки за O(1): лот помечается и выбрасывается при следующем обращении.
+        Только пока продаж не было (иначе лот мог быть частично продан - нужен replay).
+        """
+        if self.sold_quantity:
+            raise ValueError("После продаж учет лотов нужно строить заново")
+        if self.method != LotEngine.AVERAGE:
+            self._removed.add(purchase.id)
+            self._replaced.pop(purchase.id, None)
+        self.open_quantity -= purchase.quantity
+        self.open_cost -= purchase.investment
+
+    def replace_purchase(self, previous: Purchase, purchase: Purchase) -> None:
+        """
+        Заменяет лот исправленной покупки за O(1): новые количество и себестоимость
+        подставляются в лот при следующем обращении к нему.
+        Только пока продаж не было и дата не изменилась (лоты и last_event идут в порядке времени);
+        для HIFO - только если цена не изменилась (место в куче то же)
+        """
+        if self.sold_quantity:
+            raise ValueError("После продаж учет лотов нужно строить заново")
+        if purchase.timestamp != previous.timestamp:
+            raise ValueError("Дата покупки определяет порядок лотов - учет нужно строить заново")
+        if self.method == LotEngine.HIFO and purchase.price != previous.price:
+            raise ValueError("Цена покупки определяет порядок лотов HIFO - учет нужно строить заново")
+        if self.method != LotEngine.AVERAGE:
+            self._replaced[purchase.id] = purchase
+        self.open_quantity += purchase.quantity - previous.quantity
+        self.open_cost += purchase.investment - previous.investment
+
+    def sell(self, sale: Sale) -> Decimal:
+        """
+        Закрывает лоты на количество продажи, возвращает реализованную прибыль этой продажи.
+        Продажи учитываются в хронологическом порядке (см. follows)
+        """
+        if sale.quantity <= 0:
+            raise ValueError("Количество должно быть больше нуля")
+        if sale.quantity > self.open_quantity:
+            raise ValueError("Продажа превышает количество в открытых лотах")
+
+        if self.method == LotEngine.AVERAGE:
+            cost = self.open_cost * sale.quantity / self.open_quantity
+        else:
+            cost = self._consume(sale.quantity)
+
+        self.open_quantity -= sale.quantity
+        if self.open_quantity == 0:
+            # Позиция закрыта полностью: себестоимость обнуляем без остатков округления
+            cost = self.open_cost
+        self.open_cost -= cost
+        pnl = sale.proceeds - cost
+        self.realized_pnl += pnl
+        self.sold_quantity += sale.quantity
+        self.last_event = (sale.timestamp, LotEngine.SALE, sale.id)
+        return pnl
+
+    def _consume(self, quantity: Decimal) -> Decimal:
+        """Списывает количество с лотов по порядку метода, возвращает их себестоимость"""
+        cost = Decimal('0')
+        remaining = quantity
+        while remaining > 0:
+            lot = self._peek()
+            if lot.quantity <= remaining:
+                # Лот закрывается целиком
+                remaining -= lot.quantity
+                cost += lot.cost
+                self._pop()
+            else:
+                part = lot.cost * remaining / lot.quantity
+                lot.quantity -= remaining
+                lot.cost -= part
+                cost += part
+                remaining = Decimal('0')
+        return cost
+
+    def _peek(self) -> Lot:
+        """Лот, который продается следующим (лоты удаленных покупок выбрасываются по пути)"""
+        while True:
+            if self.method == LotEngine.HIFO:
+                lot = self._heap[0][2]
+            else:
+                lot = self._lots[0] if self.method == LotEngine.FIFO else self._lots[-1]
+            if lot.purchase_id not in self._removed:
+                if self._replaced:
+                    self._refresh(lot)
+                return lot
+            self._removed.discard(lot.purchase_id)
+            self._pop()
+
+    def _pop(self) -> None:
+        """Убирает полностью проданный лот"""
+        if self.method == LotEngine.HIFO:
+            heapq.heappop(self._heap)
+        elif self.method == LotEngine.FIFO:
+            self._lots.popleft()
+        else:
+            self._lots.pop()
+
+    def _refresh(self, lot: Lot) -> None:
+        """Подставляет в лот значения исправленной покупки, если она исправлялась"""
+        purchase = self._replaced.pop(lot.purchase_id, None)
+        if purchase is not None:
+            lot.quantity = purchase.quantity
+            lot.cost = purchase.investment
+
+    @property
+    def open_lots(self) -> List[Lot]:
+        """Открытые лоты в порядке продажи (для отображения; не для горячего пути)"""
+        if self.method == LotEngine.HIFO:
+            lots = [lot for _, _, lot in sorted(self._heap, key=lambda item: item[:2])]
+        elif self.method == LotEngine.LIFO:
+            lots = list(reversed(self._lots))
+        else:
+            lots = list(self._lots)
+        lots = [lot for lot in lots if lot.purchase_id not in self._removed]
+        for lot in lots:
+            self._refresh(lot)
+        return lots
+
+    @property
+    def break_even(self) -> Decimal | None:
+        """Безубыточная точка оставшейся позиции (себестоимость открытых лотов / их количество)"""
+        if self.open_quantity == 0:
+            return None
+        return self.open_cost / self.open_quantity
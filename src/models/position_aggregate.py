@@ -0,0 +1,59 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+
+
+@dataclass
+class PositionAggregate:
+    """Текущие итоги позиции, обновляемые инкрементально при добавлении/удалении покупок"""
+    total_investment: Decimal = Decimal('0')  # Сумма всех вложений
+    total_quantity: Decimal = Decimal('0')  # Количество всех купленных активов
+    count: int = 0  # Количество покупок
+
+    @classmethod
+    def from_purchases(cls, purchases: Iterable[Purchase]) -> 'PositionAggregate':
+        """Строит итоги по списку покупок (по колоночному хранилищу - векторными суммами)"""
+        if isinstance(purchases, PurchaseStore):
+            if not len(purchases):
+                return cls()
+            return cls(purchases.total("investment"), purchases.total("quantity"), len(purchases))
+        aggregate = cls()
+        for purchase in purchases:
+            aggregate.add(purchase)
+        return aggregate
+
+    def add(self, purchase: Purchase) -> None:
+        """Учитывает новую покупку за O(1)"""
+        self.total_investment += purchase.investment
+        self.total_quantity += purchase.quantity
+        self.count += 1
+
+    def remove(self, purchase: Purchase) -> None:
+        """Исключает покупку из итогов за O(1)"""
+        self.count -= 1
+        if self.count <= 0:
+            # Сбрасываем в ноль, чтобы не накапливать остатки округления
+            self.reset()
+            return
+        self.total_investment -= purchase.investment
+        self.total_quantity -= purchase.quantity
+
+    def replace(self, previous: Purchase, purchase: Purchase) -> None:
+        """Заменяет покупку в итогах исправленной за O(1)"""
+        self.total_investment += purchase.investment - previous.investment
+        self.total_quantity += purchase.quantity - previous.quantity
+
+    def reset(self) -> None:
+        """Обнуляет итоги"""
+        self.total_investment = Decimal('0')
+        self.total_quantity = Decimal('0')
+        self.count = 0
+
+    @property
+    def break_even(self) -> Decimal | None:
+        """Средняя цена входа (безубыточная точка) или None, если покупок нет"""
+        if self.count == 0 or self.total_quantity == 0:
+            return None
+        return self.total_investment / self.total_quantity
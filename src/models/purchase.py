@@ -1,9 +1,10 @@
 from dataclasses import dataclass
 from decimal import Decimal
 from datetime import datetime
+from typing import Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class Purchase:
     """Модель покупки актива"""
     id: int
@@ -11,6 +12,7 @@ class Purchase:
     price: Decimal  # Цена актива на момент покупки
     quantity: Decimal  # Количество купленных активов (investment / price)
     timestamp: datetime = None
+    trade_id: Optional[str] = None  # ID сделки на бирже (для импорта без дублей)
     
     def __post_init__(self):
         if self.timestamp is None:
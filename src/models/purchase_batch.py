@@ -0,0 +1,23 @@
+from dataclasses import dataclass, field
+from typing import List
+from src.models.purchase import Purchase
+
+
+@dataclass
+class PurchaseBatch:
+    """Одно пакетное изменение покупок актива (отменяется целиком)"""
+    ADDED = "added"
+    REMOVED = "removed"
+    EDITED = "edited"
+
+    kind: str  # ADDED, REMOVED или EDITED
+    purchases: List[Purchase] = field(default_factory=list)  # Удаленные или исправленные (прежние версии) покупки
+    # ID добавленных покупок (ADDED): выдаются подряд, поэтому хранится только диапазон, а не сами покупки
+    id_range: range = range(0)
+
+    @property
+    def ids(self) -> List[int]:
+        """ID покупок пакета"""
+        if self.kind == PurchaseBatch.ADDED:
+            return list(self.id_range)
+        return [purchase.id for purchase in self.purchases]
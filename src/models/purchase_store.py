@@ -0,0 +1,576 @@
+import bisect
+from array import array
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from src.models.break_even_series import BreakEvenSeries
+from src.models.fenwick_tree import FenwickTree
+from src.models.purchase import Purchase
+from src.utils.precision import QUANTITY_DECIMALS
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Суммы, цены и количества после политики точности имеют не больше 8 знаков после запятой
+STORE_DECIMALS = QUANTITY_DECIMALS
+DECIMAL_COLUMNS = ("investment", "price", "quantity")
+_SCALE = 10 ** STORE_DECIMALS
+_INT64_MAX = 2 ** 63 - 1
+_EPOCH = datetime(1970, 1, 1)
+_QUANTS = {exponent: Decimal(1).scaleb(exponent) for exponent in range(-128, 128)}
+
+
+def _from_units(units: int) -> Decimal:
+    """Переводит целое число единиц 10**-STORE_DECIMALS обратно в Decimal"""
+    return Decimal(units).scaleb(-STORE_DECIMALS)
+
+
+def _take(values: array, mask: "np.ndarray") -> array:
+    """Новый массив из элементов values, отмеченных маской"""
+    import numpy as np
+
+    taken = array(values.typecode)
+    if values:
+        taken.frombytes(np.frombuffer(values, dtype=f"i{values.itemsize}")[mask].tobytes())
+    return taken
+
+
+class PurchaseStore:
+    """
+    Покупки в параллельных типизированных массивах (array.array): ID, время, сумма, цена, количество.
+    Суммы, цены и количества хранятся целыми единицами 10**-8 вместе с показателем степени
+    исходного Decimal, поэтому покупка восстанавливается без изменений (включая запись «100.00»).
+    Покупки, которые так не представимы (старые данные с большей точностью, время с часовым поясом),
+    дополнительно хранятся целиком; в массивах у них округленные значения.
+    Удаление оставляет «надгробие» за O(1), уплотнение выполняется одним векторным проходом,
+    когда надгробий становится больше, чем живых покупок. Порядковый номер живой покупки
+    и позиция в массивах переводятся друг в друга деревом Фенвика живых позиций за O(log n).
+    ID обычно растут, поэтому покупка по ID ищется двоичным поиском; если порядок нарушен,
+    строится словарь ID -> позиция.
+    Перебор и доступ по позиции возвращают новые объекты Purchase, собранные из колонок
+    (изменение такого объекта не меняет хранилище). Векторные операции (units, values, total,
+    cumsum, select, between) выполняются NumPy над колонками целиком.
+    """
+
+    COMPACT_MIN_TOMBSTONES = 64  # Меньше надгробий не уплотняем: проход дороже экономии
+
+    def __init__(self, purchases: Iterable[Purchase] = ()):
+        self._ids = array('q')
+        self._timestamps = array('q')  # Микросекунды от 1970-01-01 (локальное время без пояса)
+        self._units: Dict[str, array] = {column: array('q') for column in DECIMAL_COLUMNS}
+        self._exponents: Dict[str, array] = {column: array('b') for column in DECIMAL_COLUMNS}
+        self._alive = bytearray()
+        self._live = 0
+        self._tombstones = 0
+        self._alive_tree: Optional[FenwickTree] = None  # Строится при первом переводе номера после удаления
+        self._index: Optional[Dict[int, int]] = None  # None, пока ID идут по возрастанию
+        self._trade_ids: Dict[int, str] = {}  # ID покупки -> ID сделки (есть только у импортированных)
+        self._exact: Dict[int, Purchase] = {}  # Покупки, не представимые в колонках без потерь
+        self._series: Optional[BreakEvenSeries] = None  # Ряд безубыточной точки до следующего изменения
+        for purchase in purchases:
+            self.append(purchase)
+
+    def append(self, purchase: Purchase) -> None:
+        """Добавляет покупку в конец за O(1) (амортизированно)"""
+        if self.has_id(purchase.id):
+            raise ValueError(f"Покупка с ID {purchase.id} уже существует")
+        position = len(self._ids)
+        if self._index is None and position and purchase.id <= self._ids[-1]:
+            self._index = self._build_index()
+
+        exact = True
+        for column in DECIMAL_COLUMNS:
+            units, exponent, representable = PurchaseStore._encode(getattr(purchase, column))
+            self._units[column].append(units)
+            self._exponents[column].append(exponent)
+            exact = exact and representable
+        timestamp = purchase.timestamp
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+            exact = False
+        self._timestamps.append((timestamp - _EPOCH) // timedelta(microseconds=1))
+        self._ids.append(purchase.id)
+        self._alive.append(1)
+        self._live += 1
+        if self._alive_tree is not None:
+            self._alive_tree.append(1)
+        if self._series is not None:
+            self._extend_series(position)
+
+        if not exact:
+            self._exact[purchase.id] = purchase
+        if purchase.trade_id is not None:
+            self._trade_ids[purchase.id] = purchase.trade_id
+        if self._index is not None:
+            self._index[purchase.id] = position
+
+    def remove(self, purchase_id: int) -> Optional[Purchase]:
+        """Удаляет покупку по ID за O(1) (в среднем); возвращает удаленную покупку или None"""
+        position = self._position(purchase_id)
+        if position is None:
+            return None
+        purchase = self._purchase_at(position)
+        if self._series is not None:
+            self._series.remove(position, self._units["investment"][position], self._units["quantity"][position])
+        self._alive[position] = 0
+        if self._alive_tree is not None:
+            self._alive_tree.add(position, -1)
+        self._live -= 1
+        self._tombstones += 1
+        self._trade_ids.pop(purchase_id, None)
+        self._exact.pop(purchase_id, None)
+        if self._index is not None:
+            del self._index[purchase_id]
+        if position == len(self._ids) - 1:
+            self._trim()
+        elif self._tombstones >= self.COMPACT_MIN_TOMBSTONES and self._tombstones > self._live:
+            self.compact()
+        return purchase
+
+    def replace(self, purchase: Purchase) -> Purchase:
+        """
+        Заменяет покупку с тем же ID на ее месте; возвращает прежнюю (KeyError, если ее нет).
+        Колонки меняются за O(1), ряд безубыточной точки - за O(log n), если покупка
+        осталась на своем месте по времени (иначе ряд строится заново при следующем запросе)
+        """
+        position = self._position(purchase.id)
+        if position is None:
+            raise KeyError(f"Покупка с ID {purchase.id} не найдена")
+        previous = self._purchase_at(position)
+
+        exact = True
+        deltas = {}
+        for column in DECIMAL_COLUMNS:
+            units, exponent, representable = PurchaseStore._encode(getattr(purchase, column))
+            deltas[column] = units - self._units[column][position]
+            self._units[column][position] = units
+            self._exponents[column][position] = exponent
+            exact = exact and representable
+        timestamp = purchase.timestamp
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+            exact = False
+        moved = timestamp != _EPOCH + timedelta(microseconds=self._timestamps[position])
+        self._timestamps[position] = (timestamp - _EPOCH) // timedelta(microseconds=1)
+
+        self._exact.pop(purchase.id, None)
+        if not exact:
+            self._exact[purchase.id] = purchase
+        self._trade_ids.pop(purchase.id, None)
+        if purchase.trade_id is not None:
+            self._trade_ids[purchase.id] = purchase.trade_id
+
+        if self._series is not None:
+            # Ряд строится по массивам вместе с надгробиями и сбрасывается при уплотнении,
+            # поэтому позиция в массивах совпадает с позицией в ряду
+            if not moved:
+                self._series.update(position, deltas["investment"], deltas["quantity"])
+            elif self._series.keeps_order(position, timestamp):
+                self._series.update(position, deltas["investment"], deltas["quantity"], timestamp)
+            else:
+                self._series = None
+        return previous
+
+    def get(self, purchase_id: int) -> Optional[Purchase]:
+        """Возвращает покупку по ID за O(log n)"""
+        position = self._position(purchase_id)
+        return self._purchase_at(position) if position is not None else None
+
+    def has_id(self, purchase_id: int) -> bool:
+        """Есть ли покупка с таким ID"""
+        return self._position(purchase_id) is not None
+
+    def index_of(self, purchase_id: int) -> Optional[int]:
+        """Порядковый номер живой покупки (как в __getitem__) или None за O(log n), без уплотнения"""
+        position = self._position(purchase_id)
+        return self._live_index(position) if position is not None else None
+
+    def last(self) -> Optional[Purchase]:
+        """Последняя добавленная покупка (хвостовые надгробия убираются при удалении)"""
+        return self._purchase_at(len(self._ids) - 1) if self._ids else None
+
+    def max_id(self) -> int:
+        """Наибольший ID среди покупок (0, если покупок нет)"""
+        if not self._live:
+            return 0
+        if self._index is None:
+            # ID растут, а хвостовых надгробий нет
+            return self._ids[-1]
+        return max(self._index)
+
+    def trade_ids(self) -> Set[str]:
+        """ID сделок импортированных покупок"""
+        return set(self._trade_ids.values())
+
+    def compact(self) -> None:
+        """Убирает надгробия одним векторным проходом и перестраивает индекс (ряд строится заново)"""
+        if not self._tombstones:
+            return
+        import numpy as np
+
+        mask = np.frombuffer(self._alive, dtype=np.bool_)
+        self._ids = _take(self._ids, mask)
+        self._timestamps = _take(self._timestamps, mask)
+        self._units = {column: _take(values, mask) for column, values in self._units.items()}
+        self._exponents = {column: _take(values, mask) for column, values in self._exponents.items()}
+        self._alive = bytearray(b"\x01") * self._live
+        self._tombstones = 0
+        self._alive_tree = None
+        self._series = None
+        if self._index is not None:
+            self._index = self._build_index()
+
+    def copy(self) -> 'PurchaseStore':
+        """Независимая копия (массивы копируются целиком, без сборки объектов Purchase)"""
+        store = PurchaseStore.__new__(PurchaseStore)
+        store._ids = self._ids[:]
+        store._timestamps = self._timestamps[:]
+        store._units = {column: values[:] for column, values in self._units.items()}
+        store._exponents = {column: values[:] for column, values in self._exponents.items()}
+        store._alive = self._alive[:]
+        store._live = self._live
+        store._tombstones = self._tombstones
+        store._alive_tree = self._alive_tree.copy() if self._alive_tree is not None else None
+        store._index = dict(self._index) if self._index is not None else None
+        store._trade_ids = dict(self._trade_ids)
+        store._exact = dict(self._exact)
+        store._series = self._series.copy() if self._series is not None else None
+        return store
+
+    def units(self, column: str) -> "np.ndarray":
+        """
+        Копия колонки живых покупок как массив int64: "id", "timestamp"
+        (микросекунды от 1970-01-01) или сумма/цена/количество в единицах 10**-8
+        """
+        return self._view(column).copy()
+
+    def values(self, column: str) -> "np.ndarray":
+        """Сумма, цена или количество живых покупок как массив float64"""
+        values = self._view(column) / _SCALE
+        for purchase in self._exact.values():
+            values[self._live_index(self._position(purchase.id))] = float(getattr(purchase, column))
+        return values
+
+    def timestamps(self) -> "np.ndarray":
+        """Время живых покупок как массив datetime64[us]"""
+        return self.units("timestamp").astype("datetime64[us]")
+
+    def total(self, column: str) -> Decimal:
+        """Точная сумма колонки (сумма, цена или количество) с показателем степени как у суммы Decimal"""
+        if not self._live:
+            return Decimal('0')
+        import numpy as np
+
+        units = self._view(column)
+        total = _from_units(PurchaseStore._sum_units(units))
+        if self._exact:
+            # Для покупок, не представимых в колонках, берем точные значения
+            for purchase in self._exact.values():
+                index = self._live_index(self._position(purchase.id))
+                total += getattr(purchase, column) - _from_units(int(units[index]))
+            return total
+        # Сумма Decimal имеет показатель степени наименее точного слагаемого
+        exponents = np.frombuffer(self._exponents[column], dtype=np.int8)
+        if self._tombstones:
+            exponents = exponents[np.frombuffer(self._alive, dtype=np.bool_)]
+        exponent = int(exponents.min())
+        return total.quantize(_QUANTS[exponent])
+
+    def cumsum(self, column: str, order: Optional["np.ndarray"] = None) -> "np.ndarray":
+        """
+        Накопленная сумма колонки в единицах 10**-8 (int64; при угрозе переполнения - Python int).
+        order - перестановка позиций, в порядке которой суммировать (по умолчанию - порядок хранилища)
+        """
+        units = self._view(column)
+        if order is not None:
+            units = units[order]
+        return PurchaseStore._cumsum(units)
+
+    def break_even_series(self) -> BreakEvenSeries:
+        """
+        Ряд безубыточной точки по времени покупок. Строится одним векторным проходом при первом
+        запросе после уплотнения или добавления покупки задним числом, дальше запросы к нему - O(1)
+        и O(log n); покупки, добавленные по времени, и удаления учитываются в ряду без перестроения
+        """
+        if self._series is None:
+            import numpy as np
+
+            timestamps = self._raw("timestamp")
+            if len(timestamps) < 2 or np.all(timestamps[1:] >= timestamps[:-1]):
+                # Обычно покупки добавляются по времени - перестановка не нужна
+                order = np.arange(len(timestamps))
+                ranks = order
+            else:
+                order = np.argsort(timestamps, kind="stable")
+                ranks = np.empty_like(order)
+                ranks[order] = np.arange(len(order))
+            investment = self._raw("investment")
+            quantity = self._raw("quantity")
+            alive_tree = None
+            if self._tombstones:
+                # Надгробия входят в ряд с нулевым весом: позиции ряда - позиции массивов
+                alive = np.frombuffer(self._alive, dtype=np.uint8)
+                investment = np.where(alive, investment, 0)
+                quantity = np.where(alive, quantity, 0)
+                alive_tree = FenwickTree.from_prefix_sums(np.cumsum(alive[order], dtype=np.int64))
+            self._series = BreakEvenSeries(
+                timestamps=timestamps[order].astype("datetime64[us]"),
+                investment=PurchaseStore._cumsum(investment[order]),
+                quantity=PurchaseStore._cumsum(quantity[order]),
+                positions=order,
+                ranks=ranks,
+                alive_tree=alive_tree,
+                removed=self._tombstones
+            )
+        return self._series
+
+    def break_even_after(self, index: int) -> Optional[Decimal]:
+        """Безубыточная точка сразу после покупки с порядковым номером index (как в __getitem__)"""
+        return self.break_even_series().after_purchase(self._raw_position(index))
+
+    def is_latest(self, index: int) -> bool:
+        """
+        Самая ли поздняя по времени покупка с порядковым номером index: только ее добавление
+        или удаление не меняет безубыточную точку других покупок
+        """
+        return self.break_even_series().is_latest(self._raw_position(index))
+
+    def break_even_column(self) -> "np.ndarray":
+        """Безубыточная точка после каждой живой покупки по порядку, float64 (для таблицы и экспорта)"""
+        import numpy as np
+
+        if self._tombstones:
+            positions = np.flatnonzero(np.frombuffer(self._alive, dtype=np.bool_))
+        else:
+            positions = np.arange(len(self._ids))
+        return self.break_even_series().per_purchase(positions)
+
+    def select(self, mask: "np.ndarray") -> 'PurchaseStore':
+        """Новое хранилище из покупок, отмеченных маской (длина маски - количество покупок)"""
+        import numpy as np
+
+        mask = np.asarray(mask, dtype=bool)
+        if len(mask) != self._live:
+            raise ValueError("Длина маски не совпадает с количеством покупок")
+        if self._tombstones:
+            # Маска живых покупок -> маска позиций массивов (надгробия не выбираются)
+            live_mask = mask
+            mask = np.zeros(len(self._ids), dtype=bool)
+            mask[np.frombuffer(self._alive, dtype=np.bool_)] = live_mask
+
+        store = PurchaseStore()
+        store._ids = _take(self._ids, mask)
+        store._timestamps = _take(self._timestamps, mask)
+        store._units = {column: _take(values, mask) for column, values in self._units.items()}
+        store._exponents = {column: _take(values, mask) for column, values in self._exponents.items()}
+        store._live = len(store._ids)
+        store._alive = bytearray(b"\x01") * store._live
+        ids = set(store._ids) if (self._trade_ids or self._exact) else set()
+        store._trade_ids = {pid: tid for pid, tid in self._trade_ids.items() if pid in ids}
+        store._exact = {pid: p for pid, p in self._exact.items() if pid in ids}
+        if self._index is not None:
+            store._index = store._build_index()
+        return store
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> 'PurchaseStore':
+        """Покупки со временем в интервале [start, end] (границы можно не задавать)"""
+        import numpy as np
+
+        timestamps = self._view("timestamp")
+        mask = np.ones(len(timestamps), dtype=bool)
+        if start is not None:
+            mask &= timestamps >= (start - _EPOCH) // timedelta(microseconds=1)
+        if end is not None:
+            mask &= timestamps <= (end - _EPOCH) // timedelta(microseconds=1)
+        return self.select(mask)
+
+    def trade_id_column(self) -> List[str]:
+        """ID сделок живых покупок по порядку (пустая строка - покупка введена вручную)"""
+        if not self._trade_ids:
+            return [""] * self._live
+        get = self._trade_ids.get
+        return [get(purchase_id, "") for purchase_id in self.units("id").tolist()]
+
+    def _extend_series(self, position: int) -> None:
+        """
+        Дописывает в ряд безубыточной точки покупку, добавленную на позицию position.
+        Покупка задним числом сбрасывает ряд, и он строится заново при следующем запросе
+        """
+        import numpy as np
+
+        series = self._series
+        moment = np.datetime64(self._timestamps[position], "us")
+        if len(series.timestamps) and moment < series.timestamps[-1]:
+            self._series = None
+            return
+        series.append(moment, self._units["investment"][position], self._units["quantity"][position], position)
+
+    def _view(self, column: str) -> "np.ndarray":
+        """
+        Колонка живых покупок как массив NumPy: без надгробий - поверх array.array без копирования
+        (пока такой массив существует, array.array нельзя расширить, поэтому наружу он не отдается),
+        с надгробиями - копия живых элементов
+        """
+        import numpy as np
+
+        values = self._raw(column)
+        if self._tombstones:
+            return values[np.frombuffer(self._alive, dtype=np.bool_)]
+        return values
+
+    def _raw(self, column: str) -> "np.ndarray":
+        """Колонка вместе с надгробиями как массив NumPy поверх array.array без копирования"""
+        import numpy as np
+
+        if column == "id":
+            values = self._ids
+        elif column == "timestamp":
+            values = self._timestamps
+        else:
+            values = self._units[column]
+        if not values:
+            return np.zeros(0, dtype=np.int64)
+        return np.frombuffer(values, dtype=np.int64)
+
+    def _position(self, purchase_id: int) -> Optional[int]:
+        """Позиция живой покупки по ID"""
+        if self._index is not None:
+            return self._index.get(purchase_id)
+        position = bisect.bisect_left(self._ids, purchase_id)
+        if position < len(self._ids) and self._ids[position] == purchase_id and self._alive[position]:
+            return position
+        return None
+
+    def _live_index(self, position: int) -> int:
+        """Порядковый номер живой покупки на позиции position массивов"""
+        if not self._tombstones:
+            return position
+        return self._alive_counts().prefix_sum(position)
+
+    def _raw_position(self, index: int) -> int:
+        """Позиция в массивах живой покупки с порядковым номером index"""
+        if not self._tombstones:
+            return index
+        return self._alive_counts().search(index + 1) - 1
+
+    def _alive_counts(self) -> FenwickTree:
+        """
+        Дерево Фенвика живых позиций (1 - покупка, 0 - надгробие). Строится за O(n) при первом
+        запросе после удаления и дальше ведется за O(log n) до уплотнения
+        """
+        if self._alive_tree is None:
+            import numpy as np
+
+            alive = np.frombuffer(self._alive, dtype=np.uint8)
+            self._alive_tree = FenwickTree.from_prefix_sums(np.cumsum(alive, dtype=np.int64))
+        return self._alive_tree
+
+    def _build_index(self) -> Dict[int, int]:
+        """Словарь ID -> позиция живых покупок"""
+        alive = self._alive
+        return {purchase_id: position for position, purchase_id in enumerate(self._ids) if alive[position]}
+
+    def _purchase_at(self, position: int) -> Purchase:
+        """Собирает покупку из колонок"""
+        purchase_id = self._ids[position]
+        if self._exact:
+            purchase = self._exact.get(purchase_id)
+            if purchase is not None:
+                return purchase
+        return Purchase(
+            id=purchase_id,
+            investment=PurchaseStore._decode(
+                self._units["investment"][position], self._exponents["investment"][position]
+            ),
+            price=PurchaseStore._decode(self._units["price"][position], self._exponents["price"][position]),
+            quantity=PurchaseStore._decode(
+                self._units["quantity"][position], self._exponents["quantity"][position]
+            ),
+            timestamp=_EPOCH + timedelta(microseconds=self._timestamps[position]),
+            trade_id=self._trade_ids.get(purchase_id) if self._trade_ids else None
+        )
+
+    def _trim(self) -> None:
+        """Убирает надгробия в конце массивов, чтобы last() оставался O(1)"""
+        while self._ids and not self._alive[-1]:
+            for values in (self._ids, self._timestamps, *self._units.values(), *self._exponents.values()):
+                values.pop()
+            self._alive.pop()
+            if self._alive_tree is not None:
+                self._alive_tree.pop()
+            self._tombstones -= 1
+
+    @staticmethod
+    def _encode(value: Decimal) -> Tuple[int, int, bool]:
+        """Decimal -> (единицы 10**-8, показатель степени, представимо ли без потерь)"""
+        exponent = value.as_tuple().exponent
+        if not isinstance(exponent, int) or not -128 <= exponent < 128:
+            return 0, -STORE_DECIMALS, False
+        scaled = value.scaleb(STORE_DECIMALS)
+        units = int(scaled)
+        if abs(units) > _INT64_MAX:
+            return 0, exponent, False
+        return units, exponent, scaled == units
+
+    @staticmethod
+    def _decode(units: int, exponent: int) -> Decimal:
+        """(единицы 10**-8, показатель степени) -> исходный Decimal"""
+        value = _from_units(units)
+        if exponent != -STORE_DECIMALS:
+            value = value.quantize(_QUANTS[exponent])
+        return value
+
+    @staticmethod
+    def _fits_int64(units: "np.ndarray") -> bool:
+        """Гарантирует ли оценка max|x| * n, что сумма не переполнит int64"""
+        if not len(units):
+            return True
+        import numpy as np
+        return int(np.abs(units).max()) * len(units) <= _INT64_MAX
+
+    @staticmethod
+    def _cumsum(units: "np.ndarray") -> "np.ndarray":
+        """Накопленная сумма единиц (int64; при угрозе переполнения - Python int)"""
+        import numpy as np
+
+        if PurchaseStore._fits_int64(units):
+            return np.cumsum(units)
+        return np.cumsum(units.astype(object))
+
+    @staticmethod
+    def _sum_units(units: "np.ndarray") -> int:
+        """Точная сумма массива единиц (Python int)"""
+        if PurchaseStore._fits_int64(units):
+            return int(units.sum())
+        return sum(units.tolist())
+
+    def __iter__(self) -> Iterator[Purchase]:
+        purchase_at = self._purchase_at
+        alive = self._alive
+        for position in range(len(self._ids)):
+            if alive[position]:
+                yield purchase_at(position)
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __getitem__(self, item):
+        """Доступ по порядковому номеру среди живых покупок (при надгробиях - за O(log n), без уплотнения)"""
+        if isinstance(item, slice):
+            return [self._purchase_at(self._raw_position(index)) for index in range(*item.indices(self._live))]
+        if item < 0:
+            item += self._live
+        if not 0 <= item < self._live:
+            raise IndexError("Индекс покупки вне диапазона")
+        return self._purchase_at(self._raw_position(item))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PurchaseStore):
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"PurchaseStore({list(self)!r})"
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from datetime import datetime
+
+
+@dataclass(slots=True)
+class Sale:
+    """Модель продажи части позиции"""
+    id: int
+    quantity: Decimal  # Количество проданных активов
+    price: Decimal  # Цена продажи
+    timestamp: datetime = None
+
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = datetime.now()
+
+    @property
+    def proceeds(self) -> Decimal:
+        """Выручка от продажи"""
+        return self.quantity * self.price
@@ -0,0 +1,29 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass
+class SensitivityGrid:
+    """
+    Сетка сценариев следующей покупки: строки - проценты просадки, колонки - суммы докупки.
+    """
+    drawdowns: "np.ndarray"  # Проценты просадки, форма (D,)
+    investments: "np.ndarray"  # Суммы докупки, форма (I,)
+    next_prices: "np.ndarray"  # Цена докупки для каждой просадки, форма (D,)
+    break_even: "np.ndarray"  # Безубыточная точка после докупки, форма (D, I)
+    current_break_even: Optional[float] = None  # Безубыточная точка до докупки
+
+    @property
+    def shape(self) -> tuple:
+        """Размер сетки (просадки, суммы)"""
+        return self.break_even.shape
+
+    @property
+    def improvement_percent(self) -> "np.ndarray":
+        """Снижение безубыточной точки в процентах от текущей, форма (D, I)"""
+        if not self.current_break_even:
+            return self.break_even * 0.0
+        return (1.0 - self.break_even / self.current_break_even) * 100.0
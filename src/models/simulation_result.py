@@ -0,0 +1,44 @@
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Dict, Sequence
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+@dataclass
+class SimulationResult:
+    """
+    Результат моделирования стратегии усреднения методом Монте-Карло.
+    Каждый массив имеет форму (paths,): одно значение на смоделированную траекторию цены.
+    """
+    break_even: "np.ndarray"  # Безубыточная точка в конце траектории
+    capital: "np.ndarray"  # Общая сумма вложений
+    purchase_count: "np.ndarray"  # Количество покупок (включая первую)
+    time_to_break_even: "np.ndarray"  # Шагов от первого ухода в минус до возврата цены к безубыточной точке (NaN - не вернулась)
+    final_price: "np.ndarray"  # Цена в конце траектории
+
+    @property
+    def paths(self) -> int:
+        """Количество смоделированных траекторий"""
+        return self.break_even.shape[0]
+
+    @property
+    def recovered_share(self) -> float:
+        """Доля траекторий, на которых цена вернулась к безубыточной точке"""
+        import numpy as np
+        return float(np.mean(~np.isnan(self.time_to_break_even)))
+
+    def percentiles(self, quantiles: Sequence[float] = (5, 25, 50, 75, 95)) -> Dict[str, Dict[float, float]]:
+        """Перцентили распределений: {показатель: {перцентиль: значение}}"""
+        import numpy as np
+        distributions = {
+            "break_even": self.break_even,
+            "capital": self.capital,
+            "purchase_count": self.purchase_count,
+            "time_to_break_even": self.time_to_break_even
+        }
+        return {
+            name: dict(zip(quantiles, np.nanpercentile(values, quantiles).tolist()))
+            if not np.all(np.isnan(values)) else dict.fromkeys(quantiles, float("nan"))
+            for name, values in distributions.items()
+        }
@@ -0,0 +1,20 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+
+@dataclass
+class TradeColumnMapping:
+    """
+    Соответствие колонок выгрузки сделок биржи полям покупки.
+    Значение - название колонки в заголовке (без учета регистра); None - поиск по известным названиям.
+    Сумма покупки берется из колонки total, а если ее нет - считается как quantity × price.
+    """
+    price: Optional[str] = None  # Цена сделки
+    quantity: Optional[str] = None  # Количество актива
+    total: Optional[str] = None  # Сумма сделки в валюте котировки
+    time: Optional[str] = None  # Дата и время сделки
+    side: Optional[str] = None  # Направление (покупка/продажа); без колонки все строки - покупки
+    trade_id: Optional[str] = None  # ID сделки на бирже (по нему отбрасываются дубли)
+    delimiter: Optional[str] = None  # Разделитель полей; None - определяется по заголовку
+    time_format: Optional[str] = None  # Формат strptime; None - ISO 8601 или Unix-время
+    buy_values: Tuple[str, ...] = ("buy", "b", "bid", "kupno", "покупка")  # Значения side для покупки
@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, List, Optional, Tuple
+from src.models.asset import Asset
+
+
+class AssetCache:
+    """
+    LRU-кэш загруженных активов с ограничением по количеству и примерному объему памяти.
+    Для каждого актива хранится подпись его данных в хранилище (см. StorageBackend.get_signature):
+    если подпись на диске изменилась, актив в кэше считается устаревшим.
+    Последний использованный актив (текущий) не вытесняется.
+    """
+
+    DEFAULT_MAX_ENTRIES = 8
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    # Примерный объем в памяти (по tracemalloc, см. benchmarks/bench_memory.py):
+    # актив, строка покупки в хранилище, лот покупки (если учет лотов построен), продажа
+    ASSET_BYTES = 4_000
+    PURCHASE_BYTES = 50
+    LOT_BYTES = 310
+    SALE_BYTES = 350
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        on_evict: Optional[Callable[[Asset], None]] = None
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        # Название -> (актив, подпись); порядок - от давно использованных к недавним
+        self._entries: "OrderedDict[str, Tuple[Asset, Optional[tuple]]]" = OrderedDict()
+        # Подпись обновляется из фонового потока записи
+        self._lock = threading.Lock()
+
+    def get(self, name: str, signature: Optional[tuple]) -> Optional[Asset]:
+        """
+        Возвращает актив, если его подпись совпадает с подписью в хранилище, и делает его последним.
+        Устаревший актив удаляется из кэша (без on_evict: его данные на диске новее)
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            asset, cached_signature = entry
+            if cached_signature != signature:
+                del self._entries[name]
+                return None
+            self._entries.move_to_end(name)
+            return asset
+
+    def put(self, asset: Asset, signature: Optional[tuple]) -> None:
+        """Добавляет актив последним и вытесняет давно использованные сверх ограничений"""
+        with self._lock:
+            self._entries[asset.name] = (asset, signature)
+            self._entries.move_to_end(asset.name)
+            evicted = self._evict()
+        # Обработчик может планировать запись, поэтому вызывается вне блокировки
+        if self.on_evict:
+            for evicted_asset in evicted:
+                self.on_evict(evicted_asset)
+
+    def set_signature(self, name: str, signature: Optional[tuple]) -> None:
+        """Запоминает подпись после записи актива на диск этим приложением"""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                self._entries[name] = (entry[0], signature)
+
+    def discard(self, name: str) -> None:
+        """Удаляет актив из кэша без on_evict"""
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def assets(self) -> List[Asset]:
+        """Активы в кэше, от давно использованных к недавним"""
+        with self._lock:
+            return [asset for asset, _ in self._entries.values()]
+
+    @property
+    def total_bytes(self) -> int:
+        """Примерный объем всех активов кэша"""
+        with self._lock:
+            return sum(AssetCache.estimate_bytes(asset) for asset, _ in self._entries.values())
+
+    @staticmethod
+    def estimate_bytes(asset: Asset) -> int:
+        """Примерный объем актива в памяти за O(1)"""
+        purchase_bytes = AssetCache.PURCHASE_BYTES + (AssetCache.LOT_BYTES if asset.has_lots else 0)
+        return (
+            AssetCache.ASSET_BYTES
+            + len(asset.purchases) * purchase_bytes
+            + len(asset.sales) * AssetCache.SALE_BYTES
+        )
+
+    def _evict(self) -> List[Asset]:
+        """Вытесняет давно использованные активы, пока кэш превышает ограничения (под блокировкой)"""
+        evicted = []
+        total = sum(AssetCache.estimate_bytes(asset) for asset, _ in self._entries.values())
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or total > self.max_bytes):
+            _, (asset, _) = self._entries.popitem(last=False)
+            total -= AssetCache.estimate_bytes(asset)
+            evicted.append(asset)
+        return evicted
+
+    def __contains__(self, name: str) -> bool:
+        with self._lock:
+            return name in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
@@ -0,0 +1,102 @@
+import json
+import os
+import threading
+from pathlib import Path
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+from src.models.asset_summary import AssetSummary
+from src.utils.currency import Currency
+
+
+# Подпись файлов актива на диске: (mtime_ns, размер) для .xlsx и для журнала
+FileSignature = Tuple[int, ...]
+
+
+class AssetCatalog:
+    """
+    Каталог активов: один небольшой JSON-файл со сводками по всем активам.
+    Каждая запись хранит подпись файлов актива (mtime и размер), на момент которой
+    сводка была актуальна; если файлы изменились, запись считается устаревшей.
+    """
+
+    CATALOG_FILENAME = "catalog.json"
+
+    def __init__(self, filepath: Path):
+        self.filepath = Path(filepath)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, dict] = self._read()
+
+    def get(self, name: str, signature: FileSignature) -> Optional[AssetSummary]:
+        """Возвращает сводку, если она соответствует текущей подписи файлов"""
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None or tuple(entry.get("signature", ())) != tuple(signature):
+            return None
+        try:
+            return AssetCatalog._decode(name, entry)
+        except (KeyError, ValueError, ArithmeticError):
+            return None
+
+    def put(self, summary: AssetSummary, signature: FileSignature) -> None:
+        """Обновляет запись каталога (без записи на диск)"""
+        entry = AssetCatalog._encode(summary)
+        entry["signature"] = list(signature)
+        with self._lock:
+            self._entries[summary.name] = entry
+
+    def remove(self, name: str) -> None:
+        """Удаляет запись каталога (без записи на диск)"""
+        with self._lock:
+            self._entries.pop(name, None)
+
+    def save(self) -> None:
+        """Атомарно записывает каталог на диск"""
+        with self._lock:
+            data = json.dumps(self._entries, ensure_ascii=False)
+        tmp_path = self.filepath.with_name(self.filepath.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.filepath)
+
+    def _read(self) -> Dict[str, dict]:
+        """Читает каталог; поврежденный файл равносилен пустому каталогу"""
+        if not self.filepath.exists():
+            return {}
+        try:
+            with open(self.filepath, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Ошибка при чтении каталога активов: {e}")
+            return {}
+
+    @staticmethod
+    def _encode(summary: AssetSummary) -> dict:
+        """Сводка в JSON-совместимом виде (Decimal хранится строкой)"""
+        return {
+            "currency": summary.currency.code,
+            "drawdown_percent": str(summary.drawdown_percent),
+            "purchase_count": summary.purchase_count,
+            "total_investment": str(summary.total_investment),
+            "total_quantity": str(summary.total_quantity),
+            "updated_at": summary.updated_at.isoformat()
+        }
+
+    @staticmethod
+    def _decode(name: str, entry: dict) -> AssetSummary:
+        """Сводка из записи каталога"""
+        currency = Currency.USD
+        for c in Currency:
+            if c.code == entry["currency"]:
+                currency = c
+                break
+        return AssetSummary(
+            name=name,
+            currency=currency,
+            drawdown_percent=Decimal(entry["drawdown_percent"]),
+            purchase_count=int(entry["purchase_count"]),
+            total_investment=Decimal(entry["total_investment"]),
+            total_quantity=Decimal(entry["total_quantity"]),
+            updated_at=datetime.fromisoformat(entry["updated_at"])
+        )
@@ -1,20 +1,50 @@
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional, List
+from typing import Callable, Dict, Iterable, Optional, List
 from src.models.asset import Asset
 from src.models.purchase import Purchase
+from src.models.break_even_series import BreakEvenSeries
+from src.models.purchase_batch import PurchaseBatch
+from src.models.purchase_store import PurchaseStore
+from src.models.sale import Sale
+from src.models.lot_engine import LotEngine
+from src.models.position_aggregate import PositionAggregate
+from src.models.asset_summary import AssetSummary
 from src.utils.currency import Currency
-from src.services.excel_exporter import ExcelExporter
+from src.utils.precision import quantize_amount, quantize_price, quantize_quantity
+from src.services.storage_backend import StorageBackend, create_storage_backend
+from src.services.background_saver import BackgroundSaver
+from src.services.asset_cache import AssetCache
 from src.services.calculator import Calculator
 
 
 class AssetManager:
     """Менеджер для управления активами"""
     
-    def __init__(self):
+    UNDO_LIMIT = 50  # Сколько последних пакетов изменений покупок можно отменить
+    
+    def __init__(
+        self,
+        storage: Optional[StorageBackend] = None,
+        on_save_error: Optional[Callable[[str, Exception], None]] = None,
+        cache_entries: int = AssetCache.DEFAULT_MAX_ENTRIES,
+        cache_bytes: int = AssetCache.DEFAULT_MAX_BYTES
+    ):
         self.current_asset: Optional[Asset] = None
+        # Хранилище выбирается через AVERAGING_STORAGE (по умолчанию .xlsx)
+        self.storage = storage or create_storage_backend()
+        # Запись на диск выполняется в фоновом потоке, чтобы не блокировать интерфейс
+        self._saver = BackgroundSaver(on_error=on_save_error)
+        # Загруженные активы (включая текущий): повторный выбор актива не читает файл заново
+        self._cache = AssetCache(cache_entries, cache_bytes, on_evict=self._on_evict)
+        # История пакетов изменений покупок текущего актива (для отмены)
+        self._batches: List[PurchaseBatch] = []
     
     def create_asset(self, name: str, currency: Currency = Currency.USD, drawdown_percent: Decimal = Decimal('15.0')) -> Asset:
         """Создает новый актив"""
+        # Отменяем запись, которая могла остаться от удаленного актива с тем же именем
+        self._saver.discard(name)
+        self._cache.discard(name)
         asset = Asset(
             name=name,
             currency=currency,
@@ -22,97 +52,410 @@ class AssetManager:
             purchases=[]
         )
         self.current_asset = asset
-        # Сохраняем сразу при создании
-        ExcelExporter.export_asset(asset)
+        self._batches.clear()
+        # Сохраняем сразу при создании (синхронно, чтобы актив сразу появился в списке)
+        self.storage.save_asset(asset)
+        self._cache.put(asset, self.storage.get_signature(name))
         return asset
     
     def load_asset(self, name: str) -> Optional[Asset]:
-        """Загружает актив из файла"""
-        asset = ExcelExporter.import_asset(name)
-        if asset:
+        """
+        Загружает актив: из кэша, если его данные в хранилище не менялись с последней
+        записи этим приложением, иначе из хранилища
+        """
+        asset = self._cache.get(name, self.storage.get_signature(name))
+        if asset is None:
+            # Дожидаемся фоновой записи этого актива, чтобы прочитать актуальные данные
+            self._saver.flush(name)
+            asset = self.storage.load_asset(name)
+            if asset:
+                self._cache.put(asset, self.storage.get_signature(name))
+        if asset and asset is not self.current_asset:
             self.current_asset = asset
+            self._batches.clear()
         return asset
     
     def save_current_asset(self) -> bool:
-        """Сохраняет текущий актив в файл"""
-        if self.current_asset:
-            return ExcelExporter.export_asset(self.current_asset)
-        return False
+        """Планирует полное сохранение текущего актива"""
+        if not self.current_asset:
+            return False
+        self._schedule_save(self.current_asset)
+        return True
+    
+    def close(self) -> bool:
+        """Сворачивает накопленные изменения всех загруженных активов (при выходе)"""
+        for asset in self._cache.assets():
+            if self.storage.has_pending_changes(asset.name):
+                self._schedule_save(asset)
+        return True
+    
+    def shutdown(self, timeout: Optional[float] = None) -> None:
+        """Сохраняет загруженные активы и дожидается завершения всех фоновых записей"""
+        self.close()
+        self._saver.stop(timeout=timeout)
+        self.storage.close()
+    
+    @property
+    def last_save_error(self) -> Optional[tuple]:
+        """(название актива, ошибка) последней неудачной фоновой записи, которая еще не повторена успешно"""
+        return self._saver.last_error
+    
+    def _schedule_save(self, asset: Asset) -> None:
+        """Планирует полное сохранение актива"""
+        asset.updated_at = datetime.now()
+        save = self.storage.prepare_save(asset)
+        
+        def task():
+            if not save():
+                raise OSError(f"Nie udało się zapisać aktywu '{asset.name}'")
+            self._cache.set_signature(asset.name, self.storage.get_signature(asset.name))
+        
+        self._saver.schedule((asset.name, "compact"), task)
+    
+    def _schedule_flush(self):
+        """Планирует запись накопленных изменений текущего актива"""
+        name = self.current_asset.name
+        
+        def task():
+            self.storage.flush(name)
+            # Собственная запись не должна делать актив в кэше устаревшим
+            self._cache.set_signature(name, self.storage.get_signature(name))
+        
+        # Несколько изменений подряд сбрасываются на диск одной записью
+        self._saver.schedule((name, "flush"), task)
+        if self.storage.needs_compaction(name) and not self._saver.is_pending((name, "compact")):
+            self.save_current_asset()
+    
+    def _on_evict(self, asset: Asset) -> None:
+        """Актив вытеснен из кэша: сворачиваем его накопленные изменения"""
+        if self.storage.has_pending_changes(asset.name):
+            self._schedule_save(asset)
     
     def delete_asset(self, name: str) -> bool:
         """Удаляет актив и его файл"""
-        success = ExcelExporter.delete_asset(name)
+        # Отменяем отложенные записи, чтобы они не восстановили удаленный актив
+        self._saver.discard(name)
+        self._cache.discard(name)
+        success = self.storage.delete_asset(name)
         # Если удаляемый актив был текущим, очищаем его
         if success and self.current_asset and self.current_asset.name == name:
             self.current_asset = None
+            self._batches.clear()
         return success
     
     def list_assets(self) -> List[str]:
         """Возвращает список всех доступных активов"""
-        return ExcelExporter.list_assets()
+        return self.storage.list_assets()
+    
+    def list_summaries(self) -> Dict[str, AssetSummary]:
+        """Возвращает сводки по активам из каталога (загруженные активы - по данным в памяти)"""
+        summaries = self.storage.list_summaries()
+        for asset in self._cache.assets():
+            summaries[asset.name] = AssetSummary.from_asset(asset)
+        return summaries
     
     def add_purchase(self, investment: Decimal, price: Decimal) -> Optional[Purchase]:
         """Добавляет покупку к текущему активу"""
         if not self.current_asset:
             return None
+        return self.add_purchases([(investment, price)])[0]
+    
+    def add_purchases(self, entries: Iterable[tuple], merge_undo: bool = False) -> List[Purchase]:
+        """
+        Добавляет несколько покупок одним пакетом.
+        entries - кортежи (сумма вложений, цена[, дата[, ID сделки]]).
+        Сначала проверяется весь список: при ошибке (ValueError) актив не меняется.
+        Итоги обновляются по каждой покупке за O(1), на диск пакет уходит одной записью,
+        отменяется целиком через undo_last_batch().
+        merge_undo - присоединить пакет к предыдущему пакету добавления, если ID идут подряд
+        (импорт файла несколькими пакетами отменяется одной отменой)
+        """
+        if not self.current_asset:
+            return []
+        asset = self.current_asset
+        
+        entries = list(entries)
+        prepared = []
+        for number, entry in enumerate(entries, start=1):
+            investment, price, *rest = entry
+            # Округляем при создании, чтобы в памяти и в файле были одни и те же значения
+            if investment > 0 and price > 0:
+                investment = quantize_amount(investment, asset.currency)
+                price = quantize_price(price)
+            if investment <= 0 or price <= 0:
+                message = "Сумма вложений и цена должны быть больше нуля"
+                # В пакете указываем номер записи, чтобы ошибку можно было найти
+                raise ValueError(f"Запись {number}: {message}" if len(entries) > 1 else message)
+            timestamp, trade_id = (list(rest) + [None, None])[:2]
+            prepared.append((investment, price, timestamp, trade_id))
+        if not prepared:
+            return []
+        
+        purchases = [
+            Purchase(
+                id=asset.allocate_purchase_id(),
+                investment=investment,
+                price=price,
+                quantity=Calculator.calculate_quantity(investment, price),
+                timestamp=timestamp,
+                trade_id=trade_id
+            )
+            for investment, price, timestamp, trade_id in prepared
+        ]
+        for purchase in purchases:
+            asset.add_purchase(purchase)
+            self.storage.add_purchase(asset, purchase)
+        # Автоматически сохраняем (весь пакет - одной записью)
+        self._schedule_flush()
+        id_range = range(purchases[0].id, purchases[-1].id + 1)
+        last = self._batches[-1] if self._batches else None
+        if merge_undo and last and last.kind == PurchaseBatch.ADDED and last.id_range.stop == id_range.start:
+            last.id_range = range(last.id_range.start, id_range.stop)
+        else:
+            self._push_batch(PurchaseBatch(PurchaseBatch.ADDED, id_range=id_range))
+        return purchases
+    
+    def remove_purchase(self, purchase_id: int) -> bool:
+        """
+        Удаляет покупку из текущего актива.
+        ValueError, если без этой покупки продажи превысили бы купленное количество
+        """
+        if not self.current_asset or not self.current_asset.purchases.has_id(purchase_id):
+            return False
+        self.remove_purchases([purchase_id])
+        return True
+    
+    def remove_purchases(self, purchase_ids: Iterable[int]) -> List[Purchase]:
+        """
+        Удаляет несколько покупок одним пакетом; возвращает удаленные покупки.
+        ValueError, если какой-то ID не найден или без этих покупок продажи превысили бы
+        купленное количество - в этом случае актив не меняется
+        """
+        if not self.current_asset:
+            return []
+        asset = self.current_asset
+        
+        try:
+            purchases = asset.remove_purchases(list(purchase_ids))
+        except KeyError as e:
+            raise ValueError(e.args[0]) from None
+        if not purchases:
+            return []
+        for purchase in purchases:
+            self.storage.remove_purchase(asset, purchase.id)
+        # Автоматически сохраняем (весь пакет - одной записью)
+        self._schedule_flush()
+        self._push_batch(PurchaseBatch(PurchaseBatch.REMOVED, purchases))
+        return purchases
+    
+    def edit_purchase(
+        self,
+        purchase_id: int,
+        investment: Decimal,
+        price: Decimal,
+        timestamp: Optional[datetime] = None
+    ) -> Optional[Purchase]:
+        """
+        Исправляет сумму, цену и дату покупки на ее месте в истории (ID и порядок сохраняются).
+        Итоги обновляются за O(1), ряд безубыточной точки - за O(log n); на диск уходит одна запись,
+        отменяется через undo_last_batch().
+        ValueError, если покупка не найдена, значения некорректны или после исправления
+        продажи превысили бы купленное количество - в этом случае актив не меняется
+        """
+        if not self.current_asset:
+            return None
+        asset = self.current_asset
         
+        previous = asset.purchases.get(purchase_id)
+        if previous is None:
+            raise ValueError(f"Покупка с ID {purchase_id} не найдена")
+        if investment > 0 and price > 0:
+            investment = quantize_amount(investment, asset.currency)
+            price = quantize_price(price)
         if investment <= 0 or price <= 0:
             raise ValueError("Сумма вложений и цена должны быть больше нуля")
         
-        # Определяем следующий ID
-        next_id = max([p.id for p in self.current_asset.purchases], default=0) + 1
-        
-        quantity = Calculator.calculate_quantity(investment, price)
         purchase = Purchase(
-            id=next_id,
+            id=purchase_id,
             investment=investment,
             price=price,
-            quantity=quantity
+            quantity=Calculator.calculate_quantity(investment, price),
+            timestamp=timestamp or previous.timestamp,
+            trade_id=previous.trade_id
         )
-        
-        self.current_asset.purchases.append(purchase)
-        # Автоматически сохраняем
-        self.save_current_asset()
+        try:
+            asset.replace_purchase(purchase)
+        except ValueError as e:
+            # Проверки значений пройдены - ошибку дает только пересчет продаж
+            raise ValueError(
+                "После исправления продажи превысили бы купленное количество - сначала отмените продажу"
+            ) from e
+        self.storage.update_purchase(asset, purchase)
+        self._schedule_flush()
+        self._push_batch(PurchaseBatch(PurchaseBatch.EDITED, [previous]))
         return purchase
     
-    def remove_purchase(self, purchase_id: int) -> bool:
-        """Удаляет покупку из текущего актива"""
+    def can_undo(self) -> bool:
+        """Есть ли пакет изменений покупок, который можно отменить"""
+        return bool(self._batches)
+    
+    def undo_last_batch(self) -> Optional[PurchaseBatch]:
+        """
+        Отменяет последний пакет изменений покупок целиком; возвращает отмененный пакет.
+        ValueError, если добавленные покупки уже проданы или без исправления продажи превысили бы
+        купленное количество (пакет остается в истории)
+        """
+        if not self.current_asset or not self._batches:
+            return None
+        asset = self.current_asset
+        batch = self._batches[-1]
+        
+        if batch.kind == PurchaseBatch.ADDED:
+            ids = [purchase_id for purchase_id in batch.id_range if asset.purchases.has_id(purchase_id)]
+            asset.remove_purchases(ids)
+            for purchase_id in ids:
+                self.storage.remove_purchase(asset, purchase_id)
+            self._schedule_flush()
+        elif batch.kind == PurchaseBatch.EDITED:
+            for purchase in batch.purchases:
+                asset.replace_purchase(purchase)
+                self.storage.update_purchase(asset, purchase)
+            self._schedule_flush()
+        else:
+            asset.restore_purchases(batch.purchases)
+            for purchase in batch.purchases:
+                self.storage.add_purchase(asset, purchase)
+            self._schedule_flush()
+            # Журнал добавляет покупки в конец, поэтому исходный порядок фиксируем полным сохранением
+            self.save_current_asset()
+        self._batches.pop()
+        return batch
+    
+    def _push_batch(self, batch: PurchaseBatch) -> None:
+        """Запоминает пакет для отмены (хранятся последние UNDO_LIMIT пакетов)"""
+        self._batches.append(batch)
+        if len(self._batches) > self.UNDO_LIMIT:
+            del self._batches[0]
+    
+    def add_sale(self, quantity: Decimal, price: Decimal) -> Optional[Sale]:
+        """Продает часть позиции текущего актива; лоты закрываются методом актива"""
+        if not self.current_asset:
+            return None
+        
+        quantity = quantize_quantity(quantity)
+        price = quantize_price(price)
+        if quantity <= 0 or price <= 0:
+            raise ValueError("Количество и цена должны быть больше нуля")
+        
+        # ID берется из счетчика актива за O(1); счетчик сдвигается, только если продажа принята
+        sale = Sale(id=self.current_asset.next_sale_id, quantity=quantity, price=price)
+        
+        # Продажа, превышающая открытое количество, отклоняется до записи
+        self.current_asset.add_sale(sale)
+        self.storage.add_sale(self.current_asset, sale)
+        self._schedule_flush()
+        return sale
+    
+    def remove_sale(self, sale_id: int) -> bool:
+        """Удаляет продажу из текущего актива"""
         if not self.current_asset:
             return False
         
-        for i, purchase in enumerate(self.current_asset.purchases):
-            if purchase.id == purchase_id:
-                self.current_asset.purchases.pop(i)
-                # Автоматически сохраняем
-                self.save_current_asset()
-                return True
-        return False
+        if self.current_asset.remove_sale(sale_id) is None:
+            return False
+        self.storage.remove_sale(self.current_asset, sale_id)
+        self._schedule_flush()
+        return True
+    
+    def get_last_sale(self) -> Optional[Sale]:
+        """Возвращает последнюю продажу текущего актива"""
+        if not self.current_asset or not self.current_asset.sales:
+            return None
+        return self.current_asset.sales[-1]
     
-    def get_all_purchases(self) -> List[Purchase]:
-        """Возвращает все покупки текущего актива"""
+    def set_lot_method(self, method: str):
+        """Устанавливает метод учета лотов для текущего актива"""
+        if self.current_asset and self.current_asset.lot_method != method:
+            self.current_asset.set_lot_method(method)
+            self.storage.set_lot_method(self.current_asset, method)
+            self._schedule_flush()
+    
+    def get_lot_method(self) -> str:
+        """Возвращает метод учета лотов текущего актива"""
         if not self.current_asset:
-            return []
+            return LotEngine.FIFO
+        return self.current_asset.lot_method
+    
+    def get_lots(self) -> Optional[LotEngine]:
+        """Возвращает учет лотов текущего актива (строится по истории при первом обращении)"""
+        if not self.current_asset:
+            return None
+        return self.current_asset.lots
+    
+    def get_all_purchases(self) -> PurchaseStore:
+        """Возвращает копию покупок текущего актива (копируются массивы, объекты Purchase не создаются)"""
+        if not self.current_asset:
+            return PurchaseStore()
         return self.current_asset.purchases.copy()
     
+    def get_break_even_series(self) -> Optional[BreakEvenSeries]:
+        """Возвращает ряд безубыточной точки по времени покупок текущего актива"""
+        if not self.current_asset:
+            return None
+        return self.current_asset.purchases.break_even_series()
+    
+    def get_break_even_as_of(self, moment: datetime) -> Optional[Decimal]:
+        """Возвращает безубыточную точку по покупкам, сделанным не позже moment (без учета продаж)"""
+        if not self.current_asset:
+            return None
+        return self.current_asset.purchases.break_even_series().as_of(moment)
+    
+    def get_aggregate(self) -> Optional[PositionAggregate]:
+        """Возвращает текущие итоги позиции текущего актива"""
+        if not self.current_asset:
+            return None
+        return self.current_asset.aggregate
+    
+    def get_open_position(self) -> Optional[PositionAggregate]:
+        """
+        Возвращает итоги открытой позиции текущего актива: пока продаж нет - итоги всех покупок
+        (учет лотов не строится), после продаж - количество и себестоимость открытых лотов
+        """
+        if not self.current_asset:
+            return None
+        asset = self.current_asset
+        if not asset.sales:
+            return asset.aggregate
+        lots = asset.lots
+        return PositionAggregate(lots.open_cost, lots.open_quantity, asset.aggregate.count)
+    
+    def get_purchase(self, purchase_id: int) -> Optional[Purchase]:
+        """Возвращает покупку текущего актива по ID"""
+        if not self.current_asset:
+            return None
+        return self.current_asset.purchases.get(purchase_id)
+    
     def get_last_purchase(self) -> Optional[Purchase]:
         """Возвращает последнюю покупку текущего актива"""
-        if not self.current_asset or not self.current_asset.purchases:
+        if not self.current_asset:
             return None
-        return self.current_asset.purchases[-1]
+        return self.current_asset.purchases.last()
     
     def set_drawdown_percent(self, drawdown: Decimal):
         """Устанавливает процент просадки для текущего актива"""
         if self.current_asset:
             self.current_asset.drawdown_percent = drawdown
-            # Автоматически сохраняем
-            self.save_current_asset()
+            # Автоматически сохраняем (одно инкрементальное изменение)
+            self.storage.set_drawdown_percent(self.current_asset, drawdown)
+            self._schedule_flush()
     
     def set_currency(self, currency: Currency):
         """Устанавливает валюту для текущего актива"""
         if self.current_asset:
             self.current_asset.currency = currency
-            # Автоматически сохраняем
-            self.save_current_asset()
+            # Автоматически сохраняем (одно инкрементальное изменение)
+            self.storage.set_currency(self.current_asset, currency)
+            self._schedule_flush()
     
     def get_drawdown_percent(self) -> Decimal:
         """Возвращает процент просадки текущего актива"""
@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+
+# Ключ задачи: (название актива, вид записи), например ("BTC", "journal")
+TaskKey = Tuple[str, Hashable]
+
+
+class BackgroundSaver:
+    """
+    Фоновый поток записи на диск (write-behind).
+    Задачи ставятся в очередь по ключу; если задача с таким ключом еще ждет выполнения,
+    она заменяется новой, поэтому серия быстрых изменений приводит к одной записи на диск.
+    Ошибка записи передается в on_error и остается в last_error, пока следующая запись
+    того же актива не пройдет успешно (так ее видно и без обработчика, например при выходе).
+    """
+
+    def __init__(self, on_error: Optional[Callable[[str, Exception], None]] = None):
+        self.on_error = on_error  # Вызывается из фонового потока: (название актива, ошибка)
+        self._pending: "OrderedDict[TaskKey, Callable[[], None]]" = OrderedDict()
+        self._running: Optional[TaskKey] = None
+        self._errors: "OrderedDict[str, Exception]" = OrderedDict()  # Актив -> последняя неисправленная ошибка
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="BackgroundSaver", daemon=True)
+        self._thread.start()
+
+    def schedule(self, key: TaskKey, task: Callable[[], None]) -> None:
+        """Ставит задачу в очередь, заменяя еще не выполненную задачу с тем же ключом"""
+        with self._condition:
+            if self._stopped:
+                # После остановки пишем синхронно, чтобы не потерять данные
+                self._execute(key, task)
+                return
+            # Замененная задача сохраняет свое место в очереди
+            self._pending[key] = task
+            self._condition.notify_all()
+
+    @property
+    def last_error(self) -> Optional[Tuple[str, Exception]]:
+        """(название актива, ошибка) последней записи, которая не прошла и еще не была повторена успешно"""
+        with self._condition:
+            return next(reversed(self._errors.items()), None)
+
+    def is_pending(self, key: TaskKey) -> bool:
+        """Проверяет, ждет ли задача с таким ключом выполнения"""
+        with self._condition:
+            return key in self._pending
+
+    def discard(self, asset_name: str) -> None:
+        """Отменяет ожидающие задачи актива и дожидается завершения выполняемой"""
+        with self._condition:
+            for key in [k for k in self._pending if k[0] == asset_name]:
+                del self._pending[key]
+        self.flush(asset_name)
+        with self._condition:
+            # Запись актива больше не нужна, поэтому и ее ошибка не актуальна
+            self._errors.pop(asset_name, None)
+
+    def flush(self, asset_name: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        Дожидается выполнения задач актива (или всех задач, если актив не указан).
+        Возвращает False, если истек таймаут.
+        """
+        def is_done():
+            if asset_name is None:
+                return not self._pending and self._running is None
+            if self._running is not None and self._running[0] == asset_name:
+                return False
+            return not any(k[0] == asset_name for k in self._pending)
+
+        with self._condition:
+            return self._condition.wait_for(is_done, timeout=timeout)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Выполняет все оставшиеся задачи и останавливает поток"""
+        self.flush(timeout=timeout)
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        """Основной цикл фонового потока"""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending or self._stopped)
+                if not self._pending:
+                    return
+                key, task = self._pending.popitem(last=False)
+                self._running = key
+            try:
+                self._execute(key, task)
+            finally:
+                with self._condition:
+                    self._running = None
+                    self._condition.notify_all()
+
+    def _execute(self, key: TaskKey, task: Callable[[], None]) -> None:
+        """Выполняет задачу, запоминая ошибку и передавая ее в обработчик"""
+        try:
+            task()
+        except Exception as e:
+            print(f"Ошибка при фоновом сохранении актива: {e}")
+            with self._condition:
+                self._errors.pop(key[0], None)
+                self._errors[key[0]] = e
+            if self.on_error:
+                self.on_error(key[0], e)
+        else:
+            with self._condition:
+                self._errors.pop(key[0], None)
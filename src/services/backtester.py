@@ -0,0 +1,228 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, Optional, Sequence, Tuple
+from src.models.backtest_result import BacktestResult
+from src.models.position_aggregate import PositionAggregate
+from src.models.purchase import Purchase
+from src.services.calculator import Calculator
+from src.utils.precision import quantize_price
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+# Секунды Unix меньше этого порога (год ~5138); большие числа - миллисекунды, микро- или наносекунды
+_MAX_UNIX_SECONDS = 1e11
+# Начало условного времени для файлов без колонки времени: покупка на баре N получает _EPOCH + N секунд
+_EPOCH = datetime(1970, 1, 1)
+
+class Backtester:
+    """
+    Прогон правила усреднения по историческим ценам из локальных файлов.
+    Первая покупка совершается по первой цене файла, каждая следующая - лимитной заявкой
+    по Calculator.calculate_next_purchase_price от цены последней покупки, как только цена
+    опускается до нее. Файл читается блоками (CSV, Parquet) или отображается в память (.npy),
+    поэтому память ограничена размером блока и количеством покупок, а не длиной истории.
+    """
+
+    DEFAULT_CHUNK_SIZE = 500_000  # Строк в одном блоке CSV/Parquet
+
+    @staticmethod
+    def run(
+        source: Path,
+        drawdown_percent: Decimal,
+        investment: Decimal,
+        price_column: str = "low",
+        time_column: Optional[str] = "timestamp",
+        time_source: Optional[Path] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        symbol: Optional[str] = None
+    ) -> BacktestResult:
+        """
+        Прогоняет правило по одному файлу цен.
+        source: .csv или .parquet (колонки price_column и time_column) либо .npy с ценами float64;
+        для .npy время берется из time_source (.npy с Unix-временем), если он указан.
+        Числовое время может быть в секундах, миллисекундах, микро- или наносекундах (определяется по величине).
+        Без колонки времени покупки получают условное время: начало эпохи + номер бара в секундах.
+        Для баров OHLC price_column="low" означает, что заявка исполняется, если минимум бара
+        дошел до цены докупки; для тиков укажите колонку цены тика.
+        """
+        if investment <= 0:
+            raise ValueError("Сумма вложений должна быть больше нуля")
+        if drawdown_percent <= 0 or drawdown_percent >= 100:
+            raise ValueError("Процент просадки должен быть от 0 до 100")
+
+        source = Path(source)
+        result = BacktestResult(symbol=symbol or source.stem)
+        aggregate = PositionAggregate()
+        next_price: Optional[Decimal] = None
+        trigger = float("-inf")
+
+        for prices, times in Backtester._iter_chunks(source, price_column, time_column, time_source, chunk_size):
+            if len(prices) == 0:
+                continue
+            start = 0
+            if next_price is None:
+                first_price = quantize_price(Decimal(repr(float(prices[0]))))
+                Backtester._fill(result, aggregate, investment, first_price, times, 0, result.bars)
+                next_price = quantize_price(Calculator.calculate_next_purchase_price(first_price, drawdown_percent))
+                trigger = float(next_price)
+                start = 1
+
+            # Ищем следующее касание цены докупки векторно; после покупки цена докупки сдвигается
+            while start < len(prices):
+                hits = prices[start:] <= trigger
+                offset = int(hits.argmax())
+                if not hits[offset]:
+                    break
+                index = start + offset
+                Backtester._fill(result, aggregate, investment, next_price, times, index, result.bars)
+                next_price = quantize_price(Calculator.calculate_next_purchase_price(next_price, drawdown_percent))
+                trigger = float(next_price)
+                start = index + 1
+
+            result.bars += len(prices)
+            result.last_price = Decimal(repr(float(prices[-1])))
+
+        return result
+
+    @staticmethod
+    def run_many(
+        sources: Dict[str, Path],
+        drawdown_percent: Decimal,
+        investment: Decimal,
+        workers: Optional[int] = None,
+        **options
+    ) -> Dict[str, BacktestResult]:
+        """
+        Прогоняет правило по нескольким инструментам параллельно (по процессу на файл).
+        sources: {инструмент: путь к файлу}; options передаются в run.
+        """
+        if not sources:
+            return {}
+        tasks = [
+            (Path(path), drawdown_percent, investment, {**options, "symbol": symbol})
+            for symbol, path in sources.items()
+        ]
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers == 1:
+            results = [_run_task(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_run_task, tasks))
+        return {result.symbol: result for result in results}
+
+    @staticmethod
+    def _fill(
+        result: BacktestResult,
+        aggregate: PositionAggregate,
+        investment: Decimal,
+        price: Decimal,
+        times: Optional[Sequence],
+        index: int,
+        first_bar: int
+    ) -> None:
+        """
+        Записывает покупку на строке index блока и новую точку ряда безубыточной точки.
+        first_bar - номер первой строки блока в файле (для условного времени без колонки времени)
+        """
+        timestamp = Backtester._to_datetime(times[index]) if times is not None else None
+        if timestamp is None:
+            # Условное время растет вместе с номером бара, поэтому порядок покупок по времени сохраняется
+            timestamp = _EPOCH + timedelta(seconds=first_bar + index)
+        purchase = Purchase(
+            id=len(result.purchases) + 1,
+            investment=investment,
+            price=price,
+            quantity=Calculator.calculate_quantity(investment, price),
+            timestamp=timestamp
+        )
+        aggregate.add(purchase)
+        result.purchases.append(purchase)
+        result.break_even_series.append((timestamp, aggregate.break_even))
+
+    @staticmethod
+    def _iter_chunks(
+        source: Path,
+        price_column: str,
+        time_column: Optional[str],
+        time_source: Optional[Path],
+        chunk_size: int
+    ) -> Iterator[Tuple["np.ndarray", Optional[Sequence]]]:
+        """Блоки (цены float64, значения времени или None) в порядке следования в файле"""
+        import numpy as np
+
+        suffix = source.suffix.lower()
+        if suffix == ".npy":
+            # Бинарная колонка: отображение в память, страницы подгружает ОС
+            prices = np.load(source, mmap_mode="r")
+            times = np.load(time_source, mmap_mode="r") if time_source else None
+            for start in range(0, len(prices), chunk_size):
+                chunk_times = times[start:start + chunk_size] if times is not None else None
+                yield np.asarray(prices[start:start + chunk_size], dtype=float), chunk_times
+        elif suffix == ".csv":
+            import pandas as pd
+            columns = [price_column] + ([time_column] if time_column else [])
+            with pd.read_csv(source, usecols=columns, chunksize=chunk_size) as reader:
+                for frame in reader:
+                    yield (
+                        frame[price_column].to_numpy(dtype=float),
+                        frame[time_column].to_numpy() if time_column else None
+                    )
+        elif suffix == ".parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Для чтения Parquet нужен пакет pyarrow") from e
+            columns = [price_column] + ([time_column] if time_column else [])
+            for batch in pq.ParquetFile(source).iter_batches(batch_size=chunk_size, columns=columns):
+                yield (
+                    batch.column(price_column).to_numpy(zero_copy_only=False).astype(float),
+                    batch.column(time_column).to_pylist() if time_column else None
+                )
+        else:
+            raise ValueError(f"Неподдерживаемый формат файла цен: {source.suffix}")
+
+    @staticmethod
+    def _to_datetime(value) -> Optional[datetime]:
+        """
+        Время из значения колонки (UTC без часового пояса): datetime, ISO-строка, numpy.datetime64
+        или Unix-время в секундах, миллисекундах, микро- или наносекундах
+        """
+        import numpy as np
+
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            return Backtester._to_utc_naive(value)
+        if isinstance(value, np.datetime64):
+            return value.astype("datetime64[us]").item()
+        if isinstance(value, str):
+            value = value.strip()
+            # В колонке со смешанными формами Unix-время тоже читается строкой
+            if not value.replace(".", "", 1).isdigit():
+                return Backtester._to_utc_naive(datetime.fromisoformat(value.replace("Z", "+00:00")))
+        seconds = float(value)
+        # Биржи выгружают время в разных единицах: каждая следующая в 1000 раз мельче
+        while abs(seconds) >= _MAX_UNIX_SECONDS:
+            seconds /= 1000
+        return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+    @staticmethod
+    def _to_utc_naive(moment: datetime) -> datetime:
+        """
+        Время с часовым поясом переводится в UTC без пояса, как и Unix-время,
+        чтобы значения в разных формах в одном файле были сравнимы; время без пояса считается UTC
+        """
+        if moment.tzinfo is None:
+            return moment
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _run_task(task: Tuple[Path, Decimal, Decimal, dict]) -> BacktestResult:
+    """Прогон одного файла в отдельном процессе (функция уровня модуля для передачи в пул)"""
+    source, drawdown_percent, investment, options = task
+    return Backtester.run(source, drawdown_percent, investment, **options)
@@ -1,26 +1,40 @@
 from decimal import Decimal
 from typing import List
 from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+from src.models.position_aggregate import PositionAggregate
+from src.models.ladder_plan import LadderPlan
+from src.models.sensitivity_grid import SensitivityGrid
+from src.utils.precision import divide_quantity
 
 
 class Calculator:
     """Класс для выполнения расчетов безубыточной точки и прогнозирования"""
     
+    # Способы расчета суммы докупок в лестнице
+    LADDER_FIXED = "fixed"  # Одинаковая сумма на каждом шаге
+    LADDER_MULTIPLIER = "multiplier"  # Сумма умножается на коэффициент на каждом шаге (мартингейл)
+    LADDER_CAPITAL_PERCENT = "capital_percent"  # Процент от оставшегося капитала
+    
     @staticmethod
     def calculate_quantity(investment: Decimal, price: Decimal) -> Decimal:
-        """Рассчитывает количество активов для покупки"""
+        """Рассчитывает количество активов для покупки (с точностью QUANTITY_DECIMALS)"""
         if price <= 0:
             raise ValueError("Цена должна быть больше нуля")
-        return investment / price
+        return divide_quantity(investment, price)
     
     @staticmethod
     def calculate_total_investment(purchases: List[Purchase]) -> Decimal:
         """Суммирует все вложенные средства"""
+        if isinstance(purchases, PurchaseStore):
+            return purchases.total("investment")
         return sum(p.investment for p in purchases)
     
     @staticmethod
     def calculate_total_quantity(purchases: List[Purchase]) -> Decimal:
         """Суммирует все купленные активы"""
+        if isinstance(purchases, PurchaseStore):
+            return purchases.total("quantity")
         return sum(p.quantity for p in purchases)
     
     @staticmethod
@@ -40,6 +54,15 @@ class Calculator:
         
         return total_investment / total_quantity
     
+    @staticmethod
+    def calculate_break_even_from_aggregate(aggregate: PositionAggregate | None) -> Decimal | None:
+        """
+        Возвращает безубыточную точку по готовым итогам позиции без повторного обхода покупок
+        """
+        if aggregate is None:
+            return None
+        return aggregate.break_even
+    
     @staticmethod
     def calculate_next_purchase_price(last_price: Decimal, drawdown_percent: Decimal) -> Decimal | None:
         """
@@ -54,3 +77,216 @@ class Calculator:
         
         return last_price * (Decimal('1') - drawdown_percent / Decimal('100'))
 
+    
+    @staticmethod
+    def calculate_required_investment(
+        aggregate: PositionAggregate | None,
+        price: Decimal,
+        target_break_even: Decimal
+    ) -> Decimal | None:
+        """
+        Рассчитывает сумму докупки по цене price, после которой безубыточная точка станет target_break_even
+        Формула: price * (target * total_quantity - total_investment) / (price - target)
+        Возвращает 0, если цель уже достигнута, и None, если цель недостижима при этой цене
+        """
+        if price <= 0 or target_break_even <= 0:
+            raise ValueError("Цена должна быть больше нуля")
+        if aggregate is None or aggregate.count == 0 or aggregate.total_quantity == 0:
+            return None
+        
+        shortfall = target_break_even * aggregate.total_quantity - aggregate.total_investment
+        if shortfall == 0:
+            return Decimal('0')
+        if price == target_break_even:
+            return None
+        
+        investment = price * shortfall / (price - target_break_even)
+        return investment if investment > 0 else None
+    
+    @staticmethod
+    def calculate_required_price(
+        aggregate: PositionAggregate | None,
+        investment: Decimal,
+        target_break_even: Decimal
+    ) -> Decimal | None:
+        """
+        Рассчитывает цену, по которой докупка на сумму investment даст безубыточную точку target_break_even
+        Формула: investment * target / (total_investment + investment - target * total_quantity)
+        Возвращает None, если при такой сумме цель недостижима
+        """
+        if investment <= 0:
+            raise ValueError("Сумма вложений должна быть больше нуля")
+        if target_break_even <= 0:
+            raise ValueError("Цена должна быть больше нуля")
+        if aggregate is None or aggregate.count == 0 or aggregate.total_quantity == 0:
+            return None
+        
+        denominator = aggregate.total_investment + investment - target_break_even * aggregate.total_quantity
+        if denominator <= 0:
+            return None
+        return investment * target_break_even / denominator
+    
+    @staticmethod
+    def calculate_required_investment_batch(aggregate: PositionAggregate | None, prices, target_break_evens):
+        """
+        Векторная версия calculate_required_investment (NumPy, float64).
+        prices и target_break_evens приводятся друг к другу по правилам broadcasting:
+        для сетки используйте prices[:, None] и target_break_evens[None, :].
+        Недостижимые комбинации (и все при пустой позиции) возвращаются как NaN.
+        """
+        import numpy as np
+        
+        prices = np.asarray(prices, dtype=float)
+        targets = np.asarray(target_break_evens, dtype=float)
+        if np.any(prices <= 0) or np.any(targets <= 0):
+            raise ValueError("Цена должна быть больше нуля")
+        if aggregate is None or aggregate.count == 0 or aggregate.total_quantity == 0:
+            return np.full(np.broadcast(prices, targets).shape, np.nan)
+        
+        shortfall = targets * float(aggregate.total_quantity) - float(aggregate.total_investment)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            investments = np.where(shortfall == 0, 0.0, prices * shortfall / (prices - targets))
+        return np.where(np.isfinite(investments) & (investments >= 0), investments, np.nan)
+    
+    @staticmethod
+    def calculate_required_price_batch(aggregate: PositionAggregate | None, investments, target_break_evens):
+        """
+        Векторная версия calculate_required_price (NumPy, float64).
+        investments и target_break_evens приводятся друг к другу по правилам broadcasting.
+        Недостижимые комбинации (и все при пустой позиции) возвращаются как NaN.
+        """
+        import numpy as np
+        
+        investments = np.asarray(investments, dtype=float)
+        targets = np.asarray(target_break_evens, dtype=float)
+        if np.any(investments <= 0):
+            raise ValueError("Сумма вложений должна быть больше нуля")
+        if np.any(targets <= 0):
+            raise ValueError("Цена должна быть больше нуля")
+        if aggregate is None or aggregate.count == 0 or aggregate.total_quantity == 0:
+            return np.full(np.broadcast(investments, targets).shape, np.nan)
+        
+        denominator = float(aggregate.total_investment) + investments - targets * float(aggregate.total_quantity)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            prices = investments * targets / denominator
+        return np.where(denominator > 0, prices, np.nan)
+    
+    @staticmethod
+    def calculate_sensitivity_grid(
+        last_price,
+        drawdown_percents,
+        investments,
+        aggregate: PositionAggregate | None = None
+    ) -> SensitivityGrid:
+        """
+        Оценивает все сочетания просадки и суммы следующей докупки одним векторным проходом (NumPy, float64).
+        Для просадки d цена докупки last_price * (1 - d / 100), безубыточная точка после докупки суммы x:
+        (total_investment + x) / (total_quantity + x / price)
+        """
+        import numpy as np
+        
+        if last_price is None or last_price <= 0:
+            raise ValueError("Цена должна быть больше нуля")
+        
+        drawdowns = np.asarray(drawdown_percents, dtype=float).ravel()
+        amounts = np.asarray(investments, dtype=float).ravel()
+        if drawdowns.size == 0 or amounts.size == 0:
+            raise ValueError("Сетка сценариев пуста")
+        if np.any(drawdowns < 0) or np.any(drawdowns >= 100):
+            raise ValueError("Процент просадки должен быть от 0 до 100")
+        if np.any(amounts <= 0):
+            raise ValueError("Сумма вложений должна быть больше нуля")
+        
+        next_prices = float(last_price) * (1.0 - drawdowns / 100.0)
+        start_investment = float(aggregate.total_investment) if aggregate else 0.0
+        start_quantity = float(aggregate.total_quantity) if aggregate else 0.0
+        
+        # (D, 1) против (1, I): одна операция на всю сетку
+        total_quantity = start_quantity + amounts[np.newaxis, :] / next_prices[:, np.newaxis]
+        break_even = (start_investment + amounts[np.newaxis, :]) / total_quantity
+        
+        current = aggregate.break_even if aggregate else None
+        return SensitivityGrid(
+            drawdowns=drawdowns,
+            investments=amounts,
+            next_prices=next_prices,
+            break_even=break_even,
+            current_break_even=float(current) if current is not None else None
+        )
+    
+    @staticmethod
+    def plan_ladder(
+        last_price,
+        drawdown_percent,
+        levels: int,
+        base_amount,
+        sizing: str = LADDER_FIXED,
+        sizing_param=None,
+        aggregate: PositionAggregate | None = None
+    ) -> LadderPlan:
+        """
+        Рассчитывает лестницу из levels будущих докупок одним векторным проходом (NumPy, float64).
+        
+        last_price, base_amount, sizing_param - числа или массивы формы (S,) для S наборов параметров.
+        drawdown_percent - просадка каждого шага от предыдущей цены: число, массив (levels,)
+        или массив, приводимый к форме (S, levels).
+        Сумма шага k (k = 0..levels-1) в зависимости от sizing:
+            fixed:           base_amount
+            multiplier:      base_amount * sizing_param ** k
+            capital_percent: base_amount * p * (1 - p) ** k, где base_amount - капитал, p = sizing_param / 100
+        Текущая позиция (aggregate) учитывается в общей сумме, количестве и безубыточной точке.
+        """
+        import numpy as np
+        
+        if levels < 1:
+            raise ValueError("Количество шагов должно быть больше нуля")
+        
+        last_price = np.asarray(last_price, dtype=float)
+        if np.any(last_price <= 0):
+            raise ValueError("Цена должна быть больше нуля")
+        
+        drawdowns = np.asarray(drawdown_percent, dtype=float)
+        if np.any(drawdowns < 0) or np.any(drawdowns >= 100):
+            raise ValueError("Процент просадки должен быть от 0 до 100")
+        
+        base_amount = np.asarray(base_amount, dtype=float)[..., np.newaxis]
+        steps = np.arange(levels, dtype=float)
+        
+        # Цены: последовательное применение просадок к последней цене
+        factors = np.broadcast_to(1.0 - drawdowns / 100.0, np.broadcast_shapes(drawdowns.shape, (levels,)))
+        prices = last_price[..., np.newaxis] * np.cumprod(factors, axis=-1)
+        
+        if sizing == Calculator.LADDER_FIXED:
+            investments = base_amount * np.ones(levels)
+        elif sizing == Calculator.LADDER_MULTIPLIER:
+            multiplier = np.asarray(1.0 if sizing_param is None else sizing_param, dtype=float)[..., np.newaxis]
+            investments = base_amount * multiplier ** steps
+        elif sizing == Calculator.LADDER_CAPITAL_PERCENT:
+            if sizing_param is None:
+                raise ValueError("Укажите процент капитала")
+            share = np.asarray(sizing_param, dtype=float)[..., np.newaxis] / 100.0
+            if np.any(share <= 0) or np.any(share > 1):
+                raise ValueError("Процент капитала должен быть от 0 до 100")
+            investments = base_amount * share * (1.0 - share) ** steps
+        else:
+            raise ValueError(f"Неизвестный способ расчета суммы: {sizing}")
+        
+        if np.any(investments <= 0):
+            raise ValueError("Сумма вложений должна быть больше нуля")
+        
+        prices, investments = np.broadcast_arrays(prices, investments)
+        quantities = investments / prices
+        
+        start_investment = float(aggregate.total_investment) if aggregate else 0.0
+        start_quantity = float(aggregate.total_quantity) if aggregate else 0.0
+        cumulative_investment = start_investment + np.cumsum(investments, axis=-1)
+        cumulative_quantity = start_quantity + np.cumsum(quantities, axis=-1)
+        
+        return LadderPlan(
+            prices=prices,
+            investments=investments,
+            quantities=quantities,
+            cumulative_investment=cumulative_investment,
+            cumulative_quantity=cumulative_quantity,
+            break_even=cumulative_investment / cumulative_quantity
+        )
@@ -3,10 +3,14 @@ from pathlib import Path
 from datetime import datetime
 from decimal import Decimal
 from typing import List
-import pandas as pd
 from src.models.asset import Asset
 from src.models.purchase import Purchase
+from src.models.sale import Sale
+from src.models.lot_engine import LotEngine
 from src.utils.currency import Currency
+from src.utils.precision import quantize_price, quantize_quantity, restore_amount
+from src.services.asset_catalog import AssetCatalog
+from src.services.purchase_journal import PurchaseJournal
 
 
 class ExcelExporter:
@@ -29,6 +33,32 @@ class ExcelExporter:
         filename = f"{asset_name}.xlsx"
         return assets_dir / filename
     
+    @staticmethod
+    def get_journal(asset_name: str) -> PurchaseJournal:
+        """Возвращает журнал изменений актива (файл рядом с .xlsx)"""
+        return PurchaseJournal.for_asset(ExcelExporter._get_filepath(asset_name))
+    
+    @staticmethod
+    def get_catalog_path() -> Path:
+        """Возвращает путь к каталогу сводок по активам"""
+        return ExcelExporter._ensure_assets_dir() / AssetCatalog.CATALOG_FILENAME
+    
+    @staticmethod
+    def get_file_signature(asset_name: str) -> tuple:
+        """
+        Возвращает подпись файлов актива на диске: (mtime_ns, размер) .xlsx и журнала.
+        Отсутствующий файл дает (0, 0).
+        """
+        filepath = ExcelExporter._get_filepath(asset_name)
+        signature = []
+        for path in (filepath, filepath.with_suffix(PurchaseJournal.JOURNAL_SUFFIX)):
+            try:
+                stat = path.stat()
+                signature.extend((stat.st_mtime_ns, stat.st_size))
+            except FileNotFoundError:
+                signature.extend((0, 0))
+        return tuple(signature)
+    
     @staticmethod
     def export_asset(asset: Asset) -> bool:
         """
@@ -36,55 +66,114 @@ class ExcelExporter:
         Возвращает True если успешно, False если ошибка
         """
         try:
+            # pandas импортируется только при первой записи, чтобы не замедлять запуск
+            import pandas as pd
+            
             filepath = ExcelExporter._get_filepath(asset.name)
             
             # Обновляем дату обновления
             asset.updated_at = datetime.now()
             
-            # Создаем DataFrame для покупок
-            purchases_data = []
-            for idx, purchase in enumerate(asset.purchases, start=1):
-                purchases_data.append({
-                    "№": idx,
-                    "Дата": purchase.timestamp.strftime("%Y-%m-%d %H:%M:%S") if purchase.timestamp else "",
-                    "Сумма вложений": float(purchase.investment),
-                    "Цена покупки": float(purchase.price),
-                    "Количество": float(purchase.quantity)
+            # Создаем DataFrame для покупок прямо из колонок хранилища (без объектов Purchase)
+            # Безубыточная точка после покупки только для чтения в Excel: при загрузке не используется
+            purchases_columns = [
+                "№", "Дата", "Сумма вложений", "Цена покупки", "Количество", "ID", "ID сделки", "Безубыточная точка"
+            ]
+            purchases = asset.purchases
+            if len(purchases):
+                import numpy as np
+                
+                dates = np.datetime_as_string(purchases.timestamps().astype("datetime64[s]"), unit="s")
+                purchases_df = pd.DataFrame({
+                    "№": np.arange(1, len(purchases) + 1),
+                    "Дата": np.char.replace(dates, "T", " "),
+                    "Сумма вложений": purchases.values("investment"),
+                    "Цена покупки": purchases.values("price"),
+                    "Количество": purchases.values("quantity"),
+                    "ID": purchases.units("id"),
+                    "ID сделки": purchases.trade_id_column(),
+                    "Безубыточная точка": purchases.break_even_column()
                 })
-            
-            # Создаем DataFrame даже если покупок нет (с заголовками)
-            if purchases_data:
-                purchases_df = pd.DataFrame(purchases_data)
             else:
-                purchases_df = pd.DataFrame(columns=["№", "Дата", "Сумма вложений", "Цена покупки", "Количество"])
+                # Создаем DataFrame даже если покупок нет (с заголовками)
+                purchases_df = pd.DataFrame(columns=purchases_columns)
+            
+            # Создаем DataFrame для продаж
+            sales_columns = ["№", "Дата", "Количество", "Цена продажи", "ID"]
+            sales_df = pd.DataFrame(
+                [
+                    [
+                        idx,
+                        sale.timestamp.strftime("%Y-%m-%d %H:%M:%S") if sale.timestamp else "",
+                        float(sale.quantity),
+                        float(sale.price),
+                        sale.id
+                    ]
+                    for idx, sale in enumerate(asset.sales, start=1)
+                ],
+                columns=sales_columns
+            )
             
             # Создаем DataFrame для настроек
             settings_data = {
-                "Параметр": ["Валюта", "Процент просадки", "Дата создания", "Дата обновления"],
+                "Параметр": [
+                    "Валюта", "Процент просадки", "Дата создания", "Дата обновления",
+                    "Метод учета лотов", "Следующий ID покупки", "Следующий ID продажи"
+                ],
                 "Значение": [
                     asset.currency.code,
                     float(asset.drawdown_percent),
                     asset.created_at.strftime("%Y-%m-%d %H:%M:%S"),
-                    asset.updated_at.strftime("%Y-%m-%d %H:%M:%S")
+                    asset.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
+                    asset.lot_method,
+                    asset.next_purchase_id,
+                    asset.next_sale_id
                 ]
             }
             settings_df = pd.DataFrame(settings_data)
             
-            # Записываем в Excel
-            with pd.ExcelWriter(filepath, engine='openpyxl') as writer:
+            # Записываем во временный файл и атомарно заменяем им старый,
+            # чтобы при чтении во время фоновой записи не получить недописанный файл
+            tmp_path = filepath.with_name(filepath.name + ".tmp")
+            with pd.ExcelWriter(tmp_path, engine='openpyxl') as writer:
                 purchases_df.to_excel(writer, sheet_name='Purchases', index=False)
+                sales_df.to_excel(writer, sheet_name='Sales', index=False)
                 settings_df.to_excel(writer, sheet_name='Settings', index=False)
+            os.replace(tmp_path, filepath)
             
             return True
         except Exception as e:
             print(f"Ошибка при сохранении актива: {e}")
             return False
     
+    @staticmethod
+    def _parse_datetime(value, default: datetime | None = None) -> datetime:
+        """Парсит дату из ячейки Excel с обработкой ошибок"""
+        if default is None:
+            default = datetime.now()
+        if value is None:
+            return default
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            try:
+                # fromisoformat понимает и "%Y-%m-%d %H:%M:%S", и "%Y-%m-%d", и работает быстрее strptime
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return default
+        return default
+    
+    @staticmethod
+    def _to_decimal(value) -> Decimal:
+        """Преобразует число из ячейки Excel в Decimal без двоичных хвостов float"""
+        return Decimal(str(value))
+    
     @staticmethod
     def import_asset(asset_name: str) -> Asset | None:
         """
         Импортирует актив из Excel файла
         Возвращает Asset или None если файл не найден или ошибка
+        Файл открывается один раз в потоковом режиме (read_only), покупки строятся по колонкам
         """
         try:
             filepath = ExcelExporter._get_filepath(asset_name)
@@ -92,77 +181,131 @@ class ExcelExporter:
             if not filepath.exists():
                 return None
             
-            # Читаем настройки
-            try:
-                settings_df = pd.read_excel(filepath, sheet_name='Settings')
-                settings_dict = dict(zip(settings_df['Параметр'], settings_df['Значение']))
-            except Exception:
-                # Если лист Settings не существует, используем значения по умолчанию
-                settings_dict = {}
-            
-            # Определяем валюту
-            currency_code = str(settings_dict.get('Валюта', 'USD'))
-            currency = Currency.USD
-            for c in Currency:
-                if c.code == currency_code:
-                    currency = c
-                    break
+            # openpyxl импортируется только при первой загрузке, чтобы не замедлять запуск
+            from openpyxl import load_workbook
             
-            # Парсим даты с обработкой ошибок
-            def parse_datetime(value, default=None):
-                if default is None:
-                    default = datetime.now()
-                if pd.isna(value):
-                    return default
-                if isinstance(value, datetime):
-                    return value
-                if isinstance(value, str):
-                    try:
-                        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S")
-                    except:
-                        try:
-                            return datetime.strptime(value, "%Y-%m-%d")
-                        except:
-                            return default
-                return default
+            workbook = load_workbook(filepath, read_only=True, data_only=True)
+            try:
+                settings_dict = ExcelExporter._read_settings(workbook)
+                
+                # Определяем валюту
+                currency_code = str(settings_dict.get('Валюта', 'USD'))
+                currency = Currency.USD
+                for c in Currency:
+                    if c.code == currency_code:
+                        currency = c
+                        break
+                
+                purchases = ExcelExporter._read_purchases(workbook, currency)
+                sales = ExcelExporter._read_sales(workbook)
+            finally:
+                # В режиме read_only файл остается открытым до явного закрытия
+                workbook.close()
             
-            created_at = parse_datetime(settings_dict.get('Дата создания'))
-            updated_at = parse_datetime(settings_dict.get('Дата обновления'))
+            drawdown = settings_dict.get('Процент просадки')
+            lot_method = str(settings_dict.get('Метод учета лотов') or LotEngine.FIFO)
+            if lot_method not in LotEngine.METHODS:
+                lot_method = LotEngine.FIFO
             
-            # Создаем актив
-            asset = Asset(
+            # Создаем актив (итоги позиции строятся один раз в конструкторе)
+            return Asset(
                 name=asset_name,
                 currency=currency,
-                drawdown_percent=Decimal(str(settings_dict.get('Процент просадки', 15.0))),
-                created_at=created_at,
-                updated_at=updated_at
+                drawdown_percent=ExcelExporter._to_decimal(drawdown if drawdown is not None else 15.0),
+                purchases=purchases,
+                sales=sales,
+                lot_method=lot_method,
+                next_purchase_id=int(settings_dict.get('Следующий ID покупки') or 1),
+                next_sale_id=int(settings_dict.get('Следующий ID продажи') or 1),
+                created_at=ExcelExporter._parse_datetime(settings_dict.get('Дата создания')),
+                updated_at=ExcelExporter._parse_datetime(settings_dict.get('Дата обновления'))
             )
-            
-            # Читаем покупки
-            try:
-                purchases_df = pd.read_excel(filepath, sheet_name='Purchases')
-                
-                for _, row in purchases_df.iterrows():
-                    if pd.isna(row.get('№')):
-                        continue
-                    
-                    purchase = Purchase(
-                        id=int(row['№']),
-                        investment=Decimal(str(row['Сумма вложений'])),
-                        price=Decimal(str(row['Цена покупки'])),
-                        quantity=Decimal(str(row['Количество'])),
-                        timestamp=parse_datetime(row.get('Дата'))
-                    )
-                    asset.purchases.append(purchase)
-            except Exception as e:
-                # Если лист Purchases пустой или не существует, просто продолжаем
-                print(f"Ошибка при чтении покупок: {e}")
-            
-            return asset
         except Exception as e:
             print(f"Ошибка при загрузке актива: {e}")
             return None
     
+    @staticmethod
+    def _read_settings(workbook) -> dict:
+        """Читает лист Settings в словарь {Параметр: Значение}"""
+        if 'Settings' not in workbook.sheetnames:
+            # Если лист Settings не существует, используем значения по умолчанию
+            return {}
+        rows = workbook['Settings'].iter_rows(min_row=2, max_col=2, values_only=True)
+        return {row[0]: row[1] for row in rows if row and row[0] is not None}
+    
+    @staticmethod
+    def _read_purchases(workbook, currency: Currency) -> List[Purchase]:
+        """
+        Читает лист Purchases: сначала колонки целиком, затем собирает покупки.
+        Значения приводятся к точности хранения, поэтому float из ячейки восстанавливается
+        ровно в то Decimal, которое было сохранено
+        """
+        if 'Purchases' not in workbook.sheetnames:
+            return []
+        try:
+            rows = workbook['Purchases'].iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                return []
+            column_index = {name: i for i, name in enumerate(header) if name is not None}
+            number_col = column_index['№']
+            # Пропускаем пустые строки (без номера)
+            data = [row for row in rows if len(row) > number_col and row[number_col] is not None]
+            if not data:
+                return []
+            columns = list(zip(*data))
+            
+            def column(name):
+                index = column_index.get(name)
+                return columns[index] if index is not None and index < len(columns) else (None,) * len(data)
+            
+            # Колонка ID появилась вместе с журналом; в старых файлах ID = №
+            ids = [int(i if i is not None else n) for i, n in zip(column('ID'), columns[number_col])]
+            investments = [
+                restore_amount(ExcelExporter._to_decimal(value), currency)
+                for value in column('Сумма вложений')
+            ]
+            prices = [quantize_price(ExcelExporter._to_decimal(value)) for value in column('Цена покупки')]
+            quantities = [quantize_quantity(ExcelExporter._to_decimal(value)) for value in column('Количество')]
+            timestamps = list(map(ExcelExporter._parse_datetime, column('Дата')))
+            # ID сделки есть только у импортированных покупок
+            trade_ids = [str(t) if t not in (None, "") else None for t in column('ID сделки')]
+            
+            return [
+                Purchase(id=pid, investment=inv, price=price, quantity=qty, timestamp=ts, trade_id=tid)
+                for pid, inv, price, qty, ts, tid in zip(ids, investments, prices, quantities, timestamps, trade_ids)
+            ]
+        except Exception as e:
+            # Если лист Purchases пустой или поврежден, просто продолжаем без покупок
+            print(f"Ошибка при чтении покупок: {e}")
+            return []
+    
+    @staticmethod
+    def _read_sales(workbook) -> List[Sale]:
+        """Читает лист Sales (в файлах без продаж листа нет)"""
+        if 'Sales' not in workbook.sheetnames:
+            return []
+        try:
+            rows = workbook['Sales'].iter_rows(values_only=True)
+            header = next(rows, None)
+            if not header:
+                return []
+            index = {name: i for i, name in enumerate(header) if name is not None}
+            sales = []
+            for row in rows:
+                if len(row) <= index['ID'] or row[index['ID']] is None:
+                    continue
+                sales.append(Sale(
+                    id=int(row[index['ID']]),
+                    quantity=quantize_quantity(ExcelExporter._to_decimal(row[index['Количество']])),
+                    price=quantize_price(ExcelExporter._to_decimal(row[index['Цена продажи']])),
+                    timestamp=ExcelExporter._parse_datetime(row[index['Дата']])
+                ))
+            return sales
+        except Exception as e:
+            print(f"Ошибка при чтении продаж: {e}")
+            return []
+    
     @staticmethod
     def delete_asset(asset_name: str) -> bool:
         """
@@ -173,6 +316,8 @@ class ExcelExporter:
             filepath = ExcelExporter._get_filepath(asset_name)
             if filepath.exists():
                 filepath.unlink()
+                # Вместе с файлом удаляем и журнал изменений
+                ExcelExporter.get_journal(asset_name).delete()
                 return True
             return False
         except Exception as e:
@@ -0,0 +1,171 @@
+import threading
+from decimal import Decimal
+from typing import Callable, Dict, List
+from src.models.asset_summary import AssetSummary
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.models.sale import Sale
+from src.utils.currency import Currency
+from src.services.excel_exporter import ExcelExporter
+from src.services.purchase_journal import PurchaseJournal
+from src.services.asset_catalog import AssetCatalog
+from src.services.storage_backend import StorageBackend
+
+
+class ExcelStorageBackend(StorageBackend):
+    """
+    Хранилище в файлах .xlsx (один файл на актив) с журналом изменений.
+    Сводки по активам хранятся в каталоге и обновляются после каждой записи на диск.
+    """
+
+    # Количество записей журнала, после которого журнал сворачивается в .xlsx
+    JOURNAL_COMPACT_THRESHOLD = 500
+
+    def __init__(self):
+        self._journals: Dict[str, PurchaseJournal] = {}
+        # Сводка по последнему изменению каждого актива (задается вместе с записью в журнал)
+        self._summaries: Dict[str, AssetSummary] = {}
+        self._lock = threading.RLock()
+        self._catalog = AssetCatalog(ExcelExporter.get_catalog_path())
+
+    def _journal(self, name: str) -> PurchaseJournal:
+        """Возвращает общий для обоих потоков объект журнала актива"""
+        with self._lock:
+            journal = self._journals.get(name)
+            if journal is None:
+                journal = ExcelExporter.get_journal(name)
+                self._journals[name] = journal
+            return journal
+
+    def _append(self, asset: Asset, op: str, **data) -> None:
+        """Добавляет запись в журнал и запоминает сводку, соответствующую этой записи"""
+        with self._lock:
+            journal = self._journal(asset.name)
+            if op in (PurchaseJournal.OP_ADD, PurchaseJournal.OP_EDIT):
+                journal.append_purchase(data["purchase"], op)
+            elif op == PurchaseJournal.OP_SELL:
+                journal.append_sale(data["sale"])
+            else:
+                journal.append(op, **data)
+            self._summaries[asset.name] = AssetSummary.from_asset(asset)
+
+    def _update_catalog(self, name: str) -> None:
+        """
+        Записывает в каталог сводку актива с текущей подписью файлов.
+        Пропускается, если в журнале есть несброшенные записи: сводка опередила бы файл.
+        """
+        with self._lock:
+            summary = self._summaries.get(name)
+            journal = self._journals.get(name)
+            if summary is None or (journal is not None and journal.has_buffered):
+                return
+            self._catalog.put(summary, ExcelExporter.get_file_signature(name))
+        try:
+            self._catalog.save()
+        except OSError as e:
+            # Каталог - только ускоритель, поэтому ошибка его записи не критична
+            print(f"Ошибка при сохранении каталога активов: {e}")
+
+    def list_assets(self) -> List[str]:
+        return ExcelExporter.list_assets()
+
+    def list_summaries(self) -> Dict[str, AssetSummary]:
+        """Сводки из каталога, подпись которых совпадает с файлами на диске"""
+        summaries = {}
+        for name in self.list_assets():
+            summary = self._catalog.get(name, ExcelExporter.get_file_signature(name))
+            if summary is not None:
+                summaries[name] = summary
+        return summaries
+
+    def load_asset(self, name: str) -> Asset | None:
+        """Загружает актив из .xlsx и применяет несвернутые записи журнала"""
+        asset = ExcelExporter.import_asset(name)
+        if asset:
+            PurchaseJournal.apply_records(asset, self._journal(name).read_records())
+            # Актив уже в памяти, поэтому устаревшую запись каталога обновляем бесплатно
+            with self._lock:
+                self._summaries[name] = AssetSummary.from_asset(asset)
+            if self._catalog.get(name, ExcelExporter.get_file_signature(name)) is None:
+                self._update_catalog(name)
+        return asset
+
+    def save_asset(self, asset: Asset) -> bool:
+        """Полностью перезаписывает .xlsx и очищает журнал"""
+        journal = self._journal(asset.name)
+        with self._lock:
+            compacted_seq = journal.last_seq
+            self._summaries[asset.name] = AssetSummary.from_asset(asset)
+        if not ExcelExporter.export_asset(asset):
+            return False
+        journal.compact_through(compacted_seq)
+        self._update_catalog(asset.name)
+        return True
+
+    def prepare_save(self, asset: Asset) -> Callable[[], bool]:
+        """Снимок актива и позиция журнала: все записи до нее попадут в .xlsx"""
+        snapshot = StorageBackend.snapshot(asset)
+        journal = self._journal(asset.name)
+        with self._lock:
+            compacted_seq = journal.last_seq
+            self._summaries[asset.name] = AssetSummary.from_asset(asset)
+
+        def save():
+            if not ExcelExporter.export_asset(snapshot):
+                return False
+            journal.compact_through(compacted_seq)
+            self._update_catalog(snapshot.name)
+            return True
+
+        return save
+
+    def delete_asset(self, name: str) -> bool:
+        with self._lock:
+            self._journals.pop(name, None)
+            self._summaries.pop(name, None)
+            self._catalog.remove(name)
+        # ExcelExporter удаляет вместе с файлом и журнал
+        success = ExcelExporter.delete_asset(name)
+        try:
+            self._catalog.save()
+        except OSError as e:
+            print(f"Ошибка при сохранении каталога активов: {e}")
+        return success
+
+    def add_purchase(self, asset: Asset, purchase: Purchase) -> None:
+        self._append(asset, PurchaseJournal.OP_ADD, purchase=purchase)
+
+    def remove_purchase(self, asset: Asset, purchase_id: int) -> None:
+        self._append(asset, PurchaseJournal.OP_REMOVE, id=purchase_id)
+
+    def update_purchase(self, asset: Asset, purchase: Purchase) -> None:
+        self._append(asset, PurchaseJournal.OP_EDIT, purchase=purchase)
+
+    def add_sale(self, asset: Asset, sale: Sale) -> None:
+        self._append(asset, PurchaseJournal.OP_SELL, sale=sale)
+
+    def remove_sale(self, asset: Asset, sale_id: int) -> None:
+        self._append(asset, PurchaseJournal.OP_REMOVE_SALE, id=sale_id)
+
+    def set_lot_method(self, asset: Asset, method: str) -> None:
+        self._append(asset, PurchaseJournal.OP_LOT_METHOD, value=method)
+
+    def set_drawdown_percent(self, asset: Asset, drawdown: Decimal) -> None:
+        self._append(asset, PurchaseJournal.OP_DRAWDOWN, value=drawdown)
+
+    def set_currency(self, asset: Asset, currency: Currency) -> None:
+        self._append(asset, PurchaseJournal.OP_CURRENCY, code=currency.code)
+
+    def flush(self, name: str) -> None:
+        self._journal(name).flush()
+        self._update_catalog(name)
+
+    def has_pending_changes(self, name: str) -> bool:
+        return self._journal(name).record_count > 0
+
+    def needs_compaction(self, name: str) -> bool:
+        return self._journal(name).record_count >= self.JOURNAL_COMPACT_THRESHOLD
+
+    def get_signature(self, name: str) -> tuple:
+        """mtime и размер .xlsx и журнала"""
+        return ExcelExporter.get_file_signature(name)
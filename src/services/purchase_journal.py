@@ -0,0 +1,216 @@
+import json
+import os
+import threading
+from pathlib import Path
+from datetime import datetime
+from decimal import Decimal
+from typing import List
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.models.sale import Sale
+from src.utils.currency import Currency
+
+
+class PurchaseJournal:
+    """
+    Журнал изменений актива (write-ahead log в формате JSON Lines).
+    Каждое изменение дописывается в конец файла одной строкой,
+    а полная перезапись .xlsx (компактация) выполняется только периодически.
+    Записи сначала попадают в буфер в памяти и сбрасываются на диск методом flush(),
+    поэтому append() можно вызывать из потока интерфейса, а flush() - из фонового потока.
+    """
+
+    JOURNAL_SUFFIX = ".journal"
+
+    # Типы записей журнала
+    OP_ADD = "add"
+    OP_REMOVE = "remove"
+    OP_EDIT = "edit"
+    OP_DRAWDOWN = "drawdown"
+    OP_CURRENCY = "currency"
+    OP_SELL = "sell"
+    OP_REMOVE_SALE = "remove_sale"
+    OP_LOT_METHOD = "lot_method"
+
+    def __init__(self, filepath: Path):
+        self.filepath = Path(filepath)
+        self._lock = threading.RLock()
+        self._buffer: List[str] = []  # Записи, еще не сброшенные на диск
+        self._last_seq = 0  # Номер последней записи (монотонно растет)
+        self._record_count = 0  # Количество записей в файле и буфере
+        for record in self.read_records():
+            self._last_seq = max(self._last_seq, int(record.get("seq", 0)))
+            self._record_count += 1
+
+    @staticmethod
+    def for_asset(asset_file: Path) -> 'PurchaseJournal':
+        """Возвращает журнал, лежащий рядом с файлом актива"""
+        return PurchaseJournal(Path(asset_file).with_suffix(PurchaseJournal.JOURNAL_SUFFIX))
+
+    @property
+    def last_seq(self) -> int:
+        """Номер последней добавленной записи"""
+        return self._last_seq
+
+    @property
+    def record_count(self) -> int:
+        """Количество записей, еще не свернутых в .xlsx"""
+        return self._record_count
+
+    @property
+    def has_buffered(self) -> bool:
+        """Есть ли записи, еще не сброшенные на диск"""
+        with self._lock:
+            return bool(self._buffer)
+
+    def append(self, op: str, **data) -> int:
+        """Добавляет одну запись в буфер журнала, возвращает ее номер"""
+        with self._lock:
+            self._last_seq += 1
+            record = {"seq": self._last_seq, "op": op}
+            record.update({key: PurchaseJournal._encode(value) for key, value in data.items()})
+            self._buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+            self._record_count += 1
+            return self._last_seq
+
+    def flush(self) -> None:
+        """Дописывает накопленные записи в конец файла журнала одной операцией записи"""
+        with self._lock:
+            if not self._buffer:
+                return
+            with open(self.filepath, "a", encoding="utf-8") as f:
+                f.write("".join(self._buffer))
+            # Буфер очищаем только после успешной записи, чтобы при ошибке повторить ее позже
+            self._buffer.clear()
+
+    def append_purchase(self, purchase: Purchase, op: str = OP_ADD) -> int:
+        """Записывает добавление (или исправление, op=OP_EDIT) покупки; ID сделки - только если он есть"""
+        extra = {"trade_id": purchase.trade_id} if purchase.trade_id is not None else {}
+        return self.append(
+            op,
+            id=purchase.id,
+            investment=purchase.investment,
+            price=purchase.price,
+            quantity=purchase.quantity,
+            timestamp=purchase.timestamp,
+            **extra
+        )
+
+    def append_sale(self, sale: Sale) -> int:
+        """Записывает продажу"""
+        return self.append(
+            PurchaseJournal.OP_SELL,
+            id=sale.id,
+            quantity=sale.quantity,
+            price=sale.price,
+            timestamp=sale.timestamp
+        )
+
+    def read_records(self) -> List[dict]:
+        """Читает все записи журнала; поврежденная последняя строка игнорируется"""
+        if not self.filepath.exists():
+            return []
+        records = []
+        with open(self.filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Недописанная строка (например, при аварийном завершении)
+                    continue
+        return records
+
+    def compact_through(self, seq: int) -> None:
+        """
+        Удаляет из журнала записи с номером <= seq (они уже сохранены в .xlsx).
+        Более поздние записи остаются в журнале.
+        """
+        with self._lock:
+            self.flush()
+            remaining = [r for r in self.read_records() if int(r.get("seq", 0)) > seq]
+            if not remaining:
+                self.delete()
+                return
+            tmp_path = self.filepath.with_suffix(self.filepath.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                for record in remaining:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            os.replace(tmp_path, self.filepath)
+            self._record_count = len(remaining)
+
+    def delete(self) -> None:
+        """Удаляет файл журнала вместе с несброшенными записями"""
+        with self._lock:
+            self._buffer.clear()
+            if self.filepath.exists():
+                self.filepath.unlink()
+            self._record_count = 0
+
+    @staticmethod
+    def apply_records(asset: Asset, records: List[dict]) -> None:
+        """
+        Применяет записи журнала к активу, загруженному из .xlsx.
+        Применение идемпотентно: покупка с уже существующим ID повторно не добавляется,
+        исправление заменяет покупку целиком.
+        """
+        existing_sale_ids = {s.id for s in asset.sales}
+        for record in records:
+            op = record.get("op")
+            if op == PurchaseJournal.OP_ADD:
+                purchase_id = int(record["id"])
+                if asset.purchases.has_id(purchase_id):
+                    continue
+                asset.add_purchase(PurchaseJournal._purchase_from_record(record))
+            elif op == PurchaseJournal.OP_REMOVE:
+                asset.remove_purchase(int(record["id"]))
+            elif op == PurchaseJournal.OP_EDIT:
+                # Покупка могла быть удалена позже в уже сохраненном .xlsx
+                if asset.purchases.has_id(int(record["id"])):
+                    asset.replace_purchase(PurchaseJournal._purchase_from_record(record))
+            elif op == PurchaseJournal.OP_SELL:
+                sale_id = int(record["id"])
+                if sale_id in existing_sale_ids:
+                    continue
+                existing_sale_ids.add(sale_id)
+                asset.add_sale(Sale(
+                    id=sale_id,
+                    quantity=Decimal(record["quantity"]),
+                    price=Decimal(record["price"]),
+                    timestamp=datetime.fromisoformat(record["timestamp"])
+                ))
+            elif op == PurchaseJournal.OP_REMOVE_SALE:
+                asset.remove_sale(int(record["id"]))
+                existing_sale_ids.discard(int(record["id"]))
+            elif op == PurchaseJournal.OP_LOT_METHOD:
+                asset.set_lot_method(record["value"])
+            elif op == PurchaseJournal.OP_DRAWDOWN:
+                asset.drawdown_percent = Decimal(record["value"])
+            elif op == PurchaseJournal.OP_CURRENCY:
+                for currency in Currency:
+                    if currency.code == record["code"]:
+                        asset.currency = currency
+                        break
+
+    @staticmethod
+    def _purchase_from_record(record: dict) -> Purchase:
+        """Покупка из записи добавления или исправления"""
+        return Purchase(
+            id=int(record["id"]),
+            investment=Decimal(record["investment"]),
+            price=Decimal(record["price"]),
+            quantity=Decimal(record["quantity"]),
+            timestamp=datetime.fromisoformat(record["timestamp"]),
+            trade_id=record.get("trade_id")
+        )
+
+    @staticmethod
+    def _encode(value):
+        """Преобразует значение в JSON-совместимый вид без потери точности"""
+        if isinstance(value, Decimal):
+            return str(value)
+        if isinstance(value, datetime):
+            return value.isoformat()
+        return value
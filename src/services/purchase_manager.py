@@ -1,14 +1,16 @@
 from decimal import Decimal
 from typing import List, Optional
 from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
 from src.services.calculator import Calculator
+from src.utils.precision import quantize_price
 
 
 class PurchaseManager:
     """Менеджер для управления списком покупок"""
     
     def __init__(self):
-        self._purchases: List[Purchase] = []
+        self._purchases = PurchaseStore()
         self._next_id = 1
     
     def add_purchase(self, investment: Decimal, price: Decimal) -> Purchase:
@@ -18,6 +20,8 @@ class PurchaseManager:
         if price <= 0:
             raise ValueError("Цена должна быть больше нуля")
         
+        # Точность валюты здесь неизвестна, поэтому округляется только цена (и количество в Calculator)
+        price = quantize_price(price)
         quantity = Calculator.calculate_quantity(investment, price)
         purchase = Purchase(
             id=self._next_id,
@@ -32,23 +36,19 @@ class PurchaseManager:
     
     def remove_purchase(self, purchase_id: int) -> bool:
         """Удаляет покупку по ID"""
-        for i, purchase in enumerate(self._purchases):
-            if purchase.id == purchase_id:
-                self._purchases.pop(i)
-                return True
-        return False
+        return self._purchases.remove(purchase_id) is not None
     
-    def get_all_purchases(self) -> List[Purchase]:
-        """Возвращает список всех покупок"""
+    def get_all_purchases(self) -> PurchaseStore:
+        """Возвращает копию всех покупок"""
         return self._purchases.copy()
     
     def get_last_purchase(self) -> Optional[Purchase]:
         """Возвращает последнюю покупку или None"""
-        return self._purchases[-1] if self._purchases else None
+        return self._purchases.last()
     
     def clear_all(self) -> None:
         """Очищает весь список покупок"""
-        self._purchases.clear()
+        self._purchases = PurchaseStore()
         self._next_id = 1
     
     def get_purchase_count(self) -> int:
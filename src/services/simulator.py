@@ -0,0 +1,186 @@
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple
+from src.models.simulation_result import SimulationResult
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class Simulator:
+    """
+    Моделирование стратегии усреднения методом Монте-Карло.
+    Правило то же, что в Calculator.calculate_next_purchase_price: следующая покупка
+    совершается, когда цена опускается на drawdown_percent ниже цены последней покупки.
+    Траектории генерируются векторно (NumPy) блоками, блоки считаются в пуле процессов.
+    """
+
+    MODEL_GBM = "gbm"  # Геометрическое броуновское движение
+    MODEL_BOOTSTRAP = "bootstrap"  # Случайная выборка исторических доходностей
+
+    DEFAULT_CHUNK_SIZE = 20_000  # Траекторий в одном блоке (от него зависит воспроизводимость)
+
+    @staticmethod
+    def simulate(
+        paths: int,
+        steps: int,
+        drawdown_percent: Decimal,
+        investment: Decimal,
+        start_price: Decimal = Decimal('100'),
+        model: str = MODEL_GBM,
+        drift: float = 0.0,
+        volatility: float = 0.6,
+        dt: float = 1 / 365,
+        returns: Optional["np.ndarray"] = None,
+        max_purchases: Optional[int] = None,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> SimulationResult:
+        """
+        Моделирует paths траекторий по steps шагов и применяет к каждой правило усреднения.
+        Первая покупка на сумму investment совершается по start_price, каждая следующая - на ту же сумму.
+        model: MODEL_GBM (drift и volatility - годовые, dt - длина шага в годах)
+               или MODEL_BOOTSTRAP (returns - массив логарифмических доходностей, см. load_returns_csv).
+        max_purchases ограничивает количество покупок (например, по доступному капиталу).
+        При одинаковых seed и chunk_size результат не зависит от количества процессов workers
+        (workers=1 - расчет в текущем процессе).
+        """
+        import numpy as np
+
+        if paths < 1 or steps < 1:
+            raise ValueError("Количество траекторий и шагов должно быть больше нуля")
+        if drawdown_percent <= 0 or drawdown_percent >= 100:
+            raise ValueError("Процент просадки должен быть от 0 до 100")
+        if investment <= 0:
+            raise ValueError("Сумма вложений должна быть больше нуля")
+        if start_price <= 0:
+            raise ValueError("Цена должна быть больше нуля")
+        if model == Simulator.MODEL_BOOTSTRAP:
+            if returns is None or len(returns) == 0:
+                raise ValueError("Для бутстрэпа нужны исторические доходности")
+            returns = np.asarray(returns, dtype=float)
+        elif model != Simulator.MODEL_GBM:
+            raise ValueError(f"Неизвестная модель цены: {model}")
+
+        # Блоки и их зерна задаются только paths и chunk_size, поэтому результат воспроизводим
+        sizes = [min(chunk_size, paths - start) for start in range(0, paths, chunk_size)]
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        params = (
+            steps, float(drawdown_percent), float(investment), float(start_price),
+            model, drift, volatility, dt, returns, max_purchases
+        )
+        tasks = [(size, child, params) for size, child in zip(sizes, seeds)]
+
+        workers = min(workers or os.cpu_count() or 1, len(tasks))
+        if workers == 1:
+            chunks = [_simulate_chunk(task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(executor.map(_simulate_chunk, tasks))
+
+        return SimulationResult(*(np.concatenate(column) for column in zip(*chunks)))
+
+    @staticmethod
+    def load_returns_csv(filepath: Path, column: str = "close") -> "np.ndarray":
+        """
+        Читает цены из локального CSV (колонка column, без учета регистра; по умолчанию close)
+        и возвращает логарифмические доходности между соседними строками
+        """
+        import numpy as np
+
+        with open(filepath, "r", encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                raise ValueError("Файл цен пуст")
+            names = [name.strip().lower() for name in header]
+            if column.lower() not in names:
+                raise ValueError(f"В файле нет колонки {column}")
+            index = names.index(column.lower())
+            prices = np.array([float(row[index]) for row in reader if len(row) > index and row[index]])
+
+        if len(prices) < 2 or np.any(prices <= 0):
+            raise ValueError("Нужно минимум две положительные цены")
+        return np.diff(np.log(prices))
+
+
+def _log_returns(
+    rng: "np.random.Generator",
+    size: int,
+    model: str,
+    drift: float,
+    volatility: float,
+    dt: float,
+    returns: Optional["np.ndarray"]
+) -> "np.ndarray":
+    """Логарифмические доходности одного шага для size траекторий, форма (size,)"""
+    import numpy as np
+
+    if model == Simulator.MODEL_GBM:
+        log_returns = rng.standard_normal(size)
+        log_returns *= volatility * np.sqrt(dt)
+        log_returns += (drift - 0.5 * volatility ** 2) * dt
+        return log_returns
+    return returns[rng.integers(0, len(returns), size=size)]
+
+
+def _simulate_chunk(task: Tuple[int, "np.random.SeedSequence", tuple]) -> List["np.ndarray"]:
+    """
+    Считает один блок траекторий (функция уровня модуля, чтобы ее можно было передать в процесс).
+    Цикл идет по шагам времени, все траектории блока обрабатываются одновременно.
+    Цены генерируются на каждом шаге, поэтому память блока - несколько массивов формы (size,),
+    а не матрица (size, steps + 1)
+    """
+    import numpy as np
+
+    size, seed, params = task
+    steps, drawdown, investment, start_price, model, drift, volatility, dt, returns, max_purchases = params
+    rng = np.random.default_rng(seed)
+
+    factor = 1.0 - drawdown / 100.0
+    limit = np.inf if max_purchases is None else max_purchases
+
+    total_investment = np.full(size, investment)
+    total_quantity = np.full(size, investment / start_price)
+    purchase_count = np.ones(size)
+    trigger = np.full(size, start_price * factor)
+    underwater = np.zeros(size, dtype=bool)
+    underwater_since = np.zeros(size)
+    time_to_break_even = np.full(size, np.nan)
+
+    log_price = np.zeros(size)  # Накопленная логарифмическая доходность от start_price
+    price = np.full(size, start_price)
+    for step in range(1, steps + 1):
+        log_price += _log_returns(rng, size, model, drift, volatility, dt, returns)
+        np.exp(log_price, out=price)
+        price *= start_price
+
+        # Докупка по текущей цене там, где сработала просадка от последней покупки
+        buy = (price <= trigger) & (purchase_count < limit)
+        if buy.any():
+            total_investment[buy] += investment
+            total_quantity[buy] += investment / price[buy]
+            purchase_count[buy] += 1
+            trigger[buy] = price[buy] * factor
+
+        break_even = total_investment / total_quantity
+        recovered = underwater & (price >= break_even) & np.isnan(time_to_break_even)
+        time_to_break_even[recovered] = step - underwater_since[recovered]
+        below = (price < break_even) & ~underwater
+        underwater_since[below] = step
+        underwater |= below
+
+    # Траекториям, которые ни разу не уходили в минус, восстанавливаться не нужно
+    time_to_break_even[~underwater] = 0.0
+
+    return [
+        total_investment / total_quantity,
+        total_investment,
+        purchase_count,
+        time_to_break_even,
+        price
+    ]
@@ -0,0 +1,425 @@
+import sqlite3
+import threading
+from pathlib import Path
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Dict, List, Tuple
+from src.models.asset_summary import AssetSummary
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.models.sale import Sale
+from src.models.lot_engine import LotEngine
+from src.utils.currency import Currency
+from src.services.storage_backend import StorageBackend
+
+
+class SQLiteStorageBackend(StorageBackend):
+    """
+    Хранилище всех активов в одном файле SQLite.
+    Добавление и удаление покупки - это одна строка INSERT/DELETE,
+    суммы хранятся как TEXT, чтобы Decimal сохранялся без потерь.
+    """
+
+    ASSETS_DIR = "Assets"
+    DB_FILENAME = "assets.db"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS assets (
+            name TEXT PRIMARY KEY,
+            currency TEXT NOT NULL,
+            drawdown_percent TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            purchase_count INTEGER NOT NULL DEFAULT 0,
+            total_investment TEXT NOT NULL DEFAULT '0',
+            total_quantity TEXT NOT NULL DEFAULT '0',
+            lot_method TEXT NOT NULL DEFAULT 'fifo',
+            next_purchase_id INTEGER NOT NULL DEFAULT 1,
+            next_sale_id INTEGER NOT NULL DEFAULT 1
+        );
+        CREATE TABLE IF NOT EXISTS purchases (
+            asset_name TEXT NOT NULL REFERENCES assets(name) ON DELETE CASCADE,
+            id INTEGER NOT NULL,
+            investment TEXT NOT NULL,
+            price TEXT NOT NULL,
+            quantity TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            trade_id TEXT,
+            PRIMARY KEY (asset_name, id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_purchases_asset_timestamp
+            ON purchases(asset_name, timestamp);
+        CREATE TABLE IF NOT EXISTS sales (
+            asset_name TEXT NOT NULL REFERENCES assets(name) ON DELETE CASCADE,
+            id INTEGER NOT NULL,
+            quantity TEXT NOT NULL,
+            price TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            PRIMARY KEY (asset_name, id)
+        );
+    """
+
+    # Колонки сводки, добавленные позже; в старых базах создаются при открытии
+    SUMMARY_COLUMNS = {
+        "purchase_count": "INTEGER NOT NULL DEFAULT 0",
+        "total_investment": "TEXT NOT NULL DEFAULT '0'",
+        "total_quantity": "TEXT NOT NULL DEFAULT '0'"
+    }
+    # Прочие колонки, добавленные позже (заполняются значением по умолчанию)
+    ADDED_COLUMNS = {
+        "lot_method": "TEXT NOT NULL DEFAULT 'fifo'",
+        "next_purchase_id": "INTEGER NOT NULL DEFAULT 1",
+        "next_sale_id": "INTEGER NOT NULL DEFAULT 1"
+    }
+    # Колонки таблицы purchases, добавленные позже
+    ADDED_PURCHASE_COLUMNS = {
+        "trade_id": "TEXT"
+    }
+
+    def __init__(self, db_path: Path | None = None):
+        if db_path is None:
+            assets_dir = Path(self.ASSETS_DIR)
+            assets_dir.mkdir(exist_ok=True)
+            db_path = assets_dir / self.DB_FILENAME
+        self.db_path = Path(db_path)
+        # Соединение используется из потока интерфейса и из фонового потока записи
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._lock = threading.RLock()
+        # Накопленные изменения по активам: список (SQL, параметры)
+        self._pending: Dict[str, List[Tuple[str, tuple]]] = {}
+        # Сводка по последнему изменению актива, записывается вместе с изменениями
+        self._summaries: Dict[str, AssetSummary] = {}
+        with self._lock:
+            self._conn.execute("PRAGMA foreign_keys = ON")
+            self._conn.execute("PRAGMA journal_mode = WAL")
+            self._conn.executescript(self.SCHEMA)
+            self._migrate()
+
+    def _migrate(self) -> None:
+        """Добавляет недостающие колонки в базы, созданные старой версией"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(assets)")}
+        purchase_columns = {row[1] for row in self._conn.execute("PRAGMA table_info(purchases)")}
+        with self._conn:
+            for column, definition in self.ADDED_COLUMNS.items():
+                if column not in existing:
+                    self._conn.execute(f"ALTER TABLE assets ADD COLUMN {column} {definition}")
+            for column, definition in self.ADDED_PURCHASE_COLUMNS.items():
+                if column not in purchase_columns:
+                    self._conn.execute(f"ALTER TABLE purchases ADD COLUMN {column} {definition}")
+        missing = [column for column in self.SUMMARY_COLUMNS if column not in existing]
+        if not missing:
+            return
+        with self._conn:
+            for column in missing:
+                self._conn.execute(f"ALTER TABLE assets ADD COLUMN {column} {self.SUMMARY_COLUMNS[column]}")
+            # Заполняем сводку по уже сохраненным покупкам (однократно, Decimal без потерь)
+            names = [row[0] for row in self._conn.execute("SELECT name FROM assets")]
+            for name in names:
+                rows = self._conn.execute(
+                    "SELECT investment, quantity FROM purchases WHERE asset_name = ?", (name,)
+                ).fetchall()
+                self._conn.execute(
+                    "UPDATE assets SET purchase_count = ?, total_investment = ?, total_quantity = ? WHERE name = ?",
+                    (
+                        len(rows),
+                        str(sum((Decimal(inv) for inv, _ in rows), Decimal('0'))),
+                        str(sum((Decimal(qty) for _, qty in rows), Decimal('0'))),
+                        name
+                    )
+                )
+
+    def list_assets(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name FROM assets ORDER BY name").fetchall()
+        return [row[0] for row in rows]
+
+    def list_summaries(self) -> Dict[str, AssetSummary]:
+        """Сводки по всем активам одним запросом к таблице assets"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, currency, drawdown_percent, purchase_count, total_investment, "
+                "total_quantity, updated_at FROM assets ORDER BY name"
+            ).fetchall()
+        return {
+            name: AssetSummary(
+                name=name,
+                currency=SQLiteStorageBackend._parse_currency(currency_code),
+                drawdown_percent=Decimal(drawdown),
+                purchase_count=count,
+                total_investment=Decimal(total_investment),
+                total_quantity=Decimal(total_quantity),
+                updated_at=datetime.fromisoformat(updated_at)
+            )
+            for name, currency_code, drawdown, count, total_investment, total_quantity, updated_at in rows
+        }
+
+    def load_asset(self, name: str) -> Asset | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT currency, drawdown_percent, created_at, updated_at, lot_method, next_purchase_id, "
+                "next_sale_id FROM assets WHERE name = ?",
+                (name,)
+            ).fetchone()
+            if row is None:
+                return None
+            purchase_rows = self._conn.execute(
+                "SELECT id, investment, price, quantity, timestamp, trade_id FROM purchases "
+                "WHERE asset_name = ? ORDER BY id",
+                (name,)
+            ).fetchall()
+            sale_rows = self._conn.execute(
+                "SELECT id, quantity, price, timestamp FROM sales WHERE asset_name = ? ORDER BY rowid",
+                (name,)
+            ).fetchall()
+
+        currency_code, drawdown, created_at, updated_at, lot_method, next_purchase_id, next_sale_id = row
+        purchases = [
+            Purchase(
+                id=purchase_id,
+                investment=Decimal(investment),
+                price=Decimal(price),
+                quantity=Decimal(quantity),
+                timestamp=datetime.fromisoformat(timestamp),
+                trade_id=trade_id
+            )
+            for purchase_id, investment, price, quantity, timestamp, trade_id in purchase_rows
+        ]
+        sales = [
+            Sale(
+                id=sale_id,
+                quantity=Decimal(quantity),
+                price=Decimal(price),
+                timestamp=datetime.fromisoformat(timestamp)
+            )
+            for sale_id, quantity, price, timestamp in sale_rows
+        ]
+        return Asset(
+            name=name,
+            currency=SQLiteStorageBackend._parse_currency(currency_code),
+            drawdown_percent=Decimal(drawdown),
+            purchases=purchases,
+            sales=sales,
+            lot_method=lot_method if lot_method in LotEngine.METHODS else LotEngine.FIFO,
+            next_purchase_id=next_purchase_id,
+            next_sale_id=next_sale_id,
+            created_at=datetime.fromisoformat(created_at),
+            updated_at=datetime.fromisoformat(updated_at)
+        )
+
+    def save_asset(self, asset: Asset) -> bool:
+        """Полностью перезаписывает актив и все его покупки одной транзакцией"""
+        try:
+            with self._lock, self._conn:
+                self._pending.pop(asset.name, None)
+                self._summaries.pop(asset.name, None)
+                aggregate = asset.aggregate
+                self._conn.execute(
+                    "INSERT INTO assets (name, currency, drawdown_percent, created_at, updated_at, "
+                    "purchase_count, total_investment, total_quantity, lot_method, next_purchase_id, next_sale_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET currency = excluded.currency, "
+                    "drawdown_percent = excluded.drawdown_percent, updated_at = excluded.updated_at, "
+                    "purchase_count = excluded.purchase_count, total_investment = excluded.total_investment, "
+                    "total_quantity = excluded.total_quantity, lot_method = excluded.lot_method, "
+                    "next_purchase_id = excluded.next_purchase_id, next_sale_id = excluded.next_sale_id",
+                    (
+                        asset.name,
+                        asset.currency.code,
+                        str(asset.drawdown_percent),
+                        asset.created_at.isoformat(),
+                        asset.updated_at.isoformat(),
+                        aggregate.count,
+                        str(aggregate.total_investment),
+                        str(aggregate.total_quantity),
+                        asset.lot_method,
+                        asset.next_purchase_id,
+                        asset.next_sale_id
+                    )
+                )
+                self._conn.execute("DELETE FROM purchases WHERE asset_name = ?", (asset.name,))
+                self._conn.executemany(
+                    "INSERT INTO purchases (asset_name, id, investment, price, quantity, timestamp, trade_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [SQLiteStorageBackend._purchase_row(asset.name, p) for p in asset.purchases]
+                )
+                self._conn.execute("DELETE FROM sales WHERE asset_name = ?", (asset.name,))
+                self._conn.executemany(
+                    "INSERT INTO sales (asset_name, id, quantity, price, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    [SQLiteStorageBackend._sale_row(asset.name, sale) for sale in asset.sales]
+                )
+            return True
+        except sqlite3.Error as e:
+            print(f"Ошибка при сохранении актива: {e}")
+            return False
+
+    def prepare_save(self, asset: Asset) -> Callable[[], bool]:
+        """Все изменения уже пишутся построчно, поэтому достаточно сбросить накопленные"""
+        name = asset.name
+
+        def save():
+            self.flush(name)
+            return True
+
+        return save
+
+    def delete_asset(self, name: str) -> bool:
+        try:
+            with self._lock, self._conn:
+                self._pending.pop(name, None)
+                self._summaries.pop(name, None)
+                cursor = self._conn.execute("DELETE FROM assets WHERE name = ?", (name,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            print(f"Ошибка при удалении актива: {e}")
+            return False
+
+    def add_purchase(self, asset: Asset, purchase: Purchase) -> None:
+        self._enqueue(
+            asset,
+            "INSERT OR REPLACE INTO purchases (asset_name, id, investment, price, quantity, timestamp, trade_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            SQLiteStorageBackend._purchase_row(asset.name, purchase)
+        )
+        self._enqueue(
+            asset,
+            "UPDATE assets SET next_purchase_id = MAX(next_purchase_id, ?) WHERE name = ?",
+            (asset.next_purchase_id, asset.name)
+        )
+
+    def remove_purchase(self, asset: Asset, purchase_id: int) -> None:
+        self._enqueue(
+            asset,
+            "DELETE FROM purchases WHERE asset_name = ? AND id = ?",
+            (asset.name, purchase_id)
+        )
+
+    def update_purchase(self, asset: Asset, purchase: Purchase) -> None:
+        self._enqueue(
+            asset,
+            "INSERT OR REPLACE INTO purchases (asset_name, id, investment, price, quantity, timestamp, trade_id) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            SQLiteStorageBackend._purchase_row(asset.name, purchase)
+        )
+
+    def add_sale(self, asset: Asset, sale: Sale) -> None:
+        self._enqueue(
+            asset,
+            "INSERT OR REPLACE INTO sales (asset_name, id, quantity, price, timestamp) VALUES (?, ?, ?, ?, ?)",
+            SQLiteStorageBackend._sale_row(asset.name, sale)
+        )
+        self._enqueue(
+            asset,
+            "UPDATE assets SET next_sale_id = MAX(next_sale_id, ?) WHERE name = ?",
+            (asset.next_sale_id, asset.name)
+        )
+
+    def remove_sale(self, asset: Asset, sale_id: int) -> None:
+        self._enqueue(
+            asset,
+            "DELETE FROM sales WHERE asset_name = ? AND id = ?",
+            (asset.name, sale_id)
+        )
+
+    def set_lot_method(self, asset: Asset, method: str) -> None:
+        self._enqueue(
+            asset,
+            "UPDATE assets SET lot_method = ? WHERE name = ?",
+            (method, asset.name)
+        )
+
+    def set_drawdown_percent(self, asset: Asset, drawdown: Decimal) -> None:
+        self._enqueue(
+            asset,
+            "UPDATE assets SET drawdown_percent = ? WHERE name = ?",
+            (str(drawdown), asset.name)
+        )
+
+    def set_currency(self, asset: Asset, currency: Currency) -> None:
+        self._enqueue(
+            asset,
+            "UPDATE assets SET currency = ? WHERE name = ?",
+            (currency.code, asset.name)
+        )
+
+    def flush(self, name: str) -> None:
+        """Выполняет накопленные изменения актива одной транзакцией"""
+        with self._lock:
+            statements = self._pending.pop(name, None)
+            if not statements:
+                return
+            summary = self._summaries.pop(name, None)
+            try:
+                with self._conn:
+                    for sql, params in statements:
+                        self._conn.execute(sql, params)
+                    if summary is not None:
+                        # Сводка обновляется в той же транзакции, что и покупки
+                        self._conn.execute(
+                            "UPDATE assets SET purchase_count = ?, total_investment = ?, "
+                            "total_quantity = ? WHERE name = ?",
+                            (
+                                summary.purchase_count,
+                                str(summary.total_investment),
+                                str(summary.total_quantity),
+                                name
+                            )
+                        )
+                    self._conn.execute(
+                        "UPDATE assets SET updated_at = ? WHERE name = ?",
+                        (datetime.now().isoformat(), name)
+                    )
+            except sqlite3.Error:
+                # Возвращаем изменения в очередь, чтобы повторить их при следующей записи
+                self._pending[name] = statements + self._pending.get(name, [])
+                if summary is not None:
+                    self._summaries.setdefault(name, summary)
+                raise
+
+    def get_signature(self, name: str) -> tuple | None:
+        """Время последней записи актива (обновляется при каждом сбросе изменений)"""
+        with self._lock:
+            return self._conn.execute("SELECT updated_at FROM assets WHERE name = ?", (name,)).fetchone()
+
+    def close(self) -> None:
+        with self._lock:
+            for name in list(self._pending):
+                self.flush(name)
+            self._conn.close()
+
+    def _enqueue(self, asset: Asset, sql: str, params: tuple) -> None:
+        """Добавляет изменение в очередь актива и запоминает соответствующую ему сводку"""
+        with self._lock:
+            self._pending.setdefault(asset.name, []).append((sql, params))
+            self._summaries[asset.name] = AssetSummary.from_asset(asset)
+
+    @staticmethod
+    def _purchase_row(asset_name: str, purchase: Purchase) -> tuple:
+        """Строка таблицы purchases для покупки"""
+        return (
+            asset_name,
+            purchase.id,
+            str(purchase.investment),
+            str(purchase.price),
+            str(purchase.quantity),
+            purchase.timestamp.isoformat(),
+            purchase.trade_id
+        )
+
+    @staticmethod
+    def _sale_row(asset_name: str, sale: Sale) -> tuple:
+        """Строка таблицы sales для продажи"""
+        return (
+            asset_name,
+            sale.id,
+            str(sale.quantity),
+            str(sale.price),
+            sale.timestamp.isoformat()
+        )
+
+    @staticmethod
+    def _parse_currency(code: str) -> Currency:
+        """Возвращает валюту по коду (USD, если код неизвестен)"""
+        for currency in Currency:
+            if currency.code == code:
+                return currency
+        return Currency.USD
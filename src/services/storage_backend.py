@@ -0,0 +1,127 @@
+import copy
+import os
+from abc import ABC, abstractmethod
+from decimal import Decimal
+from typing import Callable, Dict, List
+from src.models.asset import Asset
+from src.models.asset_summary import AssetSummary
+from src.models.purchase import Purchase
+from src.models.sale import Sale
+from src.utils.currency import Currency
+
+
+class StorageBackend(ABC):
+    """
+    Интерфейс хранилища активов.
+    Методы изменения (add_purchase, remove_purchase, update_purchase, add_sale, remove_sale, set_*)
+    вызываются из потока интерфейса и только накапливают изменения; запись на диск выполняет flush(), который
+    AssetManager вызывает в фоновом потоке.
+    """
+
+    @abstractmethod
+    def list_assets(self) -> List[str]:
+        """Возвращает отсортированный список названий всех активов"""
+
+    def list_summaries(self) -> Dict[str, AssetSummary]:
+        """
+        Возвращает актуальные сводки по активам, которые доступны без загрузки актива целиком.
+        Активы без актуальной сводки в результат не попадают.
+        """
+        return {}
+
+    @abstractmethod
+    def load_asset(self, name: str) -> Asset | None:
+        """Загружает актив или возвращает None, если он не найден"""
+
+    @abstractmethod
+    def save_asset(self, asset: Asset) -> bool:
+        """Полностью сохраняет актив; возвращает True если успешно"""
+
+    @abstractmethod
+    def delete_asset(self, name: str) -> bool:
+        """Удаляет актив; возвращает True если успешно"""
+
+    @abstractmethod
+    def add_purchase(self, asset: Asset, purchase: Purchase) -> None:
+        """Запоминает добавление покупки"""
+
+    @abstractmethod
+    def remove_purchase(self, asset: Asset, purchase_id: int) -> None:
+        """Запоминает удаление покупки"""
+
+    @abstractmethod
+    def update_purchase(self, asset: Asset, purchase: Purchase) -> None:
+        """Запоминает исправление покупки (покупка с тем же ID заменяется целиком)"""
+
+    @abstractmethod
+    def add_sale(self, asset: Asset, sale: Sale) -> None:
+        """Запоминает добавление продажи"""
+
+    @abstractmethod
+    def remove_sale(self, asset: Asset, sale_id: int) -> None:
+        """Запоминает удаление продажи"""
+
+    @abstractmethod
+    def set_lot_method(self, asset: Asset, method: str) -> None:
+        """Запоминает изменение метода учета лотов"""
+
+    @abstractmethod
+    def set_drawdown_percent(self, asset: Asset, drawdown: Decimal) -> None:
+        """Запоминает изменение процента просадки"""
+
+    @abstractmethod
+    def set_currency(self, asset: Asset, currency: Currency) -> None:
+        """Запоминает изменение валюты"""
+
+    @abstractmethod
+    def flush(self, name: str) -> None:
+        """Записывает накопленные изменения актива на диск"""
+
+    def has_pending_changes(self, name: str) -> bool:
+        """Есть ли изменения, которые нужно свернуть полным сохранением при выходе"""
+        return False
+
+    def needs_compaction(self, name: str) -> bool:
+        """Пора ли выполнить полное сохранение актива"""
+        return False
+
+    def get_signature(self, name: str) -> tuple | None:
+        """
+        Подпись данных актива в хранилище: меняется при каждой записи актива.
+        None - хранилище не умеет отслеживать изменения (загруженный актив считается актуальным)
+        """
+        return None
+
+    def prepare_save(self, asset: Asset) -> Callable[[], bool]:
+        """
+        Готовит задачу полного сохранения для фонового потока:
+        снимок актива берется сейчас, запись выполняется при вызове задачи
+        """
+        snapshot = StorageBackend.snapshot(asset)
+        return lambda: self.save_asset(snapshot)
+
+    @staticmethod
+    def snapshot(asset: Asset) -> Asset:
+        """Копия актива, которую можно записывать в фоне, пока оригинал меняется"""
+        snapshot = copy.copy(asset)
+        snapshot.purchases = asset.purchases.copy()
+        snapshot.sales = list(asset.sales)
+        return snapshot
+
+    def close(self) -> None:
+        """Освобождает ресурсы хранилища"""
+
+
+def create_storage_backend(kind: str | None = None) -> StorageBackend:
+    """
+    Создает хранилище по названию ("excel" или "sqlite").
+    По умолчанию берется из переменной окружения AVERAGING_STORAGE, иначе "excel".
+    """
+    kind = (kind or os.environ.get("AVERAGING_STORAGE", "excel")).lower()
+    if kind == "sqlite":
+        from src.services.sqlite_storage import SQLiteStorageBackend
+        return SQLiteStorageBackend()
+    if kind == "excel":
+        from src.services.excel_storage import ExcelStorageBackend
+        return ExcelStorageBackend()
+    raise ValueError(f"Неизвестный тип хранилища: {kind}")
@@ -0,0 +1,236 @@
+import csv
+import io
+import re
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from src.models.import_report import ImportReport
+from src.models.trade_column_mapping import TradeColumnMapping
+from src.services.asset_manager import AssetManager
+from src.utils.currency import Currency
+from src.utils.precision import quantize_amount, quantize_price
+from src.utils.validators import validate_positive_decimal
+
+
+class TradeImporter:
+    """
+    Импорт сделок из выгрузки биржи (CSV) в текущий актив.
+    Файл читается построчно, покупки добавляются пакетами AssetManager.add_purchases,
+    поэтому память ограничена размером пакета, а запись на диск - одна на пакет.
+    Весь импорт отменяется одной отменой (пакеты объединяются в одну запись истории отмены).
+    """
+
+    DEFAULT_BATCH_SIZE = 10_000  # Покупок в одном пакете записи на диск
+    MAX_ERRORS = 20  # Сколько ошибок сохранять в отчете
+    DELIMITERS = ",;\t|"  # Разделители, из которых выбирается разделитель файла
+
+    # Известные названия колонок (в нижнем регистре) для поиска без явного соответствия
+    COLUMN_ALIASES = {
+        "price": ("price", "avg price", "average price", "execution price", "rate", "cena", "цена"),
+        "quantity": ("quantity", "qty", "size", "executed", "filled", "ilość", "количество"),
+        # «Amount» у бирж - сумма в валюте котировки (например, Binance: Executed - количество, Amount - сумма)
+        "total": ("total", "amount", "value", "cost", "quote amount", "wartość", "сумма"),
+        "time": ("time", "date", "timestamp", "date(utc)", "datetime", "data", "дата"),
+        # Общие «type» (обычно тип заявки LIMIT/MARKET) и «id» (номер строки или заявки) не ищутся:
+        # такая колонка пропустила бы все покупки или отбросила бы их как дубли - нужно явное соответствие
+        "side": ("side", "strona", "typ", "направление"),
+        "trade_id": ("trade id", "trade_id", "tradeid", "txid", "transaction id", "id transakcji")
+    }
+
+    # Колонки, для которых несколько совпадений по названиям - ошибка: выбор не той колонки исказил бы суммы
+    UNAMBIGUOUS_KEYS = ("quantity", "total")
+    # Допустимое относительное расхождение суммы сделки и цены × количество (округление, комиссия в сумме)
+    TOTAL_TOLERANCE = Decimal('0.01')
+
+    # Единица после числа (например, «0.5BTC» или «120 USDT»), которую добавляют некоторые биржи
+    _UNIT_SUFFIX = re.compile(r"(?<=\d)\s*[A-Za-z]+$")
+
+    @staticmethod
+    def import_csv(
+        asset_manager: AssetManager,
+        filepath: Path,
+        mapping: Optional[TradeColumnMapping] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        encoding: str = "utf-8-sig",
+        on_progress: Optional[Callable[[ImportReport], None]] = None
+    ) -> ImportReport:
+        """
+        Импортирует покупки из CSV в текущий актив asset_manager.
+        Строки с ошибками пропускаются и попадают в отчет; продажи (по колонке side) пропускаются;
+        сделки с уже импортированным ID (в файле или в активе) отбрасываются как дубли.
+        Покупки добавляются в порядке строк файла. on_progress вызывается после каждого пакета.
+        """
+        if asset_manager.current_asset is None:
+            raise ValueError("Актив не выбран")
+        if batch_size < 1:
+            raise ValueError("Размер пакета должен быть больше нуля")
+        mapping = mapping or TradeColumnMapping()
+
+        report = ImportReport()
+        started = time.perf_counter()
+        seen = asset_manager.current_asset.purchases.trade_ids()
+
+        with open(filepath, "rb") as raw:
+            text = io.TextIOWrapper(raw, encoding=encoding, newline="")
+            header_line = text.readline()
+            delimiter = mapping.delimiter or TradeImporter._detect_delimiter(header_line)
+            header = next(csv.reader([header_line], delimiter=delimiter), None)
+            if not header:
+                raise ValueError("Файл пуст")
+            columns = TradeImporter._resolve_columns(header, mapping)
+            buy_values = {value.lower() for value in mapping.buy_values}
+            currency = asset_manager.current_asset.currency
+
+            batch = []
+
+            def commit():
+                asset_manager.add_purchases(batch, merge_undo=report.imported > 0)
+                report.imported += len(batch)
+                # TextIOWrapper читает файл блоками вперед, поэтому во время импорта значение приблизительное
+                report.bytes_read = raw.tell()
+                report.elapsed = time.perf_counter() - started
+                batch.clear()
+                if on_progress:
+                    on_progress(report)
+
+            reader = csv.reader(text, delimiter=delimiter)
+            for row in reader:
+                if not any(row):
+                    continue
+                report.rows += 1
+                try:
+                    entry = TradeImporter._parse_row(row, columns, mapping, buy_values, currency)
+                except ValueError as e:
+                    report.invalid += 1
+                    if len(report.errors) < TradeImporter.MAX_ERRORS:
+                        # Заголовок - строка 1
+                        report.errors.append(f"строка {reader.line_num + 1}: {e}")
+                    continue
+                if entry is None:
+                    report.skipped += 1
+                    continue
+                trade_id = entry[3]
+                if trade_id is not None:
+                    if trade_id in seen:
+                        report.duplicates += 1
+                        continue
+                    seen.add(trade_id)
+                batch.append(entry)
+                if len(batch) >= batch_size:
+                    commit()
+            if batch:
+                commit()
+            # Файл прочитан до конца - значение точное
+            report.bytes_read = raw.tell()
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    @staticmethod
+    def _detect_delimiter(header_line: str) -> str:
+        """Разделитель, который чаще всего встречается в заголовке (по умолчанию запятая)"""
+        counts = {delimiter: header_line.count(delimiter) for delimiter in TradeImporter.DELIMITERS}
+        delimiter = max(counts, key=counts.get)
+        return delimiter if counts[delimiter] else ","
+
+    @staticmethod
+    def _resolve_columns(header: List[str], mapping: TradeColumnMapping) -> Dict[str, int]:
+        """
+        Индексы колонок по полям соответствия; ValueError, если нет цены или суммы/количества
+        или под количество/сумму подходят несколько колонок (нужно явное соответствие)
+        """
+        names = [name.strip().lower() for name in header]
+        columns = {}
+        for key, aliases in TradeImporter.COLUMN_ALIASES.items():
+            explicit = getattr(mapping, key)
+            if explicit is not None:
+                if explicit.strip().lower() not in names:
+                    raise ValueError(f"В файле нет колонки {explicit}")
+                columns[key] = names.index(explicit.strip().lower())
+                continue
+            matches = [alias for alias in aliases if alias in names]
+            if len(matches) > 1 and key in TradeImporter.UNAMBIGUOUS_KEYS:
+                listed = ", ".join(header[names.index(alias)].strip() for alias in matches)
+                raise ValueError(f"Неоднозначные колонки ({listed}) - укажите TradeColumnMapping.{key}")
+            if matches:
+                columns[key] = names.index(matches[0])
+
+        if "price" not in columns:
+            raise ValueError("В файле нет колонки цены")
+        if "total" not in columns and "quantity" not in columns:
+            raise ValueError("В файле нет колонки суммы или количества")
+        return columns
+
+    @staticmethod
+    def _parse_row(
+        row: List[str],
+        columns: Dict[str, int],
+        mapping: TradeColumnMapping,
+        buy_values: set,
+        currency: Currency
+    ) -> Optional[tuple]:
+        """
+        Строка файла -> (сумма вложений, цена, дата, ID сделки) для AssetManager.add_purchases.
+        Сумма и цена округляются по тем же правилам, что и в add_purchases, поэтому строка,
+        которая прошла разбор, не может прервать пакет.
+        None - строка не является покупкой; ValueError - строка с ошибкой
+        """
+        def cell(key: str) -> str:
+            index = columns.get(key)
+            return row[index].strip() if index is not None and index < len(row) else ""
+
+        if "side" in columns and cell("side").lower() not in buy_values:
+            return None
+
+        price = TradeImporter._parse_decimal(cell("price"), "цена")
+        quantity = TradeImporter._parse_decimal(cell("quantity"), "количество") if "quantity" in columns else None
+        if "total" in columns:
+            investment = TradeImporter._parse_decimal(cell("total"), "сумма")
+            # Обе колонки есть - сверяем, чтобы перепутанные колонки не дали неверных сумм
+            if quantity is not None and abs(quantity * price - investment) > investment * TradeImporter.TOTAL_TOLERANCE:
+                raise ValueError(f"сумма {investment} не совпадает с ценой × количество ({quantity * price})")
+        else:
+            investment = quantity * price
+
+        investment = quantize_amount(investment, currency)
+        price = quantize_price(price)
+        if investment <= 0:
+            raise ValueError(f"сумма меньше минимальной единицы валюты {currency.code}")
+        if price <= 0:
+            raise ValueError("цена меньше минимального шага цены")
+
+        value = cell("time")
+        timestamp = TradeImporter._parse_time(value, mapping.time_format) if value else None
+        return investment, price, timestamp, cell("trade_id") or None
+
+    @staticmethod
+    def _parse_decimal(value: str, field_name: str) -> Decimal:
+        """Положительное число с точкой или запятой (как в поле ввода), без пробелов и единицы"""
+        value = TradeImporter._UNIT_SUFFIX.sub("", value.replace(" ", "").replace(" ", ""))
+        valid, error, number = validate_positive_decimal(value)
+        if not valid:
+            raise ValueError(f"{field_name}: {error}")
+        return number
+
+    @staticmethod
+    def _parse_time(value: str, time_format: Optional[str]) -> datetime:
+        """Дата сделки: по формату, Unix-время (секунды или миллисекунды) или ISO 8601"""
+        try:
+            if time_format:
+                moment = datetime.strptime(value, time_format)
+            elif value.replace(".", "", 1).isdigit():
+                seconds = float(value)
+                # Метки в миллисекундах на порядки больше текущего Unix-времени в секундах
+                if seconds > 1e11:
+                    seconds /= 1000
+                moment = datetime.fromtimestamp(seconds)
+            else:
+                moment = datetime.fromisoformat(value)
+        except (ValueError, OverflowError, OSError):
+            raise ValueError(f"дата: некорректное значение {value}") from None
+        # Покупки хранят локальное время без часового пояса
+        if moment.tzinfo is not None:
+            moment = moment.astimezone().replace(tzinfo=None)
+        return moment
@@ -1,6 +1,8 @@
 import customtkinter as ctk
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
+from src.models.asset_summary import AssetSummary
 from src.utils.currency import Currency
+from src.utils.formatters import format_currency
 
 
 class AssetSelector(ctk.CTkFrame):
@@ -26,6 +28,7 @@ class AssetSelector(ctk.CTkFrame):
         self.all_assets = existing_assets or []  # Полный список активов
         self.filtered_assets = self.all_assets.copy()  # Отфильтрованный список
         self.current_asset: Optional[str] = None
+        self.summaries: Dict[str, AssetSummary] = {}  # Сводки по активам из каталога
         self.search_results_frame = None  # Выпадающий список результатов
         self._setup_ui()
         self._update_assets_list()
@@ -220,7 +223,7 @@ class AssetSelector(ctk.CTkFrame):
         for asset in sorted(self.filtered_assets):
             btn = ctk.CTkButton(
                 self.search_results_scroll,
-                text=asset,
+                text=self._format_asset_label(asset),
                 command=lambda a=asset: self._select_search_result(a),
                 height=20,
                 font=ctk.CTkFont(size=10),
@@ -462,12 +465,22 @@ class AssetSelector(ctk.CTkFrame):
             self._update_assets_list()
             self.delete_button.grid_remove()
     
-    def update_assets_list(self, assets: list[str]):
-        """Обновляет список доступных активов"""
+    def update_assets_list(self, assets: list[str], summaries: Dict[str, AssetSummary] = None):
+        """Обновляет список доступных активов и их сводки"""
         self.all_assets = assets
         self.filtered_assets = assets.copy()
+        if summaries is not None:
+            self.summaries = summaries
         self._update_assets_list()
     
+    def _format_asset_label(self, asset_name: str) -> str:
+        """Название актива со сводкой: количество покупок и безубыточная точка"""
+        summary = self.summaries.get(asset_name)
+        if summary is None:
+            return asset_name
+        break_even = format_currency(summary.break_even, summary.currency)
+        return f"{asset_name}  ·  {summary.purchase_count} zak.  ·  {break_even}"
+    
     def get_currency_menu(self):
         """Возвращает меню валют для доступа извне"""
         return self.currency_menu
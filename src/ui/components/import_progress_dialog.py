@@ -0,0 +1,27 @@
+import customtkinter as ctk
+from src.models.import_report import ImportReport
+
+
+class ImportProgressDialog(ctk.CTkToplevel):
+    """Окно хода импорта сделок; пока оно открыто, главное окно не принимает ввод"""
+
+    def __init__(self, parent, filename: str, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.title("Import transakcji")
+        self.resizable(False, False)
+
+        ctk.CTkLabel(self, text=filename, font=ctk.CTkFont(size=12, weight="bold")).pack(padx=16, pady=(12, 4))
+        self.progress_label = ctk.CTkLabel(self, text="Wczytywanie…", font=ctk.CTkFont(size=11))
+        self.progress_label.pack(padx=16, pady=(0, 12))
+
+        # Импорт меняет актив в фоновом потоке, поэтому окно нельзя закрыть до его завершения
+        self.protocol("WM_DELETE_WINDOW", lambda: None)
+        self.transient(parent)
+        self.after(10, self.grab_set)
+
+    def update_progress(self, report: ImportReport):
+        """Показывает количество обработанных строк и добавленных покупок"""
+        self.progress_label.configure(
+            text=f"Wiersze: {report.rows}, zaimportowano: {report.imported} "
+                 f"({report.bytes_read / 1_000_000:.1f} MB)"
+        )
@@ -1,14 +1,23 @@
 import customtkinter as ctk
-from typing import Callable
+from typing import Callable, Optional
 from src.utils.validators import validate_positive_decimal
 
 
 class InputSection(ctk.CTkFrame):
     """Секция для добавления новой покупки"""
     
-    def __init__(self, parent, on_add: Callable[[float, float], None], **kwargs):
+    def __init__(
+        self,
+        parent,
+        on_add: Callable[[float, float], None],
+        on_sell: Optional[Callable[[float, float], None]] = None,
+        on_import: Optional[Callable[[], None]] = None,
+        **kwargs
+    ):
         super().__init__(parent, **kwargs)
         self.on_add = on_add
+        self.on_sell = on_sell
+        self.on_import = on_import
         self._setup_ui()
     
     def _setup_ui(self):
@@ -77,6 +86,64 @@ class InputSection(ctk.CTkFrame):
             height=30
         )
         self.add_button.pack(pady=(8, 0))
+        
+        # Импорт сделок из выгрузки биржи
+        if self.on_import:
+            self.import_button = ctk.CTkButton(
+                self,
+                text="📄 Importuj CSV",
+                command=self.on_import,
+                font=ctk.CTkFont(size=11),
+                height=26,
+                fg_color="gray",
+                hover_color="darkgray"
+            )
+            self.import_button.pack(pady=(6, 0))
+        
+        # Продажа части позиции
+        sell_frame = ctk.CTkFrame(self)
+        sell_frame.pack(fill="x", pady=(10, 0))
+        
+        sell_quantity_label = ctk.CTkLabel(
+            sell_frame,
+            text="Ilość:",
+            font=ctk.CTkFont(size=11)
+        )
+        sell_quantity_label.grid(row=0, column=0, padx=(12, 3), pady=6, sticky="w")
+        
+        self.sell_quantity_entry = ctk.CTkEntry(
+            sell_frame,
+            placeholder_text="0.00",
+            width=90,
+            font=ctk.CTkFont(size=11)
+        )
+        self.sell_quantity_entry.grid(row=0, column=1, padx=3, pady=6)
+        self.sell_quantity_entry.bind("<Return>", lambda e: self._on_sell_clicked())
+        
+        sell_price_label = ctk.CTkLabel(
+            sell_frame,
+            text="Cena:",
+            font=ctk.CTkFont(size=11)
+        )
+        sell_price_label.grid(row=0, column=2, padx=(9, 3), pady=6, sticky="w")
+        
+        self.sell_price_entry = ctk.CTkEntry(
+            sell_frame,
+            placeholder_text="0.00",
+            width=90,
+            font=ctk.CTkFont(size=11)
+        )
+        self.sell_price_entry.grid(row=0, column=3, padx=3, pady=6)
+        self.sell_price_entry.bind("<Return>", lambda e: self._on_sell_clicked())
+        
+        self.sell_button = ctk.CTkButton(
+            sell_frame,
+            text="➖ Sprzedaj",
+            command=self._on_sell_clicked,
+            width=90,
+            font=ctk.CTkFont(size=11, weight="bold")
+        )
+        self.sell_button.grid(row=0, column=4, padx=(9, 12), pady=6)
     
     def _on_add_clicked(self):
         """Обработчик нажатия кнопки добавления"""
@@ -104,6 +171,30 @@ class InputSection(ctk.CTkFrame):
         self.price_entry.delete(0, "end")
         self.after(10, lambda: self.investment_entry.focus_set())
     
+    def _on_sell_clicked(self):
+        """Обработчик нажатия кнопки продажи"""
+        if not self.on_sell:
+            return
+        
+        qty_valid, qty_error, quantity = validate_positive_decimal(self.sell_quantity_entry.get())
+        price_valid, price_error, price = validate_positive_decimal(self.sell_price_entry.get())
+        
+        if not qty_valid:
+            self.error_label.configure(text=qty_error)
+            return
+        
+        if not price_valid:
+            self.error_label.configure(text=price_error)
+            return
+        
+        self.error_label.configure(text="")
+        self.on_sell(float(quantity), float(price))
+        
+        # Поля очищаются, только если продажа принята (иначе показана ошибка)
+        if not self.error_label.cget("text"):
+            self.sell_quantity_entry.delete(0, "end")
+            self.sell_price_entry.delete(0, "end")
+    
     def clear_error(self):
         """Очищает сообщение об ошибке"""
         self.error_label.configure(text="")
@@ -1,17 +1,35 @@
 import customtkinter as ctk
 from decimal import Decimal
-from typing import Callable
+from typing import Callable, Optional
+from src.models.ladder_plan import LadderPlan
 from src.utils.formatters import format_currency, format_percent
-from src.utils.validators import validate_percent
+from src.utils.validators import validate_percent, validate_positive_decimal
 from src.utils.currency import Currency
 
 
 class PlanningSection(ctk.CTkFrame):
     """Секция для планирования следующей покупки"""
     
-    def __init__(self, parent, on_drawdown_change: Callable[[Decimal], None], currency: Currency = Currency.PLN, **kwargs):
+    # Способы расчета суммы докупок: подпись в меню -> значение для Calculator.plan_ladder
+    LADDER_SIZING = {
+        "Stała kwota": "fixed",
+        "Mnożnik": "multiplier",
+        "% kapitału": "capital_percent"
+    }
+    
+    def __init__(
+        self,
+        parent,
+        on_drawdown_change: Callable[[Decimal], None],
+        currency: Currency = Currency.PLN,
+        on_ladder_request: Optional[Callable[[int, str, Decimal, Optional[Decimal]], None]] = None,
+        on_target_change: Optional[Callable[[], None]] = None,
+        **kwargs
+    ):
         super().__init__(parent, **kwargs)
         self.on_drawdown_change = on_drawdown_change
+        self.on_ladder_request = on_ladder_request
+        self.on_target_change = on_target_change
         self.currency = currency
         self._setup_ui()
     
@@ -100,6 +118,78 @@ class PlanningSection(ctk.CTkFrame):
         )
         percent_label.pack(side="left")
         
+        # Обратный расчет: целевая безубыточная точка
+        target_label = ctk.CTkLabel(
+            fields_frame,
+            text="Docelowy pkt. bezstratny:",
+            font=ctk.CTkFont(size=11)
+        )
+        target_label.grid(row=2, column=0, padx=12, pady=6, sticky="w")
+        
+        self.target_entry = ctk.CTkEntry(
+            fields_frame,
+            placeholder_text="0.00",
+            width=100,
+            font=ctk.CTkFont(size=11)
+        )
+        self.target_entry.grid(row=2, column=0, padx=12, pady=6, sticky="e")
+        self.target_entry.bind("<FocusOut>", self._on_target_changed)
+        self.target_entry.bind("<Return>", lambda e: self._on_target_changed())
+        
+        required_investment_frame = ctk.CTkFrame(fields_frame, fg_color="transparent")
+        required_investment_frame.grid(row=2, column=2, padx=12, pady=6, sticky="ew")
+        required_investment_frame.grid_columnconfigure(0, weight=1)
+        
+        required_investment_label = ctk.CTkLabel(
+            required_investment_frame,
+            text="Kwota po następnej cenie:",
+            font=ctk.CTkFont(size=11)
+        )
+        required_investment_label.grid(row=0, column=0, sticky="w")
+        
+        self.required_investment_value = ctk.CTkLabel(
+            required_investment_frame,
+            text="—",
+            font=ctk.CTkFont(size=11)
+        )
+        self.required_investment_value.grid(row=0, column=1, padx=(10, 0), sticky="e")
+        
+        # Обратный расчет: цена для заданной суммы докупки
+        target_amount_label = ctk.CTkLabel(
+            fields_frame,
+            text="Kwota zakupu:",
+            font=ctk.CTkFont(size=11)
+        )
+        target_amount_label.grid(row=3, column=0, padx=12, pady=6, sticky="w")
+        
+        self.target_amount_entry = ctk.CTkEntry(
+            fields_frame,
+            placeholder_text="0.00",
+            width=100,
+            font=ctk.CTkFont(size=11)
+        )
+        self.target_amount_entry.grid(row=3, column=0, padx=12, pady=6, sticky="e")
+        self.target_amount_entry.bind("<FocusOut>", self._on_target_changed)
+        self.target_amount_entry.bind("<Return>", lambda e: self._on_target_changed())
+        
+        required_price_frame = ctk.CTkFrame(fields_frame, fg_color="transparent")
+        required_price_frame.grid(row=3, column=2, padx=12, pady=6, sticky="ew")
+        required_price_frame.grid_columnconfigure(0, weight=1)
+        
+        required_price_label = ctk.CTkLabel(
+            required_price_frame,
+            text="Wymagana cena zakupu:",
+            font=ctk.CTkFont(size=11)
+        )
+        required_price_label.grid(row=0, column=0, sticky="w")
+        
+        self.required_price_value = ctk.CTkLabel(
+            required_price_frame,
+            text="—",
+            font=ctk.CTkFont(size=11)
+        )
+        self.required_price_value.grid(row=0, column=1, padx=(10, 0), sticky="e")
+        
         # Сообщение об ошибке
         self.error_label = ctk.CTkLabel(
             self,
@@ -108,6 +198,117 @@ class PlanningSection(ctk.CTkFrame):
             font=ctk.CTkFont(size=10)
         )
         self.error_label.pack(pady=(3, 0))
+        
+        self._setup_ladder_ui()
+    
+    def _setup_ladder_ui(self):
+        """Панель лестницы докупок: несколько будущих покупок с шагом в процент просадки"""
+        ladder_frame = ctk.CTkFrame(self)
+        ladder_frame.pack(fill="x", pady=(6, 0))
+        
+        ladder_title = ctk.CTkLabel(
+            ladder_frame,
+            text="Drabinka zakupów",
+            font=ctk.CTkFont(size=12, weight="bold")
+        )
+        ladder_title.grid(row=0, column=0, columnspan=6, padx=12, pady=(6, 3), sticky="w")
+        
+        levels_label = ctk.CTkLabel(ladder_frame, text="Poziomy:", font=ctk.CTkFont(size=11))
+        levels_label.grid(row=1, column=0, padx=(12, 3), pady=3, sticky="w")
+        self.ladder_levels_entry = ctk.CTkEntry(ladder_frame, width=50, font=ctk.CTkFont(size=11))
+        self.ladder_levels_entry.grid(row=1, column=1, padx=3, pady=3, sticky="w")
+        self.ladder_levels_entry.insert(0, "5")
+        
+        amount_label = ctk.CTkLabel(ladder_frame, text="Kwota / kapitał:", font=ctk.CTkFont(size=11))
+        amount_label.grid(row=1, column=2, padx=(12, 3), pady=3, sticky="w")
+        self.ladder_amount_entry = ctk.CTkEntry(
+            ladder_frame,
+            placeholder_text="0.00",
+            width=90,
+            font=ctk.CTkFont(size=11)
+        )
+        self.ladder_amount_entry.grid(row=1, column=3, padx=3, pady=3, sticky="w")
+        
+        self.ladder_sizing_menu = ctk.CTkOptionMenu(
+            ladder_frame,
+            values=list(self.LADDER_SIZING),
+            width=120,
+            font=ctk.CTkFont(size=11)
+        )
+        self.ladder_sizing_menu.grid(row=1, column=4, padx=(12, 3), pady=3, sticky="w")
+        
+        self.ladder_param_entry = ctk.CTkEntry(
+            ladder_frame,
+            placeholder_text="x / %",
+            width=60,
+            font=ctk.CTkFont(size=11)
+        )
+        self.ladder_param_entry.grid(row=1, column=5, padx=3, pady=3, sticky="w")
+        
+        ladder_button = ctk.CTkButton(
+            ladder_frame,
+            text="Oblicz",
+            width=70,
+            font=ctk.CTkFont(size=11),
+            command=self._on_ladder_clicked
+        )
+        ladder_button.grid(row=1, column=6, padx=(12, 12), pady=3, sticky="e")
+        
+        self.ladder_text = ctk.CTkTextbox(
+            ladder_frame,
+            height=110,
+            font=ctk.CTkFont(family="Courier", size=10),
+            wrap="none"
+        )
+        self.ladder_text.grid(row=2, column=0, columnspan=7, padx=12, pady=(3, 6), sticky="ew")
+        self.ladder_text.configure(state="disabled")
+    
+    def _on_ladder_clicked(self):
+        """Обработчик кнопки расчета лестницы"""
+        if not self.on_ladder_request:
+            return
+        
+        levels_str = self.ladder_levels_entry.get().strip()
+        if not levels_str.isdigit() or not 1 <= int(levels_str) <= 1000:
+            self.error_label.configure(text="Liczba poziomów musi być od 1 do 1000")
+            return
+        
+        valid, error, amount = validate_positive_decimal(self.ladder_amount_entry.get())
+        if not valid:
+            self.error_label.configure(text=error)
+            return
+        
+        sizing = self.LADDER_SIZING[self.ladder_sizing_menu.get()]
+        param = None
+        if sizing != "fixed":
+            valid, error, param = validate_positive_decimal(self.ladder_param_entry.get())
+            if not valid:
+                self.error_label.configure(text=error)
+                return
+        
+        self.error_label.configure(text="")
+        self.on_ladder_request(int(levels_str), sizing, amount, param)
+    
+    def show_ladder(self, plan: LadderPlan | None, currency: Currency = None):
+        """Показывает шаги лестницы: цена, сумма, общая сумма и безубыточная точка после шага"""
+        if currency:
+            self.currency = currency
+        
+        lines = []
+        if plan is not None:
+            lines.append(f"{'#':>3}  {'Cena':>16}  {'Kwota':>16}  {'Suma łączna':>18}  {'Pkt. bezstratny':>16}")
+            for step, price, investment, total_investment, _, break_even in plan.rows():
+                lines.append(
+                    f"{step:>3}  {format_currency(price, self.currency):>16}  "
+                    f"{format_currency(investment, self.currency):>16}  "
+                    f"{format_currency(total_investment, self.currency):>18}  "
+                    f"{format_currency(break_even, self.currency):>16}"
+                )
+        
+        self.ladder_text.configure(state="normal")
+        self.ladder_text.delete("1.0", "end")
+        self.ladder_text.insert("1.0", "\n".join(lines))
+        self.ladder_text.configure(state="disabled")
     
     def _on_drawdown_changed(self, event=None):
         """Обработчик изменения процента просадки"""
@@ -123,6 +324,28 @@ class PlanningSection(ctk.CTkFrame):
         self._is_user_editing = True
         self.on_drawdown_change(drawdown)
     
+    def _on_target_changed(self, event=None):
+        """Обработчик изменения целевой безубыточной точки или суммы докупки"""
+        for entry in (self.target_entry, self.target_amount_entry):
+            value = entry.get().strip()
+            if value:
+                valid, error, _ = validate_positive_decimal(value)
+                if not valid:
+                    self.error_label.configure(text=error)
+                    return
+        
+        self.error_label.configure(text="")
+        if self.on_target_change:
+            self.on_target_change()
+    
+    def get_target_inputs(self) -> tuple[Decimal | None, Decimal | None]:
+        """Возвращает целевую безубыточную точку и сумму докупки (None, если не заданы или неверны)"""
+        values = []
+        for entry in (self.target_entry, self.target_amount_entry):
+            valid, _, value = validate_positive_decimal(entry.get())
+            values.append(value if valid else None)
+        return values[0], values[1]
+    
     def set_currency(self, currency: Currency):
         """Устанавливает валюту"""
         self.currency = currency
@@ -164,6 +387,15 @@ class PlanningSection(ctk.CTkFrame):
             text=format_currency(next_price, self.currency) if next_price else "—"
         )
     
+    def update_targets(self, required_investment: Decimal | None, required_price: Decimal | None):
+        """Обновляет результаты обратного расчета: сумму по следующей цене и цену для заданной суммы"""
+        self.required_investment_value.configure(
+            text=format_currency(required_investment, self.currency)
+        )
+        self.required_price_value.configure(
+            text=format_currency(required_price, self.currency)
+        )
+    
     def get_drawdown_percent(self) -> Decimal:
         """Возвращает текущий процент просадки"""
         drawdown_str = self.drawdown_entry.get()
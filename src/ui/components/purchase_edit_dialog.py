@@ -0,0 +1,115 @@
+import customtkinter as ctk
+from datetime import datetime
+from decimal import Decimal
+from typing import Callable, Optional
+from src.models.purchase import Purchase
+from src.utils.validators import validate_positive_decimal
+
+
+class PurchaseEditDialog(ctk.CTkToplevel):
+    """Окно исправления суммы, цены и даты покупки"""
+    
+    DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+    
+    def __init__(
+        self,
+        parent,
+        purchase: Purchase,
+        on_save: Callable[[int, Decimal, Decimal, datetime], Optional[str]],
+        **kwargs
+    ):
+        """on_save возвращает текст ошибки или None, если покупка исправлена (окно закрывается)"""
+        super().__init__(parent, **kwargs)
+        self.purchase = purchase
+        self.on_save = on_save
+        self.title(f"Edytuj zakup #{purchase.id}")
+        self.resizable(False, False)
+        self._setup_ui()
+        # Окно модальное: пока оно открыто, главное окно не принимает ввод
+        self.transient(parent)
+        self.after(10, self._grab)
+    
+    def _setup_ui(self):
+        """Настройка интерфейса окна"""
+        fields_frame = ctk.CTkFrame(self)
+        fields_frame.pack(fill="x", padx=12, pady=(12, 0))
+        
+        self.investment_entry = self._create_field(fields_frame, 0, "Suma inwestycji:", str(self.purchase.investment))
+        self.price_entry = self._create_field(fields_frame, 1, "Cena zakupu:", str(self.purchase.price))
+        self.date_entry = self._create_field(
+            fields_frame, 2, "Data:", self.purchase.timestamp.strftime(self.DATE_FORMAT)
+        )
+        
+        # Сообщение об ошибке
+        self.error_label = ctk.CTkLabel(self, text="", text_color="red", font=ctk.CTkFont(size=10))
+        self.error_label.pack(pady=(3, 0))
+        
+        buttons_frame = ctk.CTkFrame(self, fg_color="transparent")
+        buttons_frame.pack(pady=(6, 12))
+        
+        self.save_button = ctk.CTkButton(
+            buttons_frame,
+            text="💾 Zapisz",
+            command=self._on_save_clicked,
+            width=110,
+            font=ctk.CTkFont(size=12, weight="bold")
+        )
+        self.save_button.grid(row=0, column=0, padx=6)
+        
+        cancel_button = ctk.CTkButton(
+            buttons_frame,
+            text="Anuluj",
+            command=self.destroy,
+            width=110,
+            fg_color="gray",
+            hover_color="darkgray",
+            font=ctk.CTkFont(size=12)
+        )
+        cancel_button.grid(row=0, column=1, padx=6)
+        
+        self.bind("<Return>", lambda e: self._on_save_clicked())
+        self.bind("<Escape>", lambda e: self.destroy())
+    
+    def _create_field(self, parent, row: int, label_text: str, value: str) -> ctk.CTkEntry:
+        """Создает подпись и поле ввода с начальным значением"""
+        label = ctk.CTkLabel(parent, text=label_text, font=ctk.CTkFont(size=11))
+        label.grid(row=row, column=0, padx=12, pady=6, sticky="w")
+        
+        entry = ctk.CTkEntry(parent, width=180, font=ctk.CTkFont(size=11))
+        entry.grid(row=row, column=1, padx=12, pady=6)
+        entry.insert(0, value)
+        return entry
+    
+    def _grab(self):
+        """Захватывает ввод и фокус (после того как окно отображено)"""
+        self.grab_set()
+        self.investment_entry.focus_set()
+    
+    def _on_save_clicked(self):
+        """Обработчик нажатия кнопки сохранения"""
+        inv_valid, inv_error, investment = validate_positive_decimal(self.investment_entry.get())
+        price_valid, price_error, price = validate_positive_decimal(self.price_entry.get())
+        
+        if not inv_valid:
+            self.error_label.configure(text=inv_error)
+            return
+        
+        if not price_valid:
+            self.error_label.configure(text=price_error)
+            return
+        
+        date_text = self.date_entry.get().strip()
+        try:
+            timestamp = datetime.strptime(date_text, self.DATE_FORMAT)
+        except ValueError:
+            self.error_label.configure(text="Data w formacie RRRR-MM-DD GG:MM:SS")
+            return
+        # Поле показывает время с точностью до секунд: неизмененная дата сохраняется как была
+        if date_text == self.purchase.timestamp.strftime(self.DATE_FORMAT):
+            timestamp = self.purchase.timestamp
+        
+        error = self.on_save(self.purchase.id, investment, price, timestamp)
+        if error:
+            self.error_label.configure(text=error)
+            return
+        self.destroy()
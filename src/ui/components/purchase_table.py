@@ -1,16 +1,32 @@
 import customtkinter as ctk
-from typing import List, Callable
+from typing import Callable, Iterable, List, Optional
 from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
 from src.utils.formatters import format_currency, format_quantity
 from src.utils.currency import Currency
 
 
 class PurchaseTable(ctk.CTkFrame):
-    """Таблица для отображения истории покупок"""
+    """
+    Таблица для отображения истории покупок.
+    Виртуализирована: создается не больше VISIBLE_ROWS строк виджетов,
+    при прокрутке они перепривязываются к другим покупкам.
+    """
     
-    def __init__(self, parent, on_delete: Callable[[int], None], currency: Currency = Currency.PLN, **kwargs):
+    # Количество одновременно видимых строк (150px / 24px на строку)
+    VISIBLE_ROWS = 6
+    
+    def __init__(
+        self,
+        parent,
+        on_delete: Callable[[int], None],
+        currency: Currency = Currency.PLN,
+        on_edit: Optional[Callable[[int], None]] = None,
+        **kwargs
+    ):
         super().__init__(parent, **kwargs)
         self.on_delete = on_delete
+        self.on_edit = on_edit
         self.currency = currency
         self._setup_ui()
     
@@ -58,8 +74,8 @@ class PurchaseTable(ctk.CTkFrame):
         headers_frame.grid(row=0, column=0, sticky="ew", padx=3, pady=(3, 0))
         headers_frame.grid_columnconfigure(0, weight=1)
         
-        headers = ["№", "Suma", "Cena", "Ilość", ""]
-        widths = [35, 110, 110, 110, 40]
+        headers = ["№", "Suma", "Cena", "Ilość", "Próg rent.", "", ""]
+        widths = [35, 110, 110, 110, 110, 40, 40]
         
         for i, (header, width) in enumerate(zip(headers, widths)):
             label = ctk.CTkLabel(
@@ -75,9 +91,108 @@ class PurchaseTable(ctk.CTkFrame):
             else:  # Остальные - выравнивание влево
                 label.grid(row=0, column=i, padx=1, pady=2, sticky="w")
         
-        # Контейнер для строк (будет создан динамически - Frame или ScrollableFrame)
-        self.scrollable_frame = None
-        self.rows_container = None
+        # Контейнер для строк: фиксированный пул виджетов строк + полоса прокрутки.
+        # Виджеты не пересоздаются при обновлении, а привязываются к видимому окну данных.
+        self.rows_container = ctk.CTkFrame(self.table_frame, fg_color="transparent")
+        self.rows_container.grid(row=1, column=0, sticky="ew", padx=3, pady=3)
+        self.rows_container.grid_columnconfigure(0, weight=1)
+        self.scrollable_frame = self.rows_container
+        
+        self.scrollbar = ctk.CTkScrollbar(self.rows_container, command=self._on_scrollbar)
+        self.scrollbar.grid(row=0, column=1, rowspan=self.VISIBLE_ROWS, sticky="ns")
+        self.scrollbar.grid_remove()
+        
+        self.empty_label = ctk.CTkLabel(
+            self.rows_container,
+            text="Brak zakupów",
+            text_color="gray",
+            font=ctk.CTkFont(size=11)
+        )
+        
+        # Общие шрифты строк (создаются один раз, а не для каждой ячейки)
+        self._number_font = ctk.CTkFont(size=11)
+        self._cell_font = ctk.CTkFont(size=10)
+        
+        self._purchases = PurchaseStore()
+        self._rows: List[dict] = []  # Пул виджетов строк
+        self._first_row = 0  # Индекс покупки в первой видимой строке
+        self._visible_count = None  # Количество видимых строк (None - еще не размечено)
+        
+        # Прокрутка колесом мыши (Windows/macOS и Linux)
+        self._bind_mousewheel(self.rows_container)
+    
+    def _bind_mousewheel(self, widget):
+        """Привязывает прокрутку колесом мыши к виджету"""
+        widget.bind("<MouseWheel>", self._on_mousewheel)
+        widget.bind("<Button-4>", lambda e: self._scroll_by(-1))
+        widget.bind("<Button-5>", lambda e: self._scroll_by(1))
+    
+    def _create_row(self, slot: int) -> dict:
+        """Создает виджеты одной строки пула"""
+        row_frame = ctk.CTkFrame(self.rows_container)
+        
+        # № (порядковый номер, начинается с 1)
+        num_label = ctk.CTkLabel(row_frame, text="", width=35, font=self._number_font)
+        num_label.grid(row=0, column=0, padx=1, pady=1, sticky="w")
+        
+        # Сумма
+        investment_label = ctk.CTkLabel(row_frame, text="", width=110, font=self._cell_font)
+        investment_label.grid(row=0, column=1, padx=1, pady=1, sticky="w")
+        
+        # Цена
+        price_label = ctk.CTkLabel(row_frame, text="", width=110, font=self._cell_font)
+        price_label.grid(row=0, column=2, padx=1, pady=1, sticky="w")
+        
+        # Количество
+        quantity_label = ctk.CTkLabel(row_frame, text="", width=110, font=self._cell_font)
+        quantity_label.grid(row=0, column=3, padx=1, pady=1, sticky="w")
+        
+        # Безубыточная точка после этой покупки
+        break_even_label = ctk.CTkLabel(row_frame, text="", width=110, font=self._cell_font)
+        break_even_label.grid(row=0, column=4, padx=1, pady=1, sticky="w")
+        
+        # Кнопка удаления (удаляет покупку, привязанную к строке в данный момент)
+        delete_btn = ctk.CTkButton(
+            row_frame,
+            text="🗑️",
+            width=40,
+            height=20,
+            font=self._cell_font,
+            command=lambda: self._on_row_delete(slot),
+            fg_color="transparent",
+            text_color=("gray10", "gray90"),
+            hover_color=("gray70", "gray30")
+        )
+        delete_btn.grid(row=0, column=6, padx=1, pady=1, sticky="e")
+        
+        # Кнопка исправления покупки
+        edit_btn = ctk.CTkButton(
+            row_frame,
+            text="✏️",
+            width=40,
+            height=20,
+            font=self._cell_font,
+            command=lambda: self._on_row_edit(slot),
+            fg_color="transparent",
+            text_color=("gray10", "gray90"),
+            hover_color=("gray70", "gray30")
+        )
+        edit_btn.grid(row=0, column=5, padx=1, pady=1, sticky="e")
+        if not self.on_edit:
+            edit_btn.grid_remove()
+        
+        for widget in (row_frame, num_label, investment_label, price_label, quantity_label, break_even_label):
+            self._bind_mousewheel(widget)
+        
+        return {
+            "frame": row_frame,
+            "number": num_label,
+            "investment": investment_label,
+            "price": price_label,
+            "quantity": quantity_label,
+            "break_even": break_even_label,
+            "purchase_id": None
+        }
     
     def _toggle_collapse(self):
         """Переключает состояние сворачивания таблицы"""
@@ -92,119 +207,171 @@ class PurchaseTable(ctk.CTkFrame):
             self.table_frame.grid()
             self.collapse_button.configure(text="▼")
             # Восстанавливаем высоту при разворачивании
-            # Получаем количество строк из rows_container
-            if self.rows_container:
-                num_rows = len([w for w in self.rows_container.winfo_children() if isinstance(w, ctk.CTkFrame)])
-                if num_rows == 0 and len(self.rows_container.winfo_children()) > 0:
-                    # Если есть только label "Brak zakupów"
-                    num_rows = 0
-                self._update_table_height(num_rows)
-    
-    def update_purchases(self, purchases: List[Purchase], currency: Currency = None):
-        """Обновляет отображение таблицы покупок"""
+            self._update_table_height(len(self._purchases))
+    
+    def update_purchases(self, purchases: Iterable[Purchase], currency: Currency = None):
+        """Полностью заменяет данные таблицы (перепривязывает только видимые строки)"""
         if currency:
             self.currency = currency
         
-        # Удаляем старый контейнер, если он существует
-        if self.scrollable_frame:
-            self.scrollable_frame.destroy()
+        # Строки создаются из колонок хранилища только для видимого окна
+        self._purchases = purchases if isinstance(purchases, PurchaseStore) else PurchaseStore(purchases or ())
+        self._relayout()
+        self._render_rows()
+    
+    def append_purchase(self, purchase: Purchase):
+        """
+        Добавляет покупку в конец таблицы, обновляя не больше одной строки виджетов.
+        Покупка задним числом меняет безубыточную точку более поздних покупок выше нее,
+        поэтому тогда перепривязываются все видимые строки
+        """
+        self._purchases.append(purchase)
+        self._relayout()
+        index = len(self._purchases) - 1
+        if not self._purchases.is_latest(index):
+            self._render_rows()
+        elif self._first_row <= index < self._first_row + self.VISIBLE_ROWS:
+            self._render_rows(start_index=index)
+        else:
+            self._update_scrollbar()
+    
+    def replace_purchase(self, purchase: Purchase):
+        """
+        Заменяет исправленную покупку на ее месте. Безубыточная точка меняется у всех покупок после нее,
+        поэтому перепривязываются все видимые строки (их не больше VISIBLE_ROWS)
+        """
+        try:
+            self._purchases.replace(purchase)
+        except KeyError:
+            return
+        self._render_rows()
+    
+    def remove_purchase(self, purchase_id: int):
+        """
+        Удаляет покупку по ID, перерисовывая только видимые строки ниже удаленной
+        (все видимые, если удалена не самая поздняя по времени покупка)
+        """
+        index = self._purchases.index_of(purchase_id)
+        if index is None:
+            return
+        latest = self._purchases.is_latest(index)
+        self._purchases.remove(purchase_id)
+        first_row_before = self._first_row
+        self._relayout()
+        if self._first_row != first_row_before or not latest:
+            # Окно сдвинулось (удалили в конце списка) или изменилась безубыточная точка
+            # более поздних по времени покупок выше удаленной - перепривязываем все видимые строки
+            self._render_rows()
+        else:
+            # Строки выше удаленной не меняются
+            self._render_rows(start_index=max(index, self._first_row))
+    
+    def _relayout(self):
+        """Приводит пул строк, полосу прокрутки и высоту таблицы к текущему количеству покупок"""
+        num_rows = len(self._purchases)
+        visible_count = min(num_rows, self.VISIBLE_ROWS)
+        self._first_row = min(self._first_row, self._max_first_row())
         
-        num_rows = len(purchases) if purchases else 0
+        if visible_count == self._visible_count:
+            # Видимая область не изменилась - виджеты трогать не нужно
+            return
+        self._visible_count = visible_count
         
-        # Создаем контейнер в зависимости от количества строк
-        if num_rows <= 5:
-            # Для малого количества используем обычный Frame (без скролла)
-            self.scrollable_frame = ctk.CTkFrame(
-                self.table_frame,
-                fg_color="transparent"
-            )
-            # Настраиваем grid, чтобы Frame не растягивался по вертикали
-            self.table_frame.grid_rowconfigure(1, weight=0)
-        else:
-            # Для большого количества используем ScrollableFrame со скроллом
-            self.scrollable_frame = ctk.CTkScrollableFrame(
-                self.table_frame,
-                height=150
-            )
-            # Настраиваем grid для ScrollableFrame
-            self.table_frame.grid_rowconfigure(1, weight=0)
-        
-        self.scrollable_frame.grid(row=1, column=0, sticky="ew", padx=3, pady=3)
-        self.rows_container = self.scrollable_frame
-        
-        # Очищаем старые строки
-        for widget in self.rows_container.winfo_children():
-            widget.destroy()
-        
-        if not purchases:
-            empty_label = ctk.CTkLabel(
-                self.rows_container,
-                text="Brak zakupów",
-                text_color="gray",
-                font=ctk.CTkFont(size=11)
-            )
-            empty_label.pack(pady=15)
+        if num_rows == 0:
+            for row in self._rows:
+                row["frame"].grid_remove()
+            self.scrollbar.grid_remove()
+            self.empty_label.grid(row=0, column=0, pady=15)
+            self._first_row = 0
             self._update_table_height(0)
             return
         
-        # Создаем строки для каждой покупки
-        for index, purchase in enumerate(purchases):
-            row_frame = ctk.CTkFrame(self.rows_container)
-            row_frame.pack(fill="x", pady=1)
-            
-            # № (порядковый номер, начинается с 1)
-            num_label = ctk.CTkLabel(
-                row_frame,
-                text=str(index + 1),
-                width=35,
-                font=ctk.CTkFont(size=11)
-            )
-            num_label.grid(row=0, column=0, padx=1, pady=1, sticky="w")
-            
-            # Сумма
-            investment_label = ctk.CTkLabel(
-                row_frame,
-                text=format_currency(purchase.investment, self.currency),
-                width=110,
-                font=ctk.CTkFont(size=10)
-            )
-            investment_label.grid(row=0, column=1, padx=1, pady=1, sticky="w")
-            
-            # Цена
-            price_label = ctk.CTkLabel(
-                row_frame,
-                text=format_currency(purchase.price, self.currency),
-                width=110,
-                font=ctk.CTkFont(size=10)
-            )
-            price_label.grid(row=0, column=2, padx=1, pady=1, sticky="w")
-            
-            # Количество
-            quantity_label = ctk.CTkLabel(
-                row_frame,
-                text=format_quantity(purchase.quantity),
-                width=110,
-                font=ctk.CTkFont(size=10)
-            )
-            quantity_label.grid(row=0, column=3, padx=1, pady=1, sticky="w")
-            
-            # Кнопка удаления
-            delete_btn = ctk.CTkButton(
-                row_frame,
-                text="🗑️",
-                width=40,
-                height=20,
-                font=ctk.CTkFont(size=10),
-                command=lambda pid=purchase.id: self.on_delete(pid),
-                fg_color="transparent",
-                text_color=("gray10", "gray90"),
-                hover_color=("gray70", "gray30")
-            )
-            delete_btn.grid(row=0, column=4, padx=1, pady=1, sticky="e")
+        self.empty_label.grid_remove()
+        
+        # Пул растет только до размера видимой области
+        while len(self._rows) < visible_count:
+            self._rows.append(self._create_row(len(self._rows)))
+        for slot, row in enumerate(self._rows):
+            if slot < visible_count:
+                row["frame"].grid(row=slot, column=0, sticky="ew", pady=1)
+            else:
+                row["frame"].grid_remove()
         
         # Обновляем высоту таблицы в зависимости от количества строк
         self._update_table_height(num_rows)
     
+    def _max_first_row(self) -> int:
+        """Максимальный индекс первой видимой строки"""
+        return max(0, len(self._purchases) - self.VISIBLE_ROWS)
+    
+    def _render_rows(self, start_index: int = 0):
+        """Привязывает виджеты пула к покупкам видимого окна (начиная с покупки start_index)"""
+        first_slot = max(0, start_index - self._first_row)
+        # Ряд безубыточной точки кэшируется в хранилище, значение строки берется за O(log n)
+        for slot in range(first_slot, min(len(self._rows), len(self._purchases))):
+            index = self._first_row + slot
+            row = self._rows[slot]
+            if index >= len(self._purchases):
+                row["purchase_id"] = None
+                continue
+            purchase = self._purchases[index]
+            row["purchase_id"] = purchase.id
+            row["number"].configure(text=str(index + 1))
+            row["investment"].configure(text=format_currency(purchase.investment, self.currency))
+            row["price"].configure(text=format_currency(purchase.price, self.currency))
+            row["quantity"].configure(text=format_quantity(purchase.quantity))
+            row["break_even"].configure(text=self._format_break_even(self._purchases.break_even_after(index)))
+        self._update_scrollbar()
+    
+    def _format_break_even(self, break_even) -> str:
+        """Безубыточная точка в валюте таблицы или прочерк"""
+        return format_currency(break_even, self.currency) if break_even else "—"
+    
+    def _update_scrollbar(self):
+        """Выставляет положение ползунка по видимому окну"""
+        total = len(self._purchases)
+        if total <= self.VISIBLE_ROWS:
+            self.scrollbar.grid_remove()
+            return
+        self.scrollbar.grid()
+        self.scrollbar.set(self._first_row / total, (self._first_row + self.VISIBLE_ROWS) / total)
+    
+    def _scroll_to(self, first_row: int):
+        """Прокручивает таблицу так, чтобы first_row стала первой видимой строкой"""
+        first_row = max(0, min(first_row, self._max_first_row()))
+        if first_row != self._first_row:
+            self._first_row = first_row
+            self._render_rows()
+    
+    def _scroll_by(self, rows: int):
+        """Прокручивает таблицу на указанное количество строк"""
+        self._scroll_to(self._first_row + rows)
+    
+    def _on_scrollbar(self, action, value, unit=None):
+        """Обработчик полосы прокрутки (протокол команд Tk: moveto/scroll)"""
+        if action == "moveto":
+            self._scroll_to(round(float(value) * len(self._purchases)))
+        elif action == "scroll":
+            step = self.VISIBLE_ROWS if unit == "pages" else 1
+            self._scroll_by(int(value) * step)
+    
+    def _on_mousewheel(self, event):
+        """Обработчик колеса мыши (Windows/macOS)"""
+        if event.delta:
+            self._scroll_by(-1 if event.delta > 0 else 1)
+    
+    def _on_row_delete(self, slot: int):
+        """Обработчик кнопки удаления в строке пула"""
+        purchase_id = self._rows[slot]["purchase_id"]
+        if purchase_id is not None:
+            self.on_delete(purchase_id)
+    
+    def _on_row_edit(self, slot: int):
+        """Обработчик кнопки исправления в строке пула"""
+        purchase_id = self._rows[slot]["purchase_id"]
+        if purchase_id is not None and self.on_edit:
+            self.on_edit(purchase_id)
+    
     def _update_table_height(self, num_rows: int):
         """Обновляет высоту таблицы в зависимости от количества строк"""
         # Высота заголовков колонок: ~30px
@@ -214,25 +381,11 @@ class PurchaseTable(ctk.CTkFrame):
         # Отступы контейнера: 6px (3px сверху + 3px снизу)
         container_padding = 6
         
-        # Вычисляем требуемую высоту контейнера
-        if num_rows <= 5:
-            # Высота подстраивается под содержимое (без скролла)
-            # Только высота строк, без заголовков (они уже в table_frame)
-            calculated_height = (row_height * num_rows) + container_padding
-            if calculated_height < 30:  # Минимальная высота для пустой таблицы
-                calculated_height = 30
-            container_height = calculated_height
-        else:
-            # Фиксированная высота 150px со скроллом
-            container_height = 150
-        
-        # Обновляем геометрию для получения актуальных размеров
-        self.update_idletasks()
-        
-        # Если это обычный Frame, он подстроится под содержимое автоматически
-        # Если это ScrollableFrame, устанавливаем фиксированную высоту
-        if isinstance(self.scrollable_frame, ctk.CTkScrollableFrame):
-            self.scrollable_frame.configure(height=container_height)
+        # Высота подстраивается под видимые строки; больше VISIBLE_ROWS строк - прокрутка
+        visible_rows = min(num_rows, self.VISIBLE_ROWS)
+        container_height = (row_height * visible_rows) + container_padding
+        if container_height < 30:  # Минимальная высота для пустой таблицы
+            container_height = 30
         
         # Общая высота table_frame: заголовки + контейнер + отступы
         table_frame_height = headers_height + container_height + 6  # +6 для отступов table_frame
@@ -248,6 +401,17 @@ class PurchaseTable(ctk.CTkFrame):
             self.master.update_idletasks()
     
     def set_currency(self, currency: Currency):
-        """Устанавливает валюту и обновляет отображение"""
+        """Устанавливает валюту и переформатирует суммы и безубыточную точку в видимых строках"""
+        if currency == self.currency:
+            return
         self.currency = currency
-
+        for slot, row in enumerate(self._rows[:self._visible_count or 0]):
+            index = self._first_row + slot
+            if index >= len(self._purchases):
+                continue
+            purchase = self._purchases[index]
+            row["investment"].configure(text=format_currency(purchase.investment, self.currency))
+            row["price"].configure(text=format_currency(purchase.price, self.currency))
+            row["break_even"].configure(
+                text=self._format_break_even(self._purchases.break_even_after(index))
+            )
@@ -1,5 +1,6 @@
 import customtkinter as ctk
 from decimal import Decimal
+from typing import Callable, Optional
 from src.utils.formatters import format_currency, format_quantity
 from src.utils.currency import Currency
 
@@ -7,9 +8,26 @@ from src.utils.currency import Currency
 class ResultsSection(ctk.CTkFrame):
     """Секция для отображения текущих результатов"""
     
-    def __init__(self, parent, currency: Currency = Currency.PLN, **kwargs):
+    # Методы учета лотов: подпись в меню -> значение LotEngine
+    LOT_METHODS = {
+        "FIFO": "fifo",
+        "LIFO": "lifo",
+        "HIFO": "hifo",
+        "Średnia": "average"
+    }
+    
+    def __init__(
+        self,
+        parent,
+        currency: Currency = Currency.PLN,
+        on_lot_method_change: Optional[Callable[[str], None]] = None,
+        on_undo_sale: Optional[Callable[[], None]] = None,
+        **kwargs
+    ):
         super().__init__(parent, **kwargs)
         self.currency = currency
+        self.on_lot_method_change = on_lot_method_change
+        self.on_undo_sale = on_undo_sale
         self._setup_ui()
     
     def _setup_ui(self):
@@ -59,6 +77,49 @@ class ResultsSection(ctk.CTkFrame):
             font=ctk.CTkFont(size=14, weight="bold")
         )
         self.break_even_value.pack(side="right", padx=12, pady=6)
+        
+        # Продажи: реализованная прибыль по выбранному методу учета лотов
+        self._create_metric(
+            metrics_frame,
+            "Zrealizowany zysk:",
+            "realized_pnl",
+            row=3
+        )
+        
+        self._create_metric(
+            metrics_frame,
+            "Sprzedana ilość:",
+            "sold_quantity",
+            row=4
+        )
+        
+        lots_frame = ctk.CTkFrame(metrics_frame, fg_color="transparent")
+        lots_frame.grid(row=5, column=0, columnspan=2, sticky="ew", padx=12, pady=(0, 6))
+        
+        lot_method_label = ctk.CTkLabel(
+            lots_frame,
+            text="Metoda rozliczenia:",
+            font=ctk.CTkFont(size=11)
+        )
+        lot_method_label.pack(side="left")
+        
+        self.lot_method_menu = ctk.CTkOptionMenu(
+            lots_frame,
+            values=list(self.LOT_METHODS),
+            width=90,
+            font=ctk.CTkFont(size=11),
+            command=self._on_lot_method_selected
+        )
+        self.lot_method_menu.pack(side="left", padx=(6, 0))
+        
+        self.undo_sale_button = ctk.CTkButton(
+            lots_frame,
+            text="↶ Cofnij sprzedaż",
+            width=110,
+            font=ctk.CTkFont(size=11),
+            command=lambda: self.on_undo_sale() if self.on_undo_sale else None
+        )
+        self.undo_sale_button.pack(side="right")
     
     def _create_metric(self, parent, label_text: str, value_key: str, row: int):
         """Создает метрику с подписью и значением"""
@@ -103,4 +164,22 @@ class ResultsSection(ctk.CTkFrame):
         self.break_even_value.configure(
             text=format_currency(break_even_price, self.currency) if break_even_price else "—"
         )
-
+    
+    def _on_lot_method_selected(self, label: str):
+        """Обработчик выбора метода учета лотов"""
+        if self.on_lot_method_change:
+            self.on_lot_method_change(self.LOT_METHODS[label])
+    
+    def update_sales(self, realized_pnl: Decimal | None, sold_quantity: Decimal | None, lot_method: str):
+        """Обновляет результаты продаж и выбранный метод учета лотов"""
+        self.realized_pnl.configure(
+            text=format_currency(realized_pnl, self.currency) if sold_quantity else "—"
+        )
+        self.sold_quantity.configure(
+            text=format_quantity(sold_quantity) if sold_quantity else "—"
+        )
+        for label, method in self.LOT_METHODS.items():
+            if method == lot_method:
+                self.lot_method_menu.set(label)
+                break
+        self.undo_sale_button.configure(state="normal" if sold_quantity else "disabled")
@@ -0,0 +1,184 @@
+import customtkinter as ctk
+from decimal import Decimal
+from typing import Callable, List, Optional
+from src.models.sensitivity_grid import SensitivityGrid
+from src.utils.formatters import format_currency, format_percent
+from src.utils.validators import validate_percent, validate_positive_decimal
+from src.utils.currency import Currency
+
+
+class SensitivityPanel(ctk.CTkFrame):
+    """Панель анализа чувствительности: сетка просадка × сумма докупки в виде тепловой карты"""
+
+    MAX_STEPS = 60  # Максимум значений по каждой оси
+    CELL_HEIGHT = 22
+    HEADER_WIDTH = 110  # Ширина колонки с просадкой и ценой докупки
+    CHAR_WIDTH = 7  # Примерная ширина символа шрифта ячейки, пикселей
+    LOW_COLOR = (244, 204, 204)  # Наименьшее снижение безубыточной точки
+    HIGH_COLOR = (182, 215, 168)  # Наибольшее снижение безубыточной точки
+
+    def __init__(
+        self,
+        parent,
+        on_calculate: Callable[[List[Decimal], List[Decimal]], None],
+        currency: Currency = Currency.PLN,
+        **kwargs
+    ):
+        super().__init__(parent, **kwargs)
+        self.on_calculate = on_calculate
+        self.currency = currency
+        self._setup_ui()
+
+    def _setup_ui(self):
+        """Настройка интерфейса панели"""
+        title = ctk.CTkLabel(
+            self,
+            text="Analiza wrażliwości",
+            font=ctk.CTkFont(size=14, weight="bold")
+        )
+        title.pack(pady=(0, 8))
+
+        fields_frame = ctk.CTkFrame(self)
+        fields_frame.pack(fill="x", pady=0)
+
+        self.drawdown_entries = self._create_range_row(fields_frame, "Spadek, %:", 0, ("5", "50", "5"))
+        self.investment_entries = self._create_range_row(fields_frame, "Kwota zakupu:", 1, ("", "", ""))
+
+        calculate_button = ctk.CTkButton(
+            fields_frame,
+            text="Oblicz",
+            width=90,
+            font=ctk.CTkFont(size=11),
+            command=self._on_calculate_clicked
+        )
+        calculate_button.grid(row=0, column=7, rowspan=2, padx=12, pady=6)
+
+        # Сообщение об ошибке
+        self.error_label = ctk.CTkLabel(
+            self,
+            text="",
+            text_color="red",
+            font=ctk.CTkFont(size=10)
+        )
+        self.error_label.pack(pady=(3, 0))
+
+        # Тепловая карта рисуется на холсте: сотни ячеек без отдельного виджета на каждую
+        self.canvas = ctk.CTkCanvas(self, height=self.CELL_HEIGHT, highlightthickness=0, bg="white")
+        self.canvas.pack(fill="x", padx=12, pady=(3, 0))
+
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="horizontal", command=self.canvas.xview)
+        self.scrollbar.pack(fill="x", padx=12, pady=(0, 6))
+        self.canvas.configure(xscrollcommand=self.scrollbar.set)
+
+    def _create_range_row(self, parent, text: str, row: int, defaults: tuple) -> tuple:
+        """Строка диапазона: подпись и поля «od», «do», «krok»"""
+        label = ctk.CTkLabel(parent, text=text, font=ctk.CTkFont(size=11))
+        label.grid(row=row, column=0, padx=(12, 6), pady=6, sticky="w")
+
+        entries = []
+        for i, (caption, default) in enumerate(zip(("od", "do", "krok"), defaults)):
+            caption_label = ctk.CTkLabel(parent, text=caption, font=ctk.CTkFont(size=11))
+            caption_label.grid(row=row, column=1 + i * 2, padx=(6, 3), pady=6, sticky="e")
+
+            entry = ctk.CTkEntry(parent, placeholder_text="0.00", width=80, font=ctk.CTkFont(size=11))
+            entry.grid(row=row, column=2 + i * 2, padx=(0, 3), pady=6, sticky="w")
+            if default:
+                entry.insert(0, default)
+            entry.bind("<Return>", lambda e: self._on_calculate_clicked())
+            entries.append(entry)
+        return tuple(entries)
+
+    def _read_range(self, entries: tuple, validator) -> Optional[List[Decimal]]:
+        """Читает диапазон od..do с шагом krok; при ошибке показывает ее и возвращает None"""
+        values = []
+        for entry in entries:
+            valid, error, value = validator(entry.get())
+            if not valid:
+                self.error_label.configure(text=error)
+                return None
+            values.append(value)
+
+        start, stop, step = values
+        if step <= 0 or stop < start:
+            self.error_label.configure(text="Nieprawidłowy zakres")
+            return None
+        count = int((stop - start) / step) + 1
+        if count > self.MAX_STEPS:
+            self.error_label.configure(text=f"Maksymalnie {self.MAX_STEPS} wartości w zakresie")
+            return None
+        return [start + step * i for i in range(count)]
+
+    def _on_calculate_clicked(self):
+        """Обработчик кнопки расчета сетки"""
+        drawdowns = self._read_range(self.drawdown_entries, validate_percent)
+        if drawdowns is None:
+            return
+        investments = self._read_range(self.investment_entries, validate_positive_decimal)
+        if investments is None:
+            return
+
+        self.error_label.configure(text="")
+        self.on_calculate(drawdowns, investments)
+
+    def set_currency(self, currency: Currency):
+        """Устанавливает валюту"""
+        self.currency = currency
+
+    def show_grid(self, grid: SensitivityGrid | None, currency: Currency = None):
+        """Рисует тепловую карту: строка - просадка и цена докупки, ячейка - новая безубыточная точка"""
+        if currency:
+            self.currency = currency
+
+        self.canvas.delete("all")
+        if grid is None:
+            self.canvas.configure(height=self.CELL_HEIGHT, scrollregion=(0, 0, 0, 0))
+            return
+
+        rows, columns = grid.shape
+        break_even = grid.break_even.tolist()
+        improvement = grid.improvement_percent
+        low, high = float(improvement.min()), float(improvement.max())
+        span = (high - low) or 1.0
+        shades = ((improvement - low) / span).tolist()
+
+        cell_texts = [[format_currency(value, self.currency) for value in row] for row in break_even]
+        column_texts = [format_currency(value, self.currency) for value in grid.investments.tolist()]
+        longest = max(len(text) for text in column_texts + [t for row in cell_texts for t in row])
+        cell_width = max(70, (longest + 2) * self.CHAR_WIDTH)
+        font = ("Courier", 10)
+
+        # Заголовок колонок: суммы докупки
+        for j, text in enumerate(column_texts):
+            x = self.HEADER_WIDTH + j * cell_width
+            self.canvas.create_rectangle(x, 0, x + cell_width, self.CELL_HEIGHT, fill="#e6e6e6", outline="white")
+            self.canvas.create_text(x + cell_width / 2, self.CELL_HEIGHT / 2, text=text, font=font)
+
+        for i in range(rows):
+            y = (i + 1) * self.CELL_HEIGHT
+            header = (
+                f"{format_percent(Decimal(repr(float(grid.drawdowns[i]))))} · "
+                f"{format_currency(float(grid.next_prices[i]), self.currency)}"
+            )
+            self.canvas.create_rectangle(0, y, self.HEADER_WIDTH, y + self.CELL_HEIGHT, fill="#e6e6e6", outline="white")
+            self.canvas.create_text(6, y + self.CELL_HEIGHT / 2, text=header, font=font, anchor="w")
+            for j in range(columns):
+                x = self.HEADER_WIDTH + j * cell_width
+                self.canvas.create_rectangle(
+                    x, y, x + cell_width, y + self.CELL_HEIGHT,
+                    fill=SensitivityPanel._blend(shades[i][j]),
+                    outline="white"
+                )
+                self.canvas.create_text(x + cell_width / 2, y + self.CELL_HEIGHT / 2, text=cell_texts[i][j], font=font)
+
+        width = self.HEADER_WIDTH + columns * cell_width
+        height = (rows + 1) * self.CELL_HEIGHT
+        self.canvas.configure(height=height, scrollregion=(0, 0, width, height))
+
+    @staticmethod
+    def _blend(shade: float) -> str:
+        """Цвет ячейки между LOW_COLOR (0.0) и HIGH_COLOR (1.0)"""
+        r, g, b = (
+            round(low + (high - low) * shade)
+            for low, high in zip(SensitivityPanel.LOW_COLOR, SensitivityPanel.HIGH_COLOR)
+        )
+        return f"#{r:02x}{g:02x}{b:02x}"
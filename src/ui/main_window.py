@@ -1,11 +1,21 @@
+import queue
+import threading
 import customtkinter as ctk
+from dataclasses import replace
+from datetime import datetime
 from decimal import Decimal
+from pathlib import Path
+from src.models.lot_engine import LotEngine
 from src.services.asset_manager import AssetManager
 from src.services.calculator import Calculator
+from src.services.trade_importer import TradeImporter
 from src.ui.components.purchase_table import PurchaseTable
+from src.ui.components.purchase_edit_dialog import PurchaseEditDialog
+from src.ui.components.import_progress_dialog import ImportProgressDialog
 from src.ui.components.input_section import InputSection
 from src.ui.components.results_section import ResultsSection
 from src.ui.components.planning_section import PlanningSection
+from src.ui.components.sensitivity_panel import SensitivityPanel
 from src.ui.components.asset_selector import AssetSelector
 from src.utils.currency import Currency
 
@@ -16,8 +26,16 @@ class MainWindow(ctk.CTk):
     def __init__(self):
         super().__init__()
         
+        # Ошибки фонового сохранения приходят из другого потока,
+        # поэтому передаем их в поток интерфейса через очередь
+        self._save_errors: queue.SimpleQueue = queue.SimpleQueue()
+        # Импорт сделок выполняется в фоновом потоке (None - импорта нет)
+        self._import_thread: threading.Thread | None = None
+        
         # Инициализация менеджера активов
-        self.asset_manager = AssetManager()
+        self.asset_manager = AssetManager(
+            on_save_error=lambda name, error: self._save_errors.put((name, error))
+        )
         
         # Настройка окна
         self.title("Kalkulator uśredniania (Punkt bezstratny)")
@@ -30,17 +48,52 @@ class MainWindow(ctk.CTk):
         
         self._setup_ui()
         
+        # При закрытии окна сворачиваем журнал изменений в файл актива
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        # Ctrl+Z отменяет последний пакет изменений покупок
+        self.bind("<Control-z>", lambda event: self._on_undo())
+        
         # Загружаем список активов и обновляем селектор
         # (вызывается после создания всех компонентов)
         self.after(100, self._initialize_assets)
+        self.after(500, self._poll_save_errors)
     
     def _initialize_assets(self):
         """Инициализирует список активов после создания UI"""
-        assets = self.asset_manager.list_assets()
-        self.asset_selector.update_assets_list(assets)
+        self._refresh_assets_list()
         # Обновляем scrollregion после загрузки активов
         self.after(300, self._update_scroll_region)
     
+    def _on_close(self):
+        """Обработчик закрытия окна"""
+        # Дожидаемся импорта и всех фоновых записей, чтобы не потерять данные
+        if self._import_thread is not None:
+            self._import_thread.join()
+        self.asset_manager.shutdown()
+        failed = self.asset_manager.last_save_error
+        if failed:
+            # Последняя запись актива не прошла - пользователь не должен считать данные сохраненными
+            import tkinter.messagebox as messagebox
+            name, error = failed
+            messagebox.showerror("Błąd zapisu", f"Nie udało się zapisać aktywu '{name}': {error}")
+        self.destroy()
+    
+    def _poll_save_errors(self):
+        """Показывает ошибки фонового сохранения в интерфейсе"""
+        try:
+            while True:
+                name, error = self._save_errors.get_nowait()
+                self.asset_selector.error_label.configure(text=f"Błąd zapisu '{name}': {error}")
+        except queue.Empty:
+            pass
+        self.after(500, self._poll_save_errors)
+    
+    def _refresh_assets_list(self):
+        """Обновляет список активов и их сводки в селекторе (сводки читаются из каталога)"""
+        assets = self.asset_manager.list_assets()
+        summaries = self.asset_manager.list_summaries()
+        self.asset_selector.update_assets_list(assets, summaries)
+    
     def _setup_ui(self):
         """Настройка интерфейса главного окна"""
         # Главный контейнер с прокруткой
@@ -92,14 +145,18 @@ class MainWindow(ctk.CTk):
         # Секция результатов (слева)
         self.results_section = ResultsSection(
             results_input_frame,
-            currency=Currency.USD
+            currency=Currency.USD,
+            on_lot_method_change=self._on_lot_method_change,
+            on_undo_sale=self._on_undo_sale
         )
         self.results_section.grid(row=0, column=0, padx=(0, 5), sticky="nsew")
         
         # Секция добавления покупки (справа)
         self.input_section = InputSection(
             results_input_frame,
-            on_add=self._on_add_purchase
+            on_add=self._on_add_purchase,
+            on_sell=self._on_sell,
+            on_import=self._on_import_csv
         )
         self.input_section.grid(row=0, column=1, padx=(5, 0), sticky="nsew")
         
@@ -107,17 +164,28 @@ class MainWindow(ctk.CTk):
         self.purchase_table = PurchaseTable(
             main_container,
             on_delete=self._on_delete_purchase,
-            currency=Currency.USD
+            currency=Currency.USD,
+            on_edit=self._on_edit_purchase
         )
         self.purchase_table.grid(row=3, column=0, pady=(0, 10), sticky="ew")
         
-        # Секция планирования (последняя, без отступов снизу)
+        # Секция планирования
         self.planning_section = PlanningSection(
             main_container,
             on_drawdown_change=self._on_drawdown_change,
+            currency=Currency.USD,
+            on_ladder_request=self._on_ladder_request,
+            on_target_change=self._update_planning
+        )
+        self.planning_section.grid(row=4, column=0, sticky="ew", pady=(0, 10))
+        
+        # Панель анализа чувствительности (последняя, без отступов снизу)
+        self.sensitivity_panel = SensitivityPanel(
+            main_container,
+            on_calculate=self._on_sensitivity_request,
             currency=Currency.USD
         )
-        self.planning_section.grid(row=4, column=0, sticky="ew", pady=(0, 0))
+        self.sensitivity_panel.grid(row=5, column=0, sticky="ew", pady=(0, 0))
         
         # Сохраняем ссылку на scrollable для обновления scrollregion
         self.main_scrollable = main_scrollable
@@ -172,8 +240,7 @@ class MainWindow(ctk.CTk):
         asset = self.asset_manager.create_asset(asset_name, currency)
         self._load_asset_data(asset)
         # Обновляем список активов
-        assets = self.asset_manager.list_assets()
-        self.asset_selector.update_assets_list(assets)
+        self._refresh_assets_list()
         # Обновляем селектор
         self.asset_selector.set_current_asset(asset_name)
         # Обновляем заголовок окна
@@ -188,8 +255,7 @@ class MainWindow(ctk.CTk):
             # Обновляем заголовок окна
             self.title("Kalkulator uśredniania (Punkt bezstratny)")
             # Обновляем список активов
-            assets = self.asset_manager.list_assets()
-            self.asset_selector.update_assets_list(assets)
+            self._refresh_assets_list()
     
     def _load_asset_data(self, asset):
         """Загружает данные актива в интерфейс"""
@@ -209,7 +275,9 @@ class MainWindow(ctk.CTk):
         """Очищает интерфейс"""
         self.purchase_table.update_purchases([], Currency.USD)
         self.results_section.update_results(None, None, None, Currency.USD)
+        self.results_section.update_sales(None, None, LotEngine.FIFO)
         self.planning_section.update_planning(None, Decimal('15.0'), None, Currency.USD)
+        self.sensitivity_panel.show_grid(None, Currency.USD)
     
     def _get_current_currency_from_menu(self) -> Currency:
         """Возвращает текущую валюту из меню"""
@@ -229,10 +297,13 @@ class MainWindow(ctk.CTk):
             self.asset_manager.set_currency(currency)
         
         # Обновляем все компоненты с новой валютой
+        # (таблица только переформатирует суммы в уже созданных строках)
         self.results_section.set_currency(currency)
         self.purchase_table.set_currency(currency)
         self.planning_section.set_currency(currency)
-        self._update_all()
+        self.sensitivity_panel.set_currency(currency)
+        if self.asset_manager.current_asset:
+            self._update_results()
     
     def _on_add_purchase(self, investment: float, price: float):
         """Обработчик добавления покупки"""
@@ -244,9 +315,11 @@ class MainWindow(ctk.CTk):
             investment_decimal = Decimal(str(investment))
             price_decimal = Decimal(str(price))
             
-            self.asset_manager.add_purchase(investment_decimal, price_decimal)
+            purchase = self.asset_manager.add_purchase(investment_decimal, price_decimal)
             # Автоматическое сохранение уже происходит в AssetManager
-            self._update_all()
+            # В таблицу добавляется одна строка, без перестроения всей таблицы
+            self.purchase_table.append_purchase(purchase)
+            self._update_results()
         except ValueError as e:
             self.input_section.error_label.configure(text=str(e))
     
@@ -255,10 +328,158 @@ class MainWindow(ctk.CTk):
         if not self.asset_manager.current_asset:
             return
         
-        self.asset_manager.remove_purchase(purchase_id)
-        # Автоматическое сохранение уже происходит в AssetManager
+        try:
+            removed = self.asset_manager.remove_purchase(purchase_id)
+        except ValueError:
+            self.input_section.error_label.configure(text="Zakup jest już sprzedany – najpierw cofnij sprzedaż")
+            return
+        if removed:
+            # Автоматическое сохранение уже происходит в AssetManager
+            # Из таблицы удаляется одна строка, без перестроения всей таблицы
+            self.purchase_table.remove_purchase(purchase_id)
+            self._update_results()
+    
+    def _on_edit_purchase(self, purchase_id: int):
+        """Обработчик кнопки исправления покупки: открывает окно с ее текущими значениями"""
+        purchase = self.asset_manager.get_purchase(purchase_id)
+        if purchase is None:
+            return
+        PurchaseEditDialog(self, purchase, on_save=self._on_purchase_edited)
+    
+    def _on_purchase_edited(
+        self,
+        purchase_id: int,
+        investment: Decimal,
+        price: Decimal,
+        timestamp: datetime
+    ) -> str | None:
+        """Сохраняет исправление покупки; возвращает текст ошибки для окна исправления"""
+        try:
+            purchase = self.asset_manager.edit_purchase(purchase_id, investment, price, timestamp)
+        except ValueError as e:
+            # Текст ошибки различает некорректные значения и превышение продажами купленного количества
+            return str(e)
+        if purchase is None:
+            return "Najpierw wybierz lub utwórz aktyw"
+        # Строка исправляется на месте, без перестроения всей таблицы
+        self.purchase_table.replace_purchase(purchase)
+        self._update_results()
+        return None
+    
+    def _on_import_csv(self):
+        """Обработчик импорта сделок из CSV-выгрузки биржи"""
+        if not self.asset_manager.current_asset:
+            self.input_section.error_label.configure(text="Najpierw wybierz lub utwórz aktyw")
+            return
+        
+        from tkinter import filedialog
+        filepath = filedialog.askopenfilename(
+            title="Importuj transakcje",
+            filetypes=[("CSV", "*.csv *.txt"), ("Wszystkie pliki", "*.*")]
+        )
+        if not filepath:
+            return
+        
+        # Импорт идет в фоновом потоке, окно хода импорта модальное: пока актив меняется,
+        # пользователь не может его изменить. Ход и результат передаются в поток интерфейса через очередь
+        events: queue.SimpleQueue = queue.SimpleQueue()
+        dialog = ImportProgressDialog(self, Path(filepath).name)
+        
+        committed = [0]  # Добавлено покупок к последнему записанному пакету
+        
+        def on_progress(report):
+            committed[0] = report.imported
+            # Копия отчета: поток интерфейса читает ее, пока импорт продолжает менять оригинал
+            events.put(("progress", replace(report)))
+        
+        def run():
+            try:
+                report = TradeImporter.import_csv(self.asset_manager, Path(filepath), on_progress=on_progress)
+            except Exception as e:
+                # Любая ошибка должна дойти до интерфейса, иначе модальное окно не закроется;
+                # часть файла к этому моменту уже может быть добавлена
+                events.put(("error", (e, committed[0])))
+            else:
+                events.put(("done", report))
+        
+        self._import_thread = threading.Thread(target=run, name="TradeImport", daemon=True)
+        self._import_thread.start()
+        self.after(100, lambda: self._poll_import(events, dialog))
+    
+    def _poll_import(self, events: queue.SimpleQueue, dialog: ImportProgressDialog):
+        """Показывает ход фонового импорта и обновляет интерфейс по его завершении"""
+        try:
+            while True:
+                kind, payload = events.get_nowait()
+                if kind == "progress":
+                    dialog.update_progress(payload)
+                    continue
+                self._import_thread.join()
+                self._import_thread = None
+                dialog.destroy()
+                self._on_import_finished(kind, payload)
+                return
+        except queue.Empty:
+            pass
+        self.after(100, lambda: self._poll_import(events, dialog))
+    
+    def _on_import_finished(self, kind: str, payload):
+        """Показывает итоги импорта (или ошибку и количество уже добавленных покупок)"""
+        if kind == "error":
+            error, imported = payload
+            message = f"Błąd importu: {error}"
+            if imported:
+                message += f" (zaimportowano już: {imported}, można cofnąć)"
+                self._update_all()
+            self.input_section.error_label.configure(text=message)
+            return
+        
+        report = payload
+        message = f"Zaimportowano: {report.imported}, duplikaty: {report.duplicates}, błędy: {report.invalid}"
+        if report.errors:
+            message += f" ({report.errors[0]})"
+        self.input_section.error_label.configure(text=message)
+        # Импорт добавляет покупки пакетами, интерфейс обновляется один раз в конце
         self._update_all()
     
+    def _on_undo(self):
+        """Обработчик отмены последнего пакета изменений покупок"""
+        if not self.asset_manager.can_undo():
+            return
+        try:
+            self.asset_manager.undo_last_batch()
+        except ValueError:
+            self.input_section.error_label.configure(text="Zakupy są już sprzedane – najpierw cofnij sprzedaż")
+            return
+        # Пакет может затронуть много строк, поэтому интерфейс обновляется один раз целиком
+        self._update_all()
+    
+    def _on_sell(self, quantity: float, price: float):
+        """Обработчик продажи части позиции"""
+        if not self.asset_manager.current_asset:
+            self.input_section.error_label.configure(text="Najpierw wybierz lub utwórz aktyw")
+            return
+        
+        try:
+            self.asset_manager.add_sale(Decimal(str(quantity)), Decimal(str(price)))
+        except ValueError as e:
+            # Текст ошибки различает некорректные значения и превышение открытой позиции
+            self.input_section.error_label.configure(text=str(e))
+            return
+        self._update_results()
+    
+    def _on_undo_sale(self):
+        """Обработчик отмены последней продажи"""
+        last_sale = self.asset_manager.get_last_sale()
+        if last_sale and self.asset_manager.remove_sale(last_sale.id):
+            self._update_results()
+    
+    def _on_lot_method_change(self, method: str):
+        """Обработчик смены метода учета лотов"""
+        if self.asset_manager.current_asset:
+            self.asset_manager.set_lot_method(method)
+            self._update_results()
+    
     def _on_drawdown_change(self, drawdown: Decimal):
         """Обработчик изменения процента просадки"""
         if self.asset_manager.current_asset:
@@ -266,6 +487,51 @@ class MainWindow(ctk.CTk):
             # Автоматическое сохранение уже происходит в AssetManager
         self._update_planning()
     
+    def _on_ladder_request(self, levels: int, sizing: str, amount: Decimal, param: Decimal | None):
+        """Обработчик расчета лестницы докупок от цены последней покупки"""
+        last_purchase = self.asset_manager.get_last_purchase()
+        if not last_purchase:
+            self.planning_section.error_label.configure(text="Brak zakupów do zaplanowania")
+            self.planning_section.show_ladder(None)
+            return
+        
+        try:
+            plan = Calculator.plan_ladder(
+                last_price=last_purchase.price,
+                drawdown_percent=self.asset_manager.get_drawdown_percent(),
+                levels=levels,
+                base_amount=amount,
+                sizing=sizing,
+                sizing_param=param,
+                aggregate=self.asset_manager.get_open_position()
+            )
+        except ValueError as e:
+            self.planning_section.error_label.configure(text=str(e))
+            return
+        self.planning_section.show_ladder(plan, self.asset_manager.get_currency())
+        self.after(50, self._update_scroll_region)
+    
+    def _on_sensitivity_request(self, drawdowns: list[Decimal], investments: list[Decimal]):
+        """Обработчик расчета сетки просадка × сумма от цены последней покупки"""
+        last_purchase = self.asset_manager.get_last_purchase()
+        if not last_purchase:
+            self.sensitivity_panel.error_label.configure(text="Brak zakupów do analizy")
+            self.sensitivity_panel.show_grid(None)
+            return
+        
+        try:
+            grid = Calculator.calculate_sensitivity_grid(
+                last_purchase.price,
+                drawdowns,
+                investments,
+                self.asset_manager.get_open_position()
+            )
+        except ValueError as e:
+            self.sensitivity_panel.error_label.configure(text=str(e))
+            return
+        self.sensitivity_panel.show_grid(grid, self.asset_manager.get_currency())
+        self.after(50, self._update_scroll_region)
+    
     def _update_all(self):
         """Обновляет все секции интерфейса"""
         if not self.asset_manager.current_asset:
@@ -278,10 +544,20 @@ class MainWindow(ctk.CTk):
         # Обновляем таблицу
         self.purchase_table.update_purchases(purchases, currency)
         
-        # Обновляем результаты
-        total_investment = Calculator.calculate_total_investment(purchases) if purchases else None
-        total_quantity = Calculator.calculate_total_quantity(purchases) if purchases else None
-        break_even = Calculator.calculate_break_even(purchases)
+        self._update_results()
+    
+    def _update_results(self):
+        """Обновляет результаты и планирование (без перестроения таблицы)"""
+        currency = self.asset_manager.get_currency()
+        
+        # Все итоги берутся из открытой позиции (итоги поддерживаются инкрементально в AssetManager):
+        # после продаж это себестоимость и количество открытых лотов, иначе сумма вложений
+        # не сходилась бы с количеством и безубыточной точкой
+        position = self.asset_manager.get_open_position()
+        has_position = position is not None and position.count > 0
+        total_investment = position.total_investment if has_position else None
+        total_quantity = (position.total_quantity or None) if has_position else None
+        break_even = Calculator.calculate_break_even_from_aggregate(position)
         
         self.results_section.update_results(
             total_investment,
@@ -289,6 +565,12 @@ class MainWindow(ctk.CTk):
             break_even,
             currency
         )
+        # Учет лотов нужен только после продаж; без них актив обходится итогами
+        if self.asset_manager.get_last_sale():
+            lots = self.asset_manager.get_lots()
+            self.results_section.update_sales(lots.realized_pnl, lots.sold_quantity, lots.method)
+        else:
+            self.results_section.update_sales(None, None, self.asset_manager.get_lot_method())
         
         # Обновляем планирование
         self._update_planning()
@@ -323,4 +605,16 @@ class MainWindow(ctk.CTk):
             next_price,
             currency
         )
+        
+        # Обратный расчет по итогам открытой позиции, без пробных покупок
+        target, amount = self.planning_section.get_target_inputs()
+        aggregate = self.asset_manager.get_open_position()
+        required_investment = None
+        required_price = None
+        if target:
+            if next_price:
+                required_investment = Calculator.calculate_required_investment(aggregate, next_price, target)
+            if amount:
+                required_price = Calculator.calculate_required_price(aggregate, amount, target)
+        self.planning_section.update_targets(required_investment, required_price)
 
@@ -15,6 +15,11 @@ class Currency(Enum):
         self.code = code
         self.full_name = full_name
     
+    @property
+    def decimals(self) -> int:
+        """Количество знаков после запятой для сумм и цен в этой валюте"""
+        return 8 if self in (Currency.BTC, Currency.ETH) else 2
+    
     def __str__(self):
         return f"{self.symbol} ({self.code})"
 
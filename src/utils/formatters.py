@@ -8,8 +8,7 @@ def format_currency(value: Decimal | None, currency: Currency = Currency.PLN, de
         return "—"
     
     # Для криптовалют используем больше знаков после запятой
-    if currency in [Currency.BTC, Currency.ETH]:
-        decimals = 8
+    decimals = max(decimals, currency.decimals)
     
     # Форматируем с разделителями тысяч и нужным количеством знаков
     formatted = f"{value:,.{decimals}f}"
@@ -0,0 +1,48 @@
+from decimal import Context, Decimal, ROUND_HALF_EVEN, localcontext
+from src.utils.currency import Currency
+
+
+# Количество хранится с фиксированной точностью независимо от валюты
+QUANTITY_DECIMALS = 8
+
+# Цена хранится с запасом знаков: у дешевых активов значимы доли цента
+PRICE_DECIMALS = 8
+
+# Локальный контекст для расчетов покупок: не зависит от глобального контекста Decimal
+PRECISION_CONTEXT = Context(prec=28, rounding=ROUND_HALF_EVEN)
+
+
+def _quantize(value: Decimal, decimals: int) -> Decimal:
+    """Округляет до decimals знаков после запятой (банковское округление)"""
+    with localcontext(PRECISION_CONTEXT):
+        return value.quantize(Decimal(1).scaleb(-decimals))
+
+
+def quantize_amount(value: Decimal, currency: Currency) -> Decimal:
+    """Сумма денег с точностью валюты (2 знака для фиатных валют, 8 для BTC/ETH)"""
+    return _quantize(value, currency.decimals)
+
+
+def restore_amount(value: Decimal, currency: Currency) -> Decimal:
+    """
+    Приводит прочитанную из файла сумму к точности валюты, если это не теряет знаков
+    (валюту актива могли сменить после ввода сумм, такие суммы остаются как есть)
+    """
+    quantized = quantize_amount(value, currency)
+    return quantized if quantized == value else value
+
+
+def quantize_price(value: Decimal) -> Decimal:
+    """Цена актива с точностью PRICE_DECIMALS"""
+    return _quantize(value, PRICE_DECIMALS)
+
+
+def quantize_quantity(value: Decimal) -> Decimal:
+    """Количество актива с точностью QUANTITY_DECIMALS"""
+    return _quantize(value, QUANTITY_DECIMALS)
+
+
+def divide_quantity(investment: Decimal, price: Decimal) -> Decimal:
+    """Количество investment / price, посчитанное в локальном контексте и округленное"""
+    with localcontext(PRECISION_CONTEXT):
+        return quantize_quantity(investment / price)
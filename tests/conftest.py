@@ -0,0 +1,35 @@
+import pytest
+from src.services.asset_manager import AssetManager
+from src.services.storage_backend import create_storage_backend
+
+
+@pytest.fixture(params=["excel", "sqlite"])
+def storage_kind(request, tmp_path, monkeypatch):
+    """Тип хранилища; файлы активов создаются во временном каталоге (Assets относительно текущего)"""
+    monkeypatch.chdir(tmp_path)
+    return request.param
+
+
+@pytest.fixture
+def open_manager(storage_kind):
+    """Открывает AssetManager над хранилищем storage_kind; все открытые менеджеры закрываются в конце теста"""
+    managers = []
+
+    def factory() -> AssetManager:
+        manager = AssetManager(storage=create_storage_backend(storage_kind))
+        managers.append(manager)
+        return manager
+
+    yield factory
+    for manager in managers:
+        manager.shutdown(timeout=10)
+
+
+@pytest.fixture
+def reload_asset(open_manager):
+    """Дожидается записи на диск и загружает актив заново в новом AssetManager"""
+    def reload(manager: AssetManager, name: str):
+        manager.shutdown(timeout=10)
+        return open_manager().load_asset(name)
+
+    return reload
@@ -0,0 +1,37 @@
+from src.services.background_saver import BackgroundSaver
+
+
+def _fail():
+    raise OSError("disk full")
+
+
+def test_failed_save_is_kept_until_a_later_save_succeeds():
+    reported = []
+    saver = BackgroundSaver(on_error=lambda name, error: reported.append((name, str(error))))
+    try:
+        saver.schedule(("BTC", "flush"), _fail)
+        saver.flush("BTC")
+        name, error = saver.last_error
+        assert name == "BTC" and isinstance(error, OSError)
+        assert reported == [("BTC", "disk full")]
+
+        saver.schedule(("ETH", "flush"), lambda: None)
+        saver.flush("ETH")
+        assert saver.last_error[0] == "BTC"
+
+        saver.schedule(("BTC", "compact"), lambda: None)
+        saver.flush("BTC")
+        assert saver.last_error is None
+    finally:
+        saver.stop(timeout=10)
+
+
+def test_discarded_asset_error_is_dropped():
+    saver = BackgroundSaver()
+    try:
+        saver.schedule(("BTC", "flush"), _fail)
+        saver.flush("BTC")
+        saver.discard("BTC")
+        assert saver.last_error is None
+    finally:
+        saver.stop(timeout=10)
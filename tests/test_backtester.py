@@ -0,0 +1,66 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+import numpy as np
+from src.models.lot_engine import LotEngine
+from src.services.backtester import Backtester
+
+PRICES = [100.0, 95.0, 89.0, 92.0, 80.0, 85.0, 70.0]
+
+
+def _epoch(seconds: int) -> datetime:
+    return datetime.fromtimestamp(seconds, timezone.utc).replace(tzinfo=None)
+
+
+def test_epoch_unit_is_detected_by_magnitude(tmp_path):
+    start = 1_700_000_000
+    source = tmp_path / "prices.csv"
+    source.write_text("timestamp,low\n" + "".join(
+        f"{(start + i * 60) * 1000},{price}\n" for i, price in enumerate(PRICES)
+    ))
+    result = Backtester.run(source, Decimal('10'), Decimal('100'))
+    assert result.purchases[0].timestamp == _epoch(start)
+    for value in (start, start * 10**3, start * 10**6, start * 10**9):
+        assert Backtester._to_datetime(np.int64(value)) == _epoch(start)
+
+
+def test_purchases_without_time_column_are_ordered(tmp_path):
+    source = tmp_path / "prices.npy"
+    np.save(source, np.array(PRICES))
+    result = Backtester.run(source, Decimal('10'), Decimal('100'), chunk_size=3)
+    timestamps = [purchase.timestamp for purchase in result.purchases]
+    assert len(timestamps) == 4
+    assert timestamps == sorted(timestamps) and len(set(timestamps)) == len(timestamps)
+    # Покупки прогона можно проиграть учетом лотов
+    assert LotEngine.replay(result.purchases, []).open_quantity == result.aggregate.total_quantity
+
+
+def test_break_even_at_uses_step_function(tmp_path):
+    source = tmp_path / "prices.npy"
+    np.save(source, np.array(PRICES))
+    result = Backtester.run(source, Decimal('10'), Decimal('100'))
+    series = result.break_even_series
+    assert result.break_even_at(series[0][0].replace(year=1969)) is None
+    for (timestamp, break_even), following in zip(series, series[1:] + [(None, None)]):
+        assert result.break_even_at(timestamp) == break_even
+        if following[0] is not None:
+            assert result.break_even_at(following[0] - (following[0] - timestamp) / 2) == break_even
+    assert result.break_even_at(datetime(2100, 1, 1)) == result.break_even
+
+
+def test_offset_times_are_normalized_to_utc(tmp_path):
+    start = 1_700_000_000
+    assert Backtester._to_datetime("2023-11-14T22:13:20Z") == _epoch(start)
+    assert Backtester._to_datetime("2023-11-15T00:13:20+02:00") == _epoch(start)
+    assert Backtester._to_datetime(datetime.fromtimestamp(start, timezone.utc)) == _epoch(start)
+
+    # Смешанные формы в одном файле: порядок времени сохраняется
+    source = tmp_path / "prices.csv"
+    source.write_text(
+        "timestamp,low\n"
+        f"{start},100\n"
+        "2023-11-15T00:14:20+02:00,89\n"
+        f"{(start + 120) * 1000},79\n"
+    )
+    result = Backtester.run(source, Decimal('10'), Decimal('100'))
+    timestamps = [purchase.timestamp for purchase in result.purchases]
+    assert timestamps == [_epoch(start + offset) for offset in (0, 60, 120)]
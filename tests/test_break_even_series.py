@@ -0,0 +1,136 @@
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+import numpy as np
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+from src.services.calculator import Calculator
+from src.utils.precision import quantize_price
+
+
+def _purchase(purchase_id, moment, rng):
+    investment = Decimal(rng.randint(100, 100000)) / 100
+    price = quantize_price(Decimal(str(rng.uniform(0.01, 70000))))
+    return Purchase(purchase_id, investment, price, Calculator.calculate_quantity(investment, price), moment)
+
+
+def _assert_matches_rebuild(store):
+    series = store.break_even_series()
+    fresh = PurchaseStore(list(store))
+    rebuilt = fresh.break_even_series()
+    assert len(series) == len(rebuilt) == len(store)
+    assert [series.at(count) for count in range(len(series) + 1)] == \
+        [rebuilt.at(count) for count in range(len(rebuilt) + 1)]
+    assert np.array_equal(series.values(), rebuilt.values(), equal_nan=True)
+    assert np.array_equal(store.break_even_column(), fresh.break_even_column(), equal_nan=True)
+    for index, purchase in enumerate(store):
+        assert store.break_even_after(index) == fresh.break_even_after(index)
+        assert store.is_latest(index) == fresh.is_latest(index)
+        assert series.as_of(purchase.timestamp) == rebuilt.as_of(purchase.timestamp)
+
+
+def test_series_stays_equal_to_rebuild_across_appends():
+    rng = random.Random(24)
+    start = datetime(2024, 1, 1)
+    store = PurchaseStore()
+    store.break_even_series()
+    moment = start
+    for purchase_id in range(1, 101):
+        # Иногда несколько покупок в одну минуту: порядок точек - порядок добавления
+        moment += timedelta(minutes=rng.choice((0, 1, 5)))
+        store.append(_purchase(purchase_id, moment, rng))
+        before = store._series
+        _assert_matches_rebuild(store)
+        # Ряд дописан, а не построен заново
+        assert store._series is before
+
+
+def test_appends_after_edit_extend_fenwick_trees():
+    rng = random.Random(25)
+    start = datetime(2024, 1, 1)
+    store = PurchaseStore(_purchase(i, start + timedelta(hours=i), rng) for i in range(1, 20))
+    store.break_even_series()
+    store.replace(_purchase(5, start + timedelta(hours=5), rng))
+    assert store.break_even_series().investment_tree is not None
+    for purchase_id in range(20, 60):
+        store.append(_purchase(purchase_id, start + timedelta(hours=purchase_id), rng))
+        _assert_matches_rebuild(store)
+    assert store.break_even_series().investment_tree is not None
+
+
+def test_backdated_append_rebuilds_series():
+    rng = random.Random(26)
+    start = datetime(2024, 1, 1)
+    store = PurchaseStore(_purchase(i, start + timedelta(days=i), rng) for i in range(1, 30))
+    store.break_even_series()
+    store.append(_purchase(30, start, rng))
+    assert store._series is None
+    _assert_matches_rebuild(store)
+
+
+def test_removals_keep_series_and_appends_reuse_trimmed_positions():
+    rng = random.Random(28)
+    start = datetime(2024, 1, 1)
+    store = PurchaseStore(_purchase(i, start + timedelta(days=i), rng) for i in range(1, 40))
+    store.break_even_series()
+    before = store._series
+    next_id = 40
+    for step in range(60):
+        ids = [purchase.id for purchase in store]
+        # Удаления в середине и в конце (хвостовые надгробия отрезаются) вперемешку с добавлениями
+        store.remove(ids[-1] if step % 3 == 0 else rng.choice(ids))
+        if step % 2 == 0:
+            store.append(_purchase(next_id, start + timedelta(days=next_id), rng))
+            next_id += 1
+        assert store._series is before
+        _assert_matches_rebuild(store)
+
+
+def test_series_built_over_tombstones():
+    rng = random.Random(29)
+    start = datetime(2024, 1, 1)
+    store = PurchaseStore(_purchase(i, start + timedelta(days=i % 7, hours=i), rng) for i in range(1, 50))
+    for purchase_id in range(3, 50, 4):
+        store.remove(purchase_id)
+    assert store._tombstones
+    _assert_matches_rebuild(store)
+    store.append(_purchase(50, start + timedelta(days=30), rng))
+    store.replace(_purchase(6, start + timedelta(days=6 % 7, hours=6), rng))
+    _assert_matches_rebuild(store)
+
+
+def test_copy_does_not_see_appends_of_original():
+    rng = random.Random(27)
+    start = datetime(2024, 1, 1)
+    store = PurchaseStore(_purchase(i, start + timedelta(days=i), rng) for i in range(1, 10))
+    store.append(_purchase(10, start + timedelta(days=10), rng))
+    store.break_even_series()
+    store.append(_purchase(11, start + timedelta(days=11), rng))
+    copy = store.copy()
+    store.append(_purchase(12, start + timedelta(days=12), rng))
+    copy.append(_purchase(13, start + timedelta(days=13), rng))
+    _assert_matches_rebuild(store)
+    _assert_matches_rebuild(copy)
+
+
+def test_positions_map_past_tombstones_without_compacting():
+    rng = random.Random(30)
+    start = datetime(2024, 1, 1)
+    purchases = [_purchase(i, start + timedelta(hours=i), rng) for i in range(1, 200)]
+    store = PurchaseStore(purchases)
+    removed = set(rng.sample(range(1, 199), 60))
+    for purchase_id in removed:
+        store.remove(purchase_id)
+    alive = [purchase for purchase in purchases if purchase.id not in removed]
+    tombstones = store._tombstones
+    assert tombstones
+    for index, purchase in enumerate(alive):
+        assert store.index_of(purchase.id) == index
+        assert store[index] == purchase
+    assert store[-1] == alive[-1]
+    assert store[10:20] == alive[10:20]
+    assert store.index_of(next(iter(removed))) is None
+    # Ни перевод номеров, ни векторные операции не уплотняют массивы
+    assert store.total("investment") == sum((p.investment for p in alive), Decimal('0'))
+    assert store.between(start, start + timedelta(hours=50)) == [p for p in alive if p.id <= 50]
+    assert store._tombstones == tombstones
@@ -0,0 +1,79 @@
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.position_aggregate import PositionAggregate
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+from src.services.calculator import Calculator
+from src.utils.currency import Currency
+from src.utils.precision import quantize_amount, quantize_price
+
+
+def _purchases(size, currency=Currency.USD, seed=14):
+    """Покупки, округленные политикой точности, как при вводе"""
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    purchases = []
+    for i in range(size):
+        investment = quantize_amount(Decimal(str(rng.uniform(1, 10000))), currency)
+        price = quantize_price(Decimal(str(rng.uniform(0.0001, 70000))))
+        purchases.append(Purchase(i + 1, investment, price, Calculator.calculate_quantity(investment, price),
+                                  start + timedelta(minutes=i)))
+    return purchases
+
+
+def _decimal_sum(values):
+    return sum(values, Decimal('0'))
+
+
+def test_store_totals_match_decimal_sums():
+    for currency in (Currency.USD, Currency.BTC):
+        purchases = _purchases(2000, currency)
+        store = PurchaseStore(purchases)
+        for column in ("investment", "price", "quantity"):
+            expected = _decimal_sum(getattr(p, column) for p in purchases)
+            total = store.total(column)
+            assert total == expected
+            # Совпадает и показатель степени: итоги выводятся с тем же числом знаков
+            assert total.as_tuple() == expected.as_tuple()
+
+
+def test_aggregate_break_even_matches_calculator():
+    purchases = _purchases(2000)
+    aggregate = PositionAggregate.from_purchases(PurchaseStore(purchases))
+    assert aggregate.break_even == Calculator.calculate_break_even(purchases)
+    assert aggregate == PositionAggregate.from_purchases(purchases)
+
+
+def test_cumsum_matches_running_decimal_sum():
+    purchases = _purchases(500)
+    store = PurchaseStore(purchases)
+    running = Decimal('0')
+    for units, purchase in zip(store.cumsum("investment").tolist(), purchases):
+        running += purchase.investment
+        assert Decimal(units).scaleb(-8) == running
+
+
+def test_totals_exact_beyond_int64_and_for_unrepresentable_values():
+    purchases = _purchases(3)
+    # 10**11 в единицах 10**-8 близко к пределу int64: сумма уходит в Python int
+    purchases.append(Purchase(10, Decimal('90000000000.00'), Decimal('1'), Decimal('90000000000'), datetime(2024, 2, 1)))
+    purchases.append(Purchase(11, Decimal('90000000000.00'), Decimal('1'), Decimal('90000000000'), datetime(2024, 2, 2)))
+    # Старые данные с точностью больше 10**-8 хранятся целиком
+    purchases.append(Purchase(12, Decimal('1.123456789012'), Decimal('3'), Decimal('0.374485596337'),
+                              datetime(2024, 2, 3)))
+    store = PurchaseStore(purchases)
+    for column in ("investment", "quantity"):
+        assert store.total(column) == _decimal_sum(getattr(p, column) for p in purchases)
+
+
+def test_totals_after_removal_and_edit():
+    purchases = _purchases(300)
+    store = PurchaseStore(purchases)
+    for purchase in purchases[::3]:
+        store.remove(purchase.id)
+    edited = Purchase(2, Decimal('123.45'), Decimal('10'), Decimal('12.345'), purchases[1].timestamp)
+    store.replace(edited)
+    remaining = [edited if p.id == 2 else p for p in purchases if (p.id - 1) % 3]
+    assert store.total("investment") == _decimal_sum(p.investment for p in remaining)
+    assert store.total("quantity") == _decimal_sum(p.quantity for p in remaining)
@@ -0,0 +1,29 @@
+from decimal import Decimal
+import numpy as np
+from src.models.position_aggregate import PositionAggregate
+from src.services.calculator import Calculator
+
+
+def test_batch_solvers_return_nan_for_empty_position():
+    prices = np.array([80.0, 90.0, 95.0])
+    targets = np.array([100.0, 120.0])
+    for aggregate in (None, PositionAggregate()):
+        assert Calculator.calculate_required_investment(aggregate, Decimal('90'), Decimal('100')) is None
+        investments = Calculator.calculate_required_investment_batch(aggregate, prices[:, None], targets[None, :])
+        assert investments.shape == (3, 2) and np.isnan(investments).all()
+
+        assert Calculator.calculate_required_price(aggregate, Decimal('500'), Decimal('100')) is None
+        found = Calculator.calculate_required_price_batch(aggregate, 500.0, targets)
+        assert found.shape == (2,) and np.isnan(found).all()
+
+
+def test_batch_solvers_match_scalar_path():
+    aggregate = PositionAggregate(Decimal('1000'), Decimal('8'), 2)  # Безубыточная точка 125
+    for price, target in ((100, 120), (100, 100), (130, 120), (125, 125)):
+        scalar = Calculator.calculate_required_investment(aggregate, Decimal(price), Decimal(target))
+        batch = Calculator.calculate_required_investment_batch(aggregate, [price], [target])[0]
+        assert np.isnan(batch) if scalar is None else np.isclose(batch, float(scalar))
+    for investment, target in ((500, 120), (100, 50)):
+        scalar = Calculator.calculate_required_price(aggregate, Decimal(investment), Decimal(target))
+        batch = Calculator.calculate_required_price_batch(aggregate, [investment], [target])[0]
+        assert np.isnan(batch) if scalar is None else np.isclose(batch, float(scalar))
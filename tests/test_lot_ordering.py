@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.asset import Asset
+from src.models.lot_engine import LotEngine
+from src.models.purchase import Purchase
+from src.models.sale import Sale
+from src.utils.currency import Currency
+
+# Продажа 1 @ 120 закрывает по FIFO самый ранний лот - покупку 100 @ 50, датированную годом раньше
+EXPECTED_PNL = Decimal('70')
+EXPECTED_BREAK_EVEN = Decimal('14950') / Decimal('199')
+
+
+def _sell_after_backdated_purchase(manager):
+    manager.create_asset("BTC")
+    manager.add_purchase(Decimal('10000'), Decimal('100'))
+    manager.add_purchases([(Decimal('5000'), Decimal('50'), datetime.now() - timedelta(days=365))])
+    manager.add_sale(Decimal('1'), Decimal('120'))
+
+
+def test_backdated_purchase_live_matches_reload(open_manager, reload_asset):
+    manager = open_manager()
+    _sell_after_backdated_purchase(manager)
+
+    lots = manager.get_lots()
+    assert lots.realized_pnl == EXPECTED_PNL
+    assert lots.break_even == EXPECTED_BREAK_EVEN
+    assert manager.get_open_position().break_even == EXPECTED_BREAK_EVEN
+
+    asset = reload_asset(manager, "BTC")
+    assert asset.lots.realized_pnl == EXPECTED_PNL
+    assert asset.lots.break_even == EXPECTED_BREAK_EVEN
+
+
+def test_lots_built_lazily_without_sales():
+    start = datetime(2024, 1, 1)
+    purchases = [
+        Purchase(id=i, investment=Decimal('100'), price=Decimal('10'), quantity=Decimal('10'),
+                 timestamp=start + timedelta(days=i))
+        for i in range(1, 4)
+    ]
+    asset = Asset("ETH", currency=Currency.USD, drawdown_percent=Decimal('15'), purchases=purchases)
+    assert asset._lots is None
+    assert asset.aggregate.total_quantity == Decimal('30')
+
+    asset.add_sale(Sale(id=1, quantity=Decimal('5'), price=Decimal('20'), timestamp=start + timedelta(days=10)))
+    assert asset.lots.realized_pnl == Decimal('50')
+    assert asset.lots.open_quantity == Decimal('25')
+
+
+def test_backdated_sale_is_replayed_in_order():
+    start = datetime(2024, 1, 1)
+    asset = Asset("ETH", currency=Currency.USD, drawdown_percent=Decimal('15'))
+    asset.add_purchase(Purchase(1, Decimal('100'), Decimal('10'), Decimal('10'), start))
+    asset.add_purchase(Purchase(2, Decimal('100'), Decimal('20'), Decimal('5'), start + timedelta(days=2)))
+    asset.add_sale(Sale(1, Decimal('10'), Decimal('30'), start + timedelta(days=3)))
+
+    # Продажа между покупками: на ее момент открыт только первый лот
+    pnl = asset.add_sale(Sale(2, Decimal('5'), Decimal('30'), start + timedelta(days=1)))
+    expected = LotEngine.replay(asset.purchases, asset.sales, asset.lot_method)
+    assert asset.lots.realized_pnl == expected.realized_pnl
+    assert asset.lots.open_quantity == Decimal('0')
+    assert pnl == asset.lots.realized_pnl - Decimal('200')
+
+
+def test_redated_purchase_live_matches_replay():
+    asset = Asset("BTC", currency=Currency.USD, drawdown_percent=Decimal('15'))
+    asset.add_purchase(Purchase(1, Decimal('100'), Decimal('100'), Decimal('1'), datetime(2024, 1, 1)))
+    asset.add_purchase(Purchase(2, Decimal('50'), Decimal('50'), Decimal('1'), datetime(2024, 1, 2)))
+    assert asset.lots.open_quantity == Decimal('2')
+
+    # Первая покупка переносится на день позже второй: по FIFO продается лот @ 50
+    asset.replace_purchase(Purchase(1, Decimal('100'), Decimal('100'), Decimal('1'), datetime(2024, 1, 3)))
+    asset.add_sale(Sale(1, Decimal('1'), Decimal('80'), datetime(2024, 1, 4)))
+
+    expected = LotEngine.replay(asset.purchases, asset.sales, asset.lot_method)
+    assert asset.lots.realized_pnl == expected.realized_pnl == Decimal('30')
+    assert asset.lots.break_even == expected.break_even == Decimal('100')
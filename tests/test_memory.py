@@ -0,0 +1,67 @@
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.models.asset import Asset
+from src.models.purchase import Purchase
+from src.models.purchase_store import PurchaseStore
+from src.services.calculator import Calculator
+from src.utils.currency import Currency
+from src.utils.precision import quantize_amount, quantize_price
+
+SIZE = 10_000
+# Бюджет на покупку, байт (как в benchmarks/bench_memory.py): строка колоночного хранилища с итогами
+# актива; покупка вместе с лотом после первой продажи
+PURCHASE_BUDGET = 64
+PURCHASE_WITH_LOT_BUDGET = 400
+
+
+def _values():
+    """Значения покупок с реальной точностью: сумма до центов, цена и количество до 8 знаков"""
+    start = datetime(2020, 1, 1)
+    for i in range(SIZE):
+        investment = quantize_amount(Decimal(100 + i % 97) / 3, Currency.USD)
+        price = quantize_price(Decimal(3_000_000 - i) / 7)
+        yield investment, price, Calculator.calculate_quantity(investment, price), start + timedelta(minutes=i)
+
+
+def _bytes_per_purchase(build) -> float:
+    """Прирост памяти, выделенной при вызове build() и удерживаемой результатом, на покупку"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del result
+    return (after - before) / SIZE
+
+
+def _build_asset() -> Asset:
+    asset = Asset(name="memory", currency=Currency.USD, drawdown_percent=Decimal('15'))
+    for investment, price, quantity, timestamp in _values():
+        asset.add_purchase(Purchase(asset.allocate_purchase_id(), investment, price, quantity, timestamp))
+    return asset
+
+
+def test_store_purchase_within_budget():
+    def build():
+        store = PurchaseStore()
+        for i, (investment, price, quantity, timestamp) in enumerate(_values(), start=1):
+            store.append(Purchase(i, investment, price, quantity, timestamp))
+        return store
+
+    assert _bytes_per_purchase(build) <= PURCHASE_BUDGET
+
+
+def test_asset_purchase_within_budget():
+    assert _bytes_per_purchase(_build_asset) <= PURCHASE_BUDGET
+
+
+def test_asset_purchase_with_lots_within_budget():
+    def build():
+        asset = _build_asset()
+        asset.lots  # Учет лотов, как после первой продажи
+        return asset
+
+    assert _bytes_per_purchase(build) <= PURCHASE_WITH_LOT_BUDGET
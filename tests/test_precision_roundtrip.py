@@ -0,0 +1,52 @@
+import random
+from decimal import Decimal
+import pytest
+from src.models.asset import Asset
+from src.services.storage_backend import create_storage_backend
+from src.utils.currency import Currency
+
+
+def _fill(manager, currency):
+    """Покупки с «неудобными» суммами и ценами: больше знаков, чем допускает политика точности"""
+    rng = random.Random(15)
+    manager.create_asset("COIN", currency=currency)
+    manager.add_purchases(
+        (Decimal(str(rng.uniform(1, 5000))), Decimal(str(rng.uniform(0.0001, 70000))))
+        for _ in range(300)
+    )
+    return manager.current_asset
+
+
+def _snapshot(asset: Asset):
+    """Итоги, безубыточная точка и значения покупок; as_tuple различает и показатель степени Decimal"""
+    aggregate = asset.aggregate
+    return (
+        aggregate.break_even.as_tuple(),
+        aggregate.total_investment.as_tuple(),
+        aggregate.total_quantity.as_tuple(),
+        aggregate.count,
+        [(p.investment.as_tuple(), p.price.as_tuple(), p.quantity.as_tuple()) for p in asset.purchases]
+    )
+
+
+@pytest.mark.parametrize("currency", [Currency.USD, Currency.BTC])
+def test_journal_roundtrip_is_bit_identical(open_manager, reload_asset, currency):
+    manager = open_manager()
+    expected = _snapshot(_fill(manager, currency))
+
+    assert _snapshot(reload_asset(manager, "COIN")) == expected
+
+
+@pytest.mark.parametrize("currency", [Currency.USD, Currency.BTC])
+def test_full_save_roundtrip_is_bit_identical(open_manager, storage_kind, currency):
+    manager = open_manager()
+    asset = _fill(manager, currency)
+    manager.shutdown(timeout=10)
+    expected = _snapshot(asset)
+
+    storage = create_storage_backend(storage_kind)
+    try:
+        assert storage.save_asset(asset)
+        assert _snapshot(storage.load_asset("COIN")) == expected
+    finally:
+        storage.close()
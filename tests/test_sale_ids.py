@@ -0,0 +1,30 @@
+from decimal import Decimal
+
+
+def test_sale_ids_are_not_reused_after_removal(open_manager, reload_asset):
+    manager = open_manager()
+    manager.create_asset("BTC")
+    manager.add_purchase(Decimal('1000'), Decimal('100'))
+    first = manager.add_sale(Decimal('1'), Decimal('120'))
+    second = manager.add_sale(Decimal('1'), Decimal('130'))
+    assert manager.remove_sale(second.id)
+
+    third = manager.add_sale(Decimal('2'), Decimal('140'))
+    assert third.id == second.id + 1
+
+    asset = reload_asset(manager, "BTC")
+    assert [sale.id for sale in asset.sales] == [first.id, third.id]
+    assert asset.sales[-1].price == Decimal('140')
+    assert asset.next_sale_id == third.id + 1
+
+
+def test_sale_id_counter_survives_removing_every_sale(open_manager, reload_asset):
+    manager = open_manager()
+    manager.create_asset("ETH")
+    manager.add_purchase(Decimal('1000'), Decimal('100'))
+    sale = manager.add_sale(Decimal('1'), Decimal('120'))
+    assert manager.remove_sale(sale.id)
+
+    asset = reload_asset(manager, "ETH")
+    assert asset.sales == []
+    assert asset.next_sale_id == sale.id + 1
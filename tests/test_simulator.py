@@ -0,0 +1,32 @@
+import tracemalloc
+from decimal import Decimal
+import numpy as np
+from src.services.simulator import Simulator
+
+
+def test_chunk_memory_does_not_grow_with_steps():
+    # Матрица цен (5000, 2001) заняла бы 80 МБ; состояние по шагам - несколько массивов по 40 КБ
+    tracemalloc.start()
+    try:
+        Simulator.simulate(5_000, 2_000, Decimal('10'), Decimal('100'), seed=1, workers=1)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < 5_000_000
+
+
+def test_result_does_not_depend_on_workers():
+    options = dict(paths=3_000, steps=200, drawdown_percent=Decimal('10'), investment=Decimal('100'),
+                   seed=7, chunk_size=1_000)
+    single = Simulator.simulate(workers=1, **options)
+    pooled = Simulator.simulate(workers=2, **options)
+    for name in ("break_even", "final_price", "purchase_count"):
+        np.testing.assert_array_equal(getattr(single, name), getattr(pooled, name))
+
+
+def test_bootstrap_prices_follow_returns():
+    # Доходность всегда +1%: просадок нет, одна покупка, цена растет как exp(steps * r)
+    result = Simulator.simulate(100, 50, Decimal('10'), Decimal('100'), model=Simulator.MODEL_BOOTSTRAP,
+                                returns=np.full(10, 0.01), seed=3, workers=1)
+    np.testing.assert_allclose(result.final_price, 100 * np.exp(0.5))
+    assert (result.purchase_count == 1).all()
@@ -0,0 +1,82 @@
+from decimal import Decimal
+import pytest
+from src.models.trade_column_mapping import TradeColumnMapping
+from src.services.trade_importer import TradeImporter
+
+
+def _write(tmp_path, text):
+    filepath = tmp_path / "trades.csv"
+    filepath.write_text(text, encoding="utf-8")
+    return filepath
+
+
+def test_binance_amount_is_total_not_quantity(open_manager, tmp_path):
+    # Binance: Executed - количество, Amount - сумма в валюте котировки
+    filepath = _write(tmp_path, "Date(UTC);Side;Price;Executed;Amount\n"
+                                "2024-01-01 10:00:00;BUY;100,00;0,5;50,00\n")
+    manager = open_manager()
+    manager.create_asset("BTC")
+
+    report = TradeImporter.import_csv(manager, filepath)
+    assert report.imported == 1
+    purchase = manager.current_asset.purchases[0]
+    assert purchase.investment == Decimal('50')
+    assert purchase.quantity == Decimal('0.5')
+
+
+def test_ambiguous_quantity_columns_require_mapping(open_manager, tmp_path):
+    filepath = _write(tmp_path, "Price,Quantity,Executed\n100,1,1\n")
+    manager = open_manager()
+    manager.create_asset("BTC")
+
+    with pytest.raises(ValueError, match="Неоднозначные"):
+        TradeImporter.import_csv(manager, filepath)
+    report = TradeImporter.import_csv(manager, filepath, TradeColumnMapping(quantity="Executed"))
+    assert report.imported == 1
+
+
+def test_total_mismatch_is_reported(open_manager, tmp_path):
+    filepath = _write(tmp_path, "Price,Qty,Total\n100,1,100\n100,1,5\n")
+    manager = open_manager()
+    manager.create_asset("BTC")
+
+    report = TradeImporter.import_csv(manager, filepath)
+    assert report.imported == 1
+    assert report.invalid == 1
+
+
+def test_import_in_batches_is_undone_at_once(open_manager, tmp_path):
+    rows = "".join(f"T{i},100,{i + 1}\n" for i in range(7))
+    filepath = _write(tmp_path, "Trade ID,Price,Total\n" + rows)
+    manager = open_manager()
+    manager.create_asset("BTC")
+    manager.add_purchase(Decimal('10'), Decimal('100'))
+
+    report = TradeImporter.import_csv(manager, filepath, batch_size=3)
+    assert report.imported == 7
+    assert len(manager.current_asset.purchases) == 8
+
+    assert manager.undo_last_batch()
+    assert len(manager.current_asset.purchases) == 1
+
+
+def test_dust_amount_is_invalid_row(open_manager, tmp_path):
+    filepath = _write(tmp_path, "Price,Total\n100,10\n100,0.004\n100,20\n")
+    manager = open_manager()
+    manager.create_asset("BTC")
+
+    report = TradeImporter.import_csv(manager, filepath, batch_size=1)
+    assert report.imported == 2
+    assert report.invalid == 1
+    assert "строка 3" in report.errors[0]
+
+
+def test_generic_type_and_id_columns_are_not_guessed(open_manager, tmp_path):
+    # «Type» - тип заявки, «ID» - номер строки: без явного соответствия они не используются
+    filepath = _write(tmp_path, "ID,Type,Price,Total\n1,LIMIT,100,10\n1,MARKET,100,20\n")
+    manager = open_manager()
+    manager.create_asset("BTC")
+
+    report = TradeImporter.import_csv(manager, filepath)
+    assert report.imported == 2
+    assert report.bytes_read == filepath.stat().st_size